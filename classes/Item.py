@@ -1,14 +1,11 @@
-from assets import load_sprite
-
 class Item:
     def __init__(self, value: int, position: tuple[int, int], sprite: str):
         self.value = value
         self.position = position
-        try:
-            self.sprite = load_sprite(sprite)
-        except Exception as error:
-            print(f"❌ - ERROR LOADING THE ITEM SPRITE: {error}")
-            self.sprite = None
+        # Only the sprite file name is stored here; the Visualization attaches
+        # the loaded image when rendering, so the simulation can run headless
+        self.sprite_name = sprite
+        self.sprite = None
 
 class Person(Item):
     def __init__(self, position: tuple[int, int]):
@@ -1,15 +1,11 @@
-from assets import load_sprite
-
 class Mine:
     def __init__(self, position: tuple[int, int], x_radius: int, y_radius: int, sprite: str):
         self.position = position
         self.x_radius = x_radius
         self.y_radius = y_radius
-        try:
-            self.sprite = load_sprite(sprite)
-        except Exception as error:
-            print(f"❌ - ERROR LOADING THE MINE SPRITE: {error}")
-            self.sprite = None
+        # Sprite is attached by the Visualization (see Item)
+        self.sprite_name = sprite
+        self.sprite = None
 
 class Mine_O1(Mine):
     def __init__(self, position: tuple[int, int]):
@@ -1,8 +1,6 @@
-from assets import load_sprite, load_sound
 from classes.Item import Item, Person
 from classes.Player import Player
-from pathfinding import find_nearest, find_path_to_column
-from classes.Mine import Mine
+from pathfinding import path_from_field
 
 class Vehicle:
     def __init__(self, team: Player, position: tuple[int, int], capacity: int, sprite: str, load: list[Item] = [], only_persons: bool = False, exclude_persons: bool = False, strategy=None):
@@ -21,16 +19,11 @@ class Vehicle:
         self.only_persons = only_persons  # Motorcycles: only persons
         self.exclude_persons = exclude_persons  # Trucks and Jeeps: no persons
         self.strategy = strategy
-        try:
-            self.sprite = load_sprite(sprite)
-        except Exception as error:
-            print(f"❌ - ERROR LOADING THE VEHICLE SPRITE: {error}")
-            self.sprite = None
-        # Load the unload sound once (class variable)
-        try:
-            self.unload_sound = load_sound('unload.mp3')
-        except Exception:
-            self.unload_sound = None
+        # Sprite and unload sound are attached by the Visualization, so
+        # vehicles can be simulated headless without pygame or a display
+        self.sprite_name = sprite
+        self.sprite = None
+        self.unload_sound = None
 
     def move(self, map_manager):
         self.plan(map_manager)
@@ -53,23 +46,21 @@ class Vehicle:
             return
         # If not full, find nearest safe item
         if len(self.load) < self.capacity:
-            path = find_nearest(map_manager.grid, self.position, map_manager.danger_zones, 
-                              only_persons=self.only_persons, exclude_persons=self.exclude_persons)
+            field = map_manager.get_item_field(only_persons=self.only_persons, exclude_persons=self.exclude_persons)
+            path = path_from_field(field, self.position)
             if path:
                 self.path = path[1:]
                 self.state = 'collecting'
                 return
             # If no available items, return to base to avoid blocking
             else:
-                base_x = 0 if map_manager.player1 is self.team else map_manager.width - 1
-                path = find_path_to_column(map_manager.grid, self.position, base_x, map_manager.danger_zones)
+                path = path_from_field(map_manager.get_base_field(self.team), self.position)
                 if path:
                     self.path = path[1:]
                     self.state = 'returning'
                 return
         # Otherwise, plan path to base
-        base_x = 0 if map_manager.player1 is self.team else map_manager.width - 1
-        path = find_path_to_column(map_manager.grid, self.position, base_x, map_manager.danger_zones)
+        path = path_from_field(map_manager.get_base_field(self.team), self.position)
         if path:
             self.path = path[1:]
             self.state = 'returning'
@@ -85,7 +76,7 @@ class Vehicle:
 
         destination_object = map_manager.grid[next_x][next_y]
         # If destination occupied by a Mine, abort the move
-        if destination_object is not None and isinstance(destination_object, Mine):
+        if (next_x, next_y) in map_manager.mines_by_position:
             self.path = []
             return
         # If destination occupied by another Vehicle, allow the move.
@@ -95,36 +86,37 @@ class Vehicle:
         # When leaving the old cell, restore any item that was under this vehicle
         if 0 <= old_x < map_manager.width and 0 <= old_y < map_manager.height:
             if map_manager.grid[old_x][old_y] is self:
-                map_manager.grid[old_x][old_y] = None
+                map_manager.set_cell((old_x, old_y), None)
             # If we were carrying an item 'under' us, put it back on the grid
             if getattr(self, 'under_item', None) is not None:
                 item_under = self.under_item
                 try:
                     item_under.position = (old_x, old_y)
-                    map_manager.grid[old_x][old_y] = item_under
+                    map_manager.set_cell((old_x, old_y), item_under)
                 except Exception:
                     pass
-                self.under_item = None
+                map_manager.set_under_item(self, None)
 
         # Handle item at destination.
         if isinstance(destination_object, Item):
             picked = self.pick_item(destination_object)
             if picked:
                 # Remove item from ground since it was picked
-                map_manager.grid[next_x][next_y] = None
+                map_manager.set_cell((next_x, next_y), None)
+                map_manager.record_cargo(1)
             else:
                 # Vehicle cannot pick this item (e.g., motorcycle vs non-person).
                 # Allow vehicle to pass over the item: temporarily remove the
                 # item from the grid and keep it in `under_item`.
                 try:
-                    self.under_item = destination_object
-                    map_manager.grid[next_x][next_y] = None
+                    map_manager.set_under_item(self, destination_object)
+                    map_manager.set_cell((next_x, next_y), None)
                 except Exception:
-                    self.under_item = None
+                    map_manager.set_under_item(self, None)
 
         # Move
         self.position = (next_x, next_y)
-        map_manager.grid[next_x][next_y] = self
+        map_manager.set_cell((next_x, next_y), self)
 
         # Consume step
         if self.path and self.path[0] == target_position:
@@ -156,6 +148,7 @@ class Vehicle:
                         self.unload_sound.play()
                     except Exception:
                         pass
+                map_manager.record_cargo(-len(self.load))
                 self.load = []
                 self.state = 'idle'
                 self.path = []
@@ -189,6 +182,7 @@ class Vehicle:
                 pass
         
         # Clear load
+        map_manager.record_cargo(-len(self.load))
         self.load = []
         self.state = 'idle'
         self.path = []
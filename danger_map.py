@@ -0,0 +1,169 @@
+from typing import Any
+from itertools import accumulate
+from classes.Mine import Mine
+
+# Mine_G1 mines toggle every G1_TOGGLE_INTERVAL turns, so their on/off
+# schedule repeats every G1_PERIOD turns
+G1_TOGGLE_INTERVAL = 5
+G1_PERIOD = 2 * G1_TOGGLE_INTERVAL
+
+
+def mine_rectangle(position: tuple[int, int], x_radius: int, y_radius: int, width: int, height: int):
+    # Cells covered by a mine as (min_x, min_y, max_x, max_y) clipped to the
+    # map, or None if the rectangle falls outside of it
+    mine_x, mine_y = position
+    min_x, max_x = max(0, mine_x - x_radius), min(width - 1, mine_x + x_radius)
+    min_y, max_y = max(0, mine_y - y_radius), min(height - 1, mine_y + y_radius)
+    if min_x > max_x or min_y > max_y:
+        return None
+    return (min_x, min_y, max_x, max_y)
+
+
+class MineCoverage:
+    # How many mine rectangles cover each cell. Built with a 2D difference
+    # array (4 updates per rectangle) and prefix sums, so building costs
+    # O(mines + cells) whatever the radii, and each query is O(1)
+    def __init__(self, width: int, height: int, rectangles: list[tuple[int, int, int, int]]):
+        self.width = width
+        self.height = height
+        difference = [[0] * (height + 1) for _ in range(width + 1)]
+        for rectangle in rectangles:
+            if rectangle is None:
+                continue
+            min_x, min_y, max_x, max_y = rectangle
+            difference[min_x][min_y] += 1
+            difference[min_x][max_y + 1] -= 1
+            difference[max_x + 1][min_y] -= 1
+            difference[max_x + 1][max_y + 1] += 1
+        # Prefix sums along y inside each column, then along x across columns
+        self.counts = []
+        running = [0] * height
+        for x in range(width):
+            column = list(accumulate(difference[x][:height]))
+            running = [previous + current for previous, current in zip(running, column)]
+            self.counts.append(running)
+
+    def count(self, x: int, y: int):
+        return self.counts[x][y]
+
+    def covered(self, x: int, y: int):
+        return self.counts[x][y] > 0
+
+    @classmethod
+    def from_mines(cls, width: int, height: int, mines: list[Mine], radius: int | None = None):
+        # Rectangles at each mine's current radii, or at a fixed radius
+        rectangles = []
+        for mine in mines:
+            x_radius = mine.x_radius if radius is None else radius
+            y_radius = mine.y_radius if radius is None else radius
+            rectangles.append(mine_rectangle(mine.position, x_radius, y_radius, width, height))
+        return cls(width, height, rectangles)
+
+
+class DangerMap:
+    # Danger zones kept as layers so a turn only touches the cells that changed:
+    # - mine layer: how many mine rectangles cover each cell. It is built
+    #   with a MineCoverage when the set of mines changes; afterwards a
+    #   Mine_G1 toggle swaps its precomputed "on" mask for its "off" mask
+    # - vehicle layer: how many vehicles stand on each cell, moved by deltas
+    # `zones` is the combined grid (covered by a mine or occupied by a
+    # vehicle), the list of lists MapManager exposes as danger_zones.
+    def __init__(self, width: int, height: int):
+        self.width = width
+        self.height = height
+        self.mine_counts = [[0] * height for _ in range(width)]
+        self.vehicle_counts = [[0] * height for _ in range(width)]
+        self.zones = [[False] * height for _ in range(width)]
+        # Radii each mine is currently stamped with, and its masks by radii
+        self.stamped_mines: dict[Mine, tuple[int, int]] = {}
+        self.mine_masks: dict[Mine, dict[tuple[int, int], list[tuple[int, int]]]] = {}
+        # Position each vehicle is currently stamped at
+        self.stamped_vehicles: dict[Any, tuple[int, int]] = {}
+        # Bumped whenever the mine layer changes (rebuilt or a mine restamped)
+        self.mine_version = 0
+
+    def is_dangerous(self, x: int, y: int):
+        return self.zones[x][y]
+
+    def mine_coverage(self, x: int, y: int):
+        # Mine rectangles covering the cell as of the last sync
+        return self.mine_counts[x][y]
+
+    def mine_mask(self, mine: Mine, x_radius: int, y_radius: int):
+        masks = self.mine_masks.setdefault(mine, {})
+        mask = masks.get((x_radius, y_radius))
+        if mask is None:
+            mine_x, mine_y = mine.position
+            mask = [
+                (mine_x + delta_x, mine_y + delta_y)
+                for delta_x in range(-x_radius, x_radius + 1)
+                for delta_y in range(-y_radius, y_radius + 1)
+                if 0 <= mine_x + delta_x < self.width and 0 <= mine_y + delta_y < self.height
+            ]
+            masks[(x_radius, y_radius)] = mask
+        return mask
+
+    def sync(self, mines: list[Mine], vehicles: list[Any]):
+        # Applies every change since the last sync and returns the cells whose
+        # combined danger flipped
+        touched = set()
+        mine_counts = self.mine_counts
+        vehicle_counts = self.vehicle_counts
+
+        rebuilt = set(mines) != set(self.stamped_mines)
+        if rebuilt:
+            # New map (or loaded game): rebuild the whole mine layer at once,
+            # every cell is compared below column by column
+            coverage = MineCoverage.from_mines(self.width, self.height, mines)
+            self.mine_counts = mine_counts = coverage.counts
+            self.stamped_mines = {mine: (mine.x_radius, mine.y_radius) for mine in mines}
+            self.mine_masks = {}
+            self.mine_version += 1
+        for mine in mines:
+            radii = (mine.x_radius, mine.y_radius)
+            stamped = self.stamped_mines.get(mine)
+            if stamped == radii:
+                continue
+            if stamped is not None:
+                for x, y in self.mine_mask(mine, *stamped):
+                    mine_counts[x][y] -= 1
+                    touched.add((x, y))
+            for x, y in self.mine_mask(mine, *radii):
+                mine_counts[x][y] += 1
+                touched.add((x, y))
+            self.stamped_mines[mine] = radii
+            self.mine_version += 1
+
+        current_vehicles = set(vehicles)
+        for vehicle in list(self.stamped_vehicles):
+            if vehicle not in current_vehicles:
+                x, y = self.stamped_vehicles.pop(vehicle)
+                vehicle_counts[x][y] -= 1
+                touched.add((x, y))
+        for vehicle in vehicles:
+            position = vehicle.position
+            stamped = self.stamped_vehicles.get(vehicle)
+            if stamped == position:
+                continue
+            if stamped is not None:
+                vehicle_counts[stamped[0]][stamped[1]] -= 1
+                touched.add(stamped)
+            vehicle_counts[position[0]][position[1]] += 1
+            touched.add(position)
+            self.stamped_vehicles[vehicle] = position
+
+        changed = []
+        zones = self.zones
+        if rebuilt:
+            for x in range(self.width):
+                column = [mine > 0 or vehicle > 0 for mine, vehicle in zip(mine_counts[x], vehicle_counts[x])]
+                if column != zones[x]:
+                    changed.extend((x, y) for y, (old, new) in enumerate(zip(zones[x], column)) if old != new)
+                    zones[x][:] = column
+            return changed
+        for x, y in touched:
+            dangerous = mine_counts[x][y] > 0 or vehicle_counts[x][y] > 0
+            if zones[x][y] != dangerous:
+                zones[x][y] = dangerous
+                changed.append((x, y))
+        return changed
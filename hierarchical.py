@@ -0,0 +1,280 @@
+import heapq
+from collections import deque
+from typing import Any
+from classes.Mine import Mine
+
+# Side of the square clusters the map is cut into
+CLUSTER_SIZE = 10
+# Maps with at least this many cells use the hierarchical search by default.
+# Time spent in Kamikaze/Escort nearest searches over 8 turns (a third of
+# the map height in vehicles per player), flat / hierarchical:
+#   100x100 0.02 / 0.10 s, 200x200 0.93 / 0.84 s, 300x300 4.34 / 1.79 s,
+#   500x500 21.4 / 3.9 s
+HIERARCHICAL_MIN_CELLS = 40000
+# Border runs at least this long get an entrance at each end instead of one
+# in the middle
+LONG_ENTRANCE = 6
+
+
+class HierarchicalMap:
+    # HPA* abstraction of the map. The grid is cut into clusters; where two
+    # neighbouring clusters share a run of walkable border cells there is an
+    # entrance (a pair of facing cells), and the distances between the
+    # entrances of a cluster are computed once with a search limited to that
+    # cluster. A query searches this small abstract graph first and then
+    # refines each abstract edge with a local search inside one cluster.
+    # Walls are the same as in bfs() with danger zones: danger cells and
+    # mines, except for the goal cells. mark_changed only invalidates the
+    # clusters holding the changed cells, they are rebuilt on the next query.
+    def __init__(self, grid: list[list[Any]], danger_zones: list[list[bool]], cluster_size: int = CLUSTER_SIZE):
+        self.grid = grid
+        self.danger_zones = danger_zones
+        self.width = len(grid)
+        self.height = len(grid[0])
+        self.cluster_size = cluster_size
+        self.clusters_x = (self.width + cluster_size - 1) // cluster_size
+        self.clusters_y = (self.height + cluster_size - 1) // cluster_size
+        # (cluster_a, cluster_b) -> [(cell in a, cell in b), ...]
+        self.border_entrances: dict[tuple[tuple[int, int], tuple[int, int]], list[tuple[tuple[int, int], tuple[int, int]]]] = {}
+        # cluster -> {entrance cell: [(other entrance cell, distance), ...]}
+        self.cluster_edges: dict[tuple[int, int], dict[tuple[int, int], list[tuple[tuple[int, int], int]]]] = {}
+        # cluster -> {entrance cell: facing cells in the neighbouring clusters}
+        self.cluster_crossings: dict[tuple[int, int], dict[tuple[int, int], list[tuple[int, int]]]] = {}
+        self.dirty = {(cluster_x, cluster_y) for cluster_x in range(self.clusters_x) for cluster_y in range(self.clusters_y)}
+
+    def cluster_of(self, position: tuple[int, int]):
+        return (position[0] // self.cluster_size, position[1] // self.cluster_size)
+
+    def cluster_bounds(self, cluster: tuple[int, int]):
+        min_x, min_y = cluster[0] * self.cluster_size, cluster[1] * self.cluster_size
+        return min_x, min_y, min(self.width, min_x + self.cluster_size) - 1, min(self.height, min_y + self.cluster_size) - 1
+
+    def walkable(self, x: int, y: int):
+        if self.danger_zones and self.danger_zones[x][y]:
+            return False
+        grid_object = self.grid[x][y]
+        return grid_object is None or not isinstance(grid_object, Mine)
+
+    def mark_changed(self, cells):
+        # A changed cell on a cluster edge also changes the facing cluster's
+        # entrances, so that cluster is rebuilt as well
+        for x, y in cells:
+            cluster = self.cluster_of((x, y))
+            self.dirty.add(cluster)
+            for neighbor_x, neighbor_y in ((x - 1, y), (x + 1, y), (x, y - 1), (x, y + 1)):
+                if 0 <= neighbor_x < self.width and 0 <= neighbor_y < self.height:
+                    self.dirty.add(self.cluster_of((neighbor_x, neighbor_y)))
+
+    def update(self):
+        # Rebuilds the entrances around every dirty cluster, then the
+        # distances inside every cluster whose entrances may have moved
+        if not self.dirty:
+            return
+        rebuild = set()
+        for cluster in self.dirty:
+            rebuild.add(cluster)
+            cluster_x, cluster_y = cluster
+            for other in ((cluster_x - 1, cluster_y), (cluster_x + 1, cluster_y), (cluster_x, cluster_y - 1), (cluster_x, cluster_y + 1)):
+                if 0 <= other[0] < self.clusters_x and 0 <= other[1] < self.clusters_y:
+                    self._build_border(min(cluster, other), max(cluster, other))
+                    rebuild.add(other)
+        for cluster in rebuild:
+            self._build_cluster_edges(cluster)
+        self.dirty = set()
+
+    def _build_border(self, cluster_a: tuple[int, int], cluster_b: tuple[int, int]):
+        # Entrances along the border between two neighbouring clusters,
+        # cluster_a being the left / upper one
+        min_x, min_y, max_x, max_y = self.cluster_bounds(cluster_a)
+        if cluster_a[0] != cluster_b[0]:
+            pairs = [((max_x, y), (max_x + 1, y)) for y in range(min_y, max_y + 1)]
+        else:
+            pairs = [((x, max_y), (x, max_y + 1)) for x in range(min_x, max_x + 1)]
+        entrances = []
+        run = []
+        for pair in pairs + [None]:
+            if pair is not None and self.walkable(*pair[0]) and self.walkable(*pair[1]):
+                run.append(pair)
+                continue
+            if run:
+                if len(run) >= LONG_ENTRANCE:
+                    entrances.extend((run[0], run[-1]))
+                else:
+                    entrances.append(run[len(run) // 2])
+                run = []
+        self.border_entrances[(cluster_a, cluster_b)] = entrances
+
+    def _build_cluster_edges(self, cluster: tuple[int, int]):
+        cluster_x, cluster_y = cluster
+        crossings = {}
+        for other in ((cluster_x - 1, cluster_y), (cluster_x + 1, cluster_y), (cluster_x, cluster_y - 1), (cluster_x, cluster_y + 1)):
+            key = (min(cluster, other), max(cluster, other))
+            for cell_a, cell_b in self.border_entrances.get(key, []):
+                inside, outside = (cell_a, cell_b) if self.cluster_of(cell_a) == cluster else (cell_b, cell_a)
+                crossings.setdefault(inside, []).append(outside)
+        self.cluster_crossings[cluster] = crossings
+        nodes = list(crossings)
+        edges = {}
+        for node in nodes:
+            distances, _ = self._local_search(node, cluster)
+            edges[node] = [(other, distances[other]) for other in nodes if other != node and other in distances]
+        self.cluster_edges[cluster] = edges
+
+    def _local_search(self, origin: tuple[int, int], cluster: tuple[int, int], goal: tuple[int, int] | None = None, exempt=()):
+        # BFS from origin limited to the cluster. The origin and the exempt
+        # cells are entered even if they are walls. Stops early at goal.
+        # Returns (distances, parents)
+        min_x, min_y, max_x, max_y = self.cluster_bounds(cluster)
+        distances = {origin: 0}
+        parents = {origin: None}
+        queue = deque([origin])
+        while queue:
+            current = queue.popleft()
+            if current == goal:
+                break
+            x, y = current
+            for neighbor in ((x - 1, y), (x + 1, y), (x, y - 1), (x, y + 1)):
+                if neighbor in distances:
+                    continue
+                neighbor_x, neighbor_y = neighbor
+                if not (min_x <= neighbor_x <= max_x and min_y <= neighbor_y <= max_y):
+                    continue
+                if neighbor not in exempt and not self.walkable(neighbor_x, neighbor_y):
+                    continue
+                distances[neighbor] = distances[current] + 1
+                parents[neighbor] = current
+                queue.append(neighbor)
+        return distances, parents
+
+    def _local_path(self, start: tuple[int, int], goal: tuple[int, int], exempt=()):
+        # Path from start to goal inside their common cluster, or None
+        distances, parents = self._local_search(start, self.cluster_of(start), goal=goal, exempt=exempt)
+        if goal not in distances:
+            return None
+        path = []
+        current = goal
+        while current is not None:
+            path.append(current)
+            current = parents[current]
+        path.reverse()
+        return path
+
+    def _border_neighbors(self, cell: tuple[int, int], allowed=()):
+        # Walkable neighbours of the cell that lie in another cluster
+        x, y = cell
+        cluster = self.cluster_of(cell)
+        result = []
+        for neighbor in ((x - 1, y), (x + 1, y), (x, y - 1), (x, y + 1)):
+            neighbor_x, neighbor_y = neighbor
+            if not (0 <= neighbor_x < self.width and 0 <= neighbor_y < self.height) or self.cluster_of(neighbor) == cluster:
+                continue
+            if neighbor in allowed or self.walkable(neighbor_x, neighbor_y):
+                result.append(neighbor)
+        return result
+
+    def find_path(self, start: tuple[int, int], goal: tuple[int, int]):
+        # Returns [start, ..., goal] or None, like bfs(). Paths may be a few
+        # steps longer than the shortest one, the usual HPA* trade-off
+        if start == goal:
+            return [start]
+        self.update()
+        if self.cluster_of(start) == self.cluster_of(goal):
+            path = self._local_path(start, goal, exempt={goal})
+            if path:
+                return path
+        return self.find_nearest_path(start, [goal])
+
+    def find_nearest_path(self, start: tuple[int, int], goals):
+        # Path to the closest of the goals, or None, like find_nearest_goal():
+        # every goal is a target of one search of the abstract graph instead
+        # of one query per goal
+        goals = set(goals)
+        if start in goals:
+            return [start]
+        if not goals:
+            return None
+        self.update()
+
+        # Goals may be walls themselves (a vehicle to reach), so their
+        # walkable neighbours across a cluster border are targets too: no
+        # entrance is built next to them. The entrances of a cluster holding
+        # targets are linked to them when the search first reaches them
+        extra_edges: dict[tuple[int, int], list[tuple[tuple[int, int], int]]] = {}
+        target_clusters: dict[tuple[int, int], set[tuple[int, int]]] = {}
+        for goal in goals:
+            target_clusters.setdefault(self.cluster_of(goal), set()).add(goal)
+            for neighbor in self._border_neighbors(goal):
+                target_clusters.setdefault(self.cluster_of(neighbor), set()).add(neighbor)
+                extra_edges.setdefault(neighbor, []).append((goal, 1))
+
+        # Temporary edges linking start, and its walkable neighbours across a
+        # cluster border, to the entrances and targets of their clusters
+        origins = [start]
+        for neighbor in self._border_neighbors(start, allowed=goals):
+            extra_edges.setdefault(start, []).append((neighbor, 1))
+            origins.append(neighbor)
+        for origin in origins:
+            cluster = self.cluster_of(origin)
+            distances, _ = self._local_search(origin, cluster, exempt=goals)
+            for node in list(self.cluster_edges.get(cluster, {})) + list(target_clusters.get(cluster, ())):
+                if node in distances and node != origin:
+                    extra_edges.setdefault(origin, []).append((node, distances[node]))
+
+        # A* over the abstract graph of entrances. The distance to the box
+        # around the goals never overestimates the distance to the closest
+        # one, and is the exact Manhattan distance for a single goal. Ties
+        # on f prefer the deepest node, as in astar()
+        min_x, max_x = min(goal[0] for goal in goals), max(goal[0] for goal in goals)
+        min_y, max_y = min(goal[1] for goal in goals), max(goal[1] for goal in goals)
+
+        def estimate(node: tuple[int, int]):
+            return max(min_x - node[0], 0, node[0] - max_x) + max(min_y - node[1], 0, node[1] - max_y)
+
+        best = {start: 0}
+        parents = {start: None}
+        linked = set()
+        heap = [(estimate(start), 0, start)]
+        found = None
+        while heap:
+            _, depth, node = heapq.heappop(heap)
+            if node in goals:
+                found = node
+                break
+            distance = -depth
+            if distance > best.get(node, distance):
+                continue
+            node_cluster = self.cluster_of(node)
+            successors = list(self.cluster_edges.get(node_cluster, {}).get(node, []))
+            successors.extend((outside, 1) for outside in self.cluster_crossings.get(node_cluster, {}).get(node, ()))
+            successors.extend(extra_edges.get(node, ()))
+            if node_cluster in target_clusters and node not in linked:
+                linked.add(node)
+                distances, _ = self._local_search(node, node_cluster, exempt=goals)
+                successors.extend((target, distances[target]) for target in target_clusters[node_cluster] if target in distances and target != node)
+            for successor, step in successors:
+                successor_distance = distance + step
+                if successor_distance < best.get(successor, successor_distance + 1):
+                    best[successor] = successor_distance
+                    parents[successor] = node
+                    heapq.heappush(heap, (successor_distance + estimate(successor), -successor_distance, successor))
+        if found is None:
+            return None
+
+        # Refine: each abstract edge is either a border crossing or a local
+        # path inside one cluster
+        nodes = []
+        current = found
+        while current is not None:
+            nodes.append(current)
+            current = parents[current]
+        nodes.reverse()
+        path = [start]
+        for previous, current in zip(nodes, nodes[1:]):
+            if abs(previous[0] - current[0]) + abs(previous[1] - current[1]) == 1 and self.cluster_of(previous) != self.cluster_of(current):
+                path.append(current)
+                continue
+            segment = self._local_path(previous, current, exempt={current} if current in goals else ())
+            if segment is None:
+                return None
+            path.extend(segment[1:])
+        return path
@@ -0,0 +1,63 @@
+import os
+import json
+import pickle
+from collections import OrderedDict
+
+# Memory the in-memory turn history may use, read from the "history"
+# section of config.json
+CONFIG_PATH = os.path.join(os.path.dirname(__file__), 'config.json')
+try:
+    with open(CONFIG_PATH, 'r', encoding='utf-8') as config_file:
+        config = json.load(config_file)
+    history_config = config.get('history', {}) if isinstance(config, dict) else {}
+    HISTORY_MEMORY_LIMIT = int(float(history_config.get('memory_limit_mb', 32)) * 1024 * 1024)
+except Exception:
+    HISTORY_MEMORY_LIMIT = 32 * 1024 * 1024
+
+
+class TurnHistory:
+    # Recent turns kept in memory as pickled snapshots (the dicts save_game
+    # builds), so stepping back and forth does not touch the disk. Holds at
+    # most memory_limit bytes: the least recently used turns are evicted
+    # first, they stay available in the replay file on disk.
+    def __init__(self, memory_limit: int = HISTORY_MEMORY_LIMIT):
+        self.memory_limit = memory_limit
+        self.snapshots: OrderedDict[int, bytes] = OrderedDict()
+        self.memory_used = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def __contains__(self, turn: int):
+        return turn in self.snapshots
+
+    def __len__(self):
+        return len(self.snapshots)
+
+    def clear(self):
+        self.snapshots.clear()
+        self.memory_used = 0
+
+    def put(self, turn: int, state: dict):
+        # A new state for a turn replaces every later turn, as in the journal
+        for later in [other for other in self.snapshots if other >= turn]:
+            self.memory_used -= len(self.snapshots.pop(later))
+        snapshot = pickle.dumps(state, protocol=pickle.HIGHEST_PROTOCOL)
+        if len(snapshot) > self.memory_limit:
+            return
+        self.snapshots[turn] = snapshot
+        self.memory_used += len(snapshot)
+        while self.memory_used > self.memory_limit:
+            _, evicted = self.snapshots.popitem(last=False)
+            self.memory_used -= len(evicted)
+            self.evictions += 1
+
+    def get(self, turn: int):
+        # The saved state of the turn, or None if it is not in memory
+        snapshot = self.snapshots.get(turn)
+        if snapshot is None:
+            self.misses += 1
+            return None
+        self.hits += 1
+        self.snapshots.move_to_end(turn)
+        return pickle.loads(snapshot)
@@ -0,0 +1,390 @@
+import os
+import mmap
+import time
+import zlib
+import queue
+import struct
+import threading
+from save_schema import encode_state, decode_state, encode_delta, decode_delta
+
+# A game is saved as one replay file per game folder instead of one full
+# pickle per turn. Every KEYFRAME_INTERVAL turns (and whenever the previous
+# turn is not at hand) the whole state is written; the other turns only
+# store what changed since the turn before. Records are encoded with the
+# save_schema binary schema and zlib compressed, no pickle involved.
+#
+# File layout: a fixed header, then length-prefixed records. A record is a
+# keyframe, a delta, or a turn index table (turn, payload offset, length,
+# kind per turn) written when the replay is closed; the header points at
+# the latest index table.
+JOURNAL_FILE = 'game.replay'
+KEYFRAME_INTERVAL = 50
+COMPRESSION_LEVEL = 6
+
+KEYFRAME = 0
+DELTA = 1
+INDEX = 2
+
+# File header: magic, format version, index table offset and entry count
+FILE_MAGIC = b'RSREPLAY'
+FILE_VERSION = 2
+FILE_HEADER = struct.Struct('<8sIQI')
+# Record header: payload length, turn number, record kind
+RECORD_HEADER = struct.Struct('<IIB')
+INDEX_ENTRY = struct.Struct('<IQIB')
+
+# Saves a JournalWriter holds before save_game blocks (backpressure)
+SAVE_QUEUE_SIZE = 32
+
+
+def diff_entry(old: dict, new: dict):
+    # Fields of a saved object that changed. A path that is the old path
+    # minus its first steps (the usual case after a move) is stored as the
+    # number of steps dropped
+    changes = {}
+    for key, value in new.items():
+        old_value = old.get(key)
+        if old_value == value:
+            continue
+        if key == 'path' and isinstance(old_value, list) and len(value) < len(old_value) and old_value[len(old_value) - len(value):] == value:
+            value = len(old_value) - len(value)
+        changes[key] = value
+    return changes
+
+
+def patch_entry(old: dict, changes: dict):
+    new = dict(old)
+    for key, value in changes.items():
+        if key == 'path' and isinstance(value, int):
+            value = old['path'][value:]
+        new[key] = value
+    return new
+
+
+def diff_list(old: list, new: list):
+    # Saved objects of new that differ from old, by index: new ones in full,
+    # changed ones as their changed fields. None if both lists are equal
+    if old == new:
+        return None
+    added = {}
+    patched = {}
+    for index, entry in enumerate(new):
+        if index >= len(old) or set(old[index]) != set(entry):
+            added[index] = entry
+        elif old[index] != entry:
+            patched[index] = diff_entry(old[index], entry)
+    return {'count': len(new), 'added': added, 'patched': patched}
+
+
+def patch_list(old: list, delta: dict | None):
+    if delta is None:
+        return old
+    new = old[:delta['count']]
+    for index, changes in delta['patched'].items():
+        new[index] = patch_entry(new[index], changes)
+    new.extend([None] * (delta['count'] - len(new)))
+    for index, entry in delta['added'].items():
+        new[index] = entry
+    return new
+
+
+def diff_items(old: list, new: list):
+    # Items are keyed by position: removed positions and added items
+    old_items = {tuple(item['position']): item for item in old}
+    new_items = {tuple(item['position']): item for item in new}
+    removed = [position for position, item in old_items.items() if new_items.get(position) != item]
+    added = [item for position, item in new_items.items() if old_items.get(position) != item]
+    if not removed and not added:
+        return None
+    return {'removed': removed, 'added': added}
+
+
+def patch_items(old: list, delta: dict | None):
+    if delta is None:
+        return old
+    removed = set(delta['removed'])
+    items = [item for item in old if tuple(item['position']) not in removed]
+    items.extend(delta['added'])
+    items.sort(key=lambda item: tuple(item['position']))
+    return items
+
+
+def diff_state(old: dict, new: dict):
+    # Changes from one saved state to the next one
+    delta = {}
+    if (old.get('width'), old.get('height')) != (new.get('width'), new.get('height')):
+        delta['width'], delta['height'] = new.get('width'), new.get('height')
+    if old.get('explosions') != new.get('explosions'):
+        delta['explosions'] = new.get('explosions')
+    for player in ('player1', 'player2'):
+        old_player, new_player = old.get(player, {}), new.get(player, {})
+        player_delta = {}
+        if old_player.get('points') != new_player.get('points'):
+            player_delta['points'] = new_player.get('points')
+        vehicles = diff_list(old_player.get('vehicles', []), new_player.get('vehicles', []))
+        if vehicles is not None:
+            player_delta['vehicles'] = vehicles
+        if player_delta:
+            delta[player] = player_delta
+    mines = diff_list(old.get('mines', []), new.get('mines', []))
+    if mines is not None:
+        delta['mines'] = mines
+    items = diff_items(old.get('items', []), new.get('items', []))
+    if items is not None:
+        delta['items'] = items
+    return delta
+
+
+def apply_delta(state: dict, delta: dict, turn: int):
+    # The state of the next turn; the given state is left untouched
+    new = dict(state)
+    new['turn'] = turn
+    for key in ('width', 'height', 'explosions'):
+        if key in delta:
+            new[key] = delta[key]
+    for player in ('player1', 'player2'):
+        player_delta = delta.get(player)
+        if player_delta is None:
+            continue
+        new_player = dict(state.get(player, {}))
+        if 'points' in player_delta:
+            new_player['points'] = player_delta['points']
+        new_player['vehicles'] = patch_list(new_player.get('vehicles', []), player_delta.get('vehicles'))
+        new[player] = new_player
+    new['mines'] = patch_list(state.get('mines', []), delta.get('mines'))
+    new['items'] = patch_items(state.get('items', []), delta.get('items'))
+    return new
+
+
+class TurnJournal:
+    # Replay file of one game. The index maps each turn to its record
+    # (payload offset, length, kind); writing turn N drops every later turn
+    # from it, so going back and playing again replaces the old continuation.
+    # Reads go through a read-only mmap of the file, so seeking to a turn is
+    # a dictionary lookup plus slicing, no syscall per record.
+    def __init__(self, folder: str, keyframe_interval: int = KEYFRAME_INTERVAL):
+        self.folder = folder
+        self.path = os.path.join(folder, JOURNAL_FILE)
+        self.keyframe_interval = keyframe_interval
+        self.index: dict[int, tuple[int, int, int]] = {}
+        self.max_turn = -1
+        # End of the last complete record
+        self.end = FILE_HEADER.size
+        # Records written since the index table was last stored
+        self.unindexed = 0
+        self.view = None
+        # Last state written or read, the base of the next delta
+        self.last_turn = None
+        self.last_state = None
+        self._open()
+
+    def _open(self):
+        # Loads the stored index table, then scans the records appended
+        # after it (all of them if the game was not closed cleanly)
+        if not os.path.exists(self.path) or os.path.getsize(self.path) < FILE_HEADER.size:
+            return
+        view = self._view()
+        magic, version, index_offset, index_count = FILE_HEADER.unpack_from(view, 0)
+        if magic != FILE_MAGIC:
+            raise ValueError(f"{self.path} is not a replay file")
+        if version != FILE_VERSION:
+            raise ValueError(f"{self.path} has unsupported version {version}")
+        scan_from = FILE_HEADER.size
+        if index_offset:
+            for turn, offset, length, kind in INDEX_ENTRY.iter_unpack(view[index_offset:index_offset + index_count * INDEX_ENTRY.size]):
+                self._add_to_index(turn, (offset, length, kind))
+            scan_from = index_offset + index_count * INDEX_ENTRY.size
+        self.end = scan_from
+        size = len(view)
+        while self.end + RECORD_HEADER.size <= size:
+            length, turn, kind = RECORD_HEADER.unpack_from(view, self.end)
+            payload_offset = self.end + RECORD_HEADER.size
+            if payload_offset + length > size:
+                # Truncated last record (interrupted write), dropped by the
+                # next write
+                break
+            if kind != INDEX:
+                self._add_to_index(turn, (payload_offset, length, kind))
+                self.unindexed += 1
+            self.end = payload_offset + length
+
+    def _view(self):
+        # Read-only map of the file, remapped when it grew past the mapping
+        if self.view is None or len(self.view) < self.end:
+            self._close_view()
+            with open(self.path, 'rb') as file:
+                self.view = mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ)
+        return self.view
+
+    def _close_view(self):
+        if self.view is not None:
+            self.view.close()
+            self.view = None
+
+    def _add_to_index(self, turn: int, entry: tuple[int, int, int]):
+        # The last indexed turn is always the highest one
+        if self.index and turn <= self.max_turn:
+            for later in [other for other in self.index if other > turn]:
+                del self.index[later]
+        self.index[turn] = entry
+        self.max_turn = turn
+
+    def turns(self):
+        return sorted(self.index)
+
+    def has_turn(self, turn: int):
+        return turn in self.index
+
+    def _append(self, turn: int, kind: int, payload: bytes):
+        # Appends one record and returns its payload offset
+        os.makedirs(self.folder, exist_ok=True)
+        if not os.path.exists(self.path):
+            with open(self.path, 'wb') as file:
+                file.write(FILE_HEADER.pack(FILE_MAGIC, FILE_VERSION, 0, 0))
+        elif os.path.getsize(self.path) != self.end:
+            self._close_view()
+            os.truncate(self.path, self.end)
+        with open(self.path, 'ab') as file:
+            file.write(RECORD_HEADER.pack(len(payload), turn, kind))
+            file.write(payload)
+        offset = self.end + RECORD_HEADER.size
+        self.end = offset + len(payload)
+        return offset
+
+    def write(self, turn: int, state: dict):
+        # Appends the turn as a delta from the previous turn when possible
+        previous = turn - 1
+        if (
+            self.last_state is not None
+            and self.last_turn == previous
+            and previous in self.index
+            and turn % self.keyframe_interval != 0
+        ):
+            kind, body = DELTA, encode_delta(diff_state(self.last_state, state))
+        else:
+            kind, body = KEYFRAME, encode_state(state)
+        payload = zlib.compress(body, COMPRESSION_LEVEL)
+        self._add_to_index(turn, (self._append(turn, kind, payload), len(payload), kind))
+        self.unindexed += 1
+        self.last_turn = turn
+        self.last_state = state
+        return self.path
+
+    def write_index(self):
+        # Stores the turn index table as a record and points the header at
+        # it, so the next open does not scan the records before it
+        if not self.unindexed or not os.path.exists(self.path):
+            return
+        table = b''.join(INDEX_ENTRY.pack(turn, *self.index[turn]) for turn in sorted(self.index))
+        offset = self._append(self.max_turn, INDEX, table)
+        with open(self.path, 'r+b') as file:
+            file.write(FILE_HEADER.pack(FILE_MAGIC, FILE_VERSION, offset, len(self.index)))
+        self.unindexed = 0
+
+    def close(self):
+        self.write_index()
+        self._close_view()
+
+    def _read_record(self, turn: int):
+        offset, length, kind = self.index[turn]
+        body = zlib.decompress(self._view()[offset:offset + length])
+        return decode_state(body) if kind == KEYFRAME else decode_delta(body)
+
+    def read(self, turn: int):
+        # State of the turn: nearest keyframe at or before it plus the deltas
+        # up to it. Returns None if the turn is not in the journal
+        if turn not in self.index:
+            return None
+        keyframe_turn = turn
+        while self.index[keyframe_turn][2] != KEYFRAME:
+            keyframe_turn -= 1
+            if keyframe_turn not in self.index:
+                return None
+        state = self._read_record(keyframe_turn)
+        for delta_turn in range(keyframe_turn + 1, turn + 1):
+            state = apply_delta(state, self._read_record(delta_turn), delta_turn)
+        self.last_turn = turn
+        self.last_state = state
+        return state
+
+
+class JournalWriter:
+    # Writes journal records on a background thread so the game loop only
+    # pays for taking the snapshot (the plain dicts built by save_game).
+    # The queue is bounded: when the disk falls behind, submit blocks until
+    # a slot frees up instead of piling up snapshots in memory. Records are
+    # written in submission order, flush() waits for all of them.
+    def __init__(self, max_pending: int = SAVE_QUEUE_SIZE):
+        self.queue = queue.Queue(maxsize=max_pending)
+        self.lock = threading.Lock()
+        self.metrics = {
+            'submitted': 0,
+            'written': 0,
+            'errors': 0,
+            'blocked': 0,
+            'max_queue_depth': 0,
+            'last_write_latency': 0.0,
+            'max_write_latency': 0.0,
+            'total_write_latency': 0.0,
+        }
+        self.closed = False
+        self.thread = threading.Thread(target=self._run, name='journal-writer', daemon=True)
+        self.thread.start()
+
+    def submit(self, journal: TurnJournal, turn: int, state: dict):
+        if self.closed:
+            return journal.write(turn, state)
+        with self.lock:
+            self.metrics['submitted'] += 1
+            if self.queue.full():
+                self.metrics['blocked'] += 1
+        self.queue.put((journal, turn, state))
+        with self.lock:
+            self.metrics['max_queue_depth'] = max(self.metrics['max_queue_depth'], self.queue.qsize())
+        return journal.path
+
+    def _run(self):
+        while True:
+            task = self.queue.get()
+            if task is None:
+                self.queue.task_done()
+                return
+            journal, turn, state = task
+            started = time.perf_counter()
+            try:
+                journal.write(turn, state)
+                latency = time.perf_counter() - started
+                with self.lock:
+                    self.metrics['written'] += 1
+                    self.metrics['last_write_latency'] = latency
+                    self.metrics['max_write_latency'] = max(self.metrics['max_write_latency'], latency)
+                    self.metrics['total_write_latency'] += latency
+            except Exception as error:
+                with self.lock:
+                    self.metrics['errors'] += 1
+                print(f"❌ - ERROR WRITING TURN {turn} TO JOURNAL: {error}")
+            finally:
+                self.queue.task_done()
+
+    def queue_depth(self):
+        return self.queue.qsize()
+
+    def get_metrics(self):
+        with self.lock:
+            metrics = dict(self.metrics)
+        metrics['queue_depth'] = self.queue.qsize()
+        metrics['average_write_latency'] = metrics['total_write_latency'] / metrics['written'] if metrics['written'] else 0.0
+        return metrics
+
+    def flush(self):
+        # Blocks until every submitted save is on disk
+        if not self.closed:
+            self.queue.join()
+
+    def close(self):
+        # Flushes and stops the thread; later submits write synchronously
+        if self.closed:
+            return
+        self.queue.put(None)
+        self.thread.join()
+        self.closed = True
@@ -0,0 +1,43 @@
+import os
+import pickle
+from journal import TurnJournal
+
+# One-off conversion of games saved by older versions, one pickled dict per
+# turn (turn_N.pkl), into the game's replay file. Unpickling can run code
+# stored in the file, so the game itself never reads these files: a folder
+# is only read here, when the user asks for it with --convert-legacy
+
+
+def legacy_turns(folder: str):
+    # Turn numbers of the turn_N.pkl files in the folder, in order
+    turns = []
+    for file_name in os.listdir(folder):
+        if file_name.startswith('turn_') and file_name.endswith('.pkl'):
+            try:
+                turns.append(int(file_name[len('turn_'):-len('.pkl')]))
+            except ValueError:
+                continue
+    return sorted(turns)
+
+
+def convert_legacy_game(folder: str, map_manager):
+    # Writes every turn file of the folder into a new replay file, going
+    # through map_manager (restore, then snapshot) so the states get the
+    # current save layout. The .pkl files are left in place. Returns the
+    # number of turns converted
+    journal = TurnJournal(folder)
+    if journal.turns():
+        journal.close()
+        raise ValueError(f"{journal.path} already holds saved turns")
+    converted = 0
+    try:
+        for turn in legacy_turns(folder):
+            with open(os.path.join(folder, f"turn_{turn}.pkl"), 'rb') as file:
+                game_state = pickle.load(file)
+            if not map_manager.restore_state(game_state):
+                raise ValueError(f"turn {turn} could not be restored")
+            journal.write(turn, map_manager.snapshot_state(turn))
+            converted += 1
+    finally:
+        journal.close()
+    return converted
@@ -1,14 +1,80 @@
 import random
-import pickle
+from array import array
 import os
 import csv
+import atexit
 from datetime import datetime
 from classes.Mine import Mine, Mine_O1, Mine_O2, Mine_T1, Mine_T2, Mine_G1
 from classes.Item import Item, Person, Weapon, Clothing, Food, Heal
 from classes.Vehicle import Vehicle, Car, Jeep, Motorcycle, Truck
 from classes.Player import Player
 from strategies import Strategy
-from pathfinding import find_nearest
+from danger_map import DangerMap, MineCoverage, mine_rectangle, G1_TOGGLE_INTERVAL, G1_PERIOD
+from pathfinding import bfs, matches_target, find_nearest_goal, use_vectorized, IncrementalField, ComponentIndex, WalkableMask
+from hierarchical import HierarchicalMap, HIERARCHICAL_MIN_CELLS
+from scenario import load_scenario, item_counts, mine_margins, fleet_layout
+from journal import TurnJournal, JournalWriter
+from history import TurnHistory
+
+ITEM_TYPES = ('Person', 'Weapon', 'Clothing', 'Food', 'Heal')
+ITEM_CLASSES = {'Person': Person, 'Weapon': Weapon, 'Clothing': Clothing, 'Food': Food, 'Heal': Heal}
+MINE_CLASSES = {'Mine_O1': Mine_O1, 'Mine_O2': Mine_O2, 'Mine_T1': Mine_T1, 'Mine_T2': Mine_T2, 'Mine_G1': Mine_G1}
+
+
+class FreeCellIndex:
+    # Empty cells of a rectangle of the grid kept in a dense array, plus the
+    # slot of each cell in that array, so uniform sampling, adding and
+    # removing a cell are all O(1) (removal moves the last cell into the hole)
+    def __init__(self, grid: list[list], min_x: int, min_y: int, max_x: int, max_y: int):
+        self.min_x, self.min_y = min_x, min_y
+        self.max_x, self.max_y = max_x, max_y
+        self.region_height = max(0, max_y - min_y + 1)
+        area = max(0, max_x - min_x + 1) * self.region_height
+        self.slots = array('i', [-1]) * area
+        self.cells = array('i')
+        for x in range(min_x, max_x + 1):
+            grid_column = grid[x]
+            base = (x - min_x) * self.region_height
+            if grid_column[min_y:max_y + 1].count(None) == self.region_height:
+                # Fully free column (most of a new map): added with slices
+                first = len(self.cells)
+                self.cells.extend(range(base, base + self.region_height))
+                self.slots[base:base + self.region_height] = array('i', range(first, first + self.region_height))
+                continue
+            for y in range(min_y, max_y + 1):
+                if grid_column[y] is None:
+                    self.add(x, y)
+
+    def __len__(self):
+        return len(self.cells)
+
+    def contains(self, x: int, y: int):
+        return self.min_x <= x <= self.max_x and self.min_y <= y <= self.max_y
+
+    def add(self, x: int, y: int):
+        local = (x - self.min_x) * self.region_height + (y - self.min_y)
+        if self.slots[local] == -1:
+            self.slots[local] = len(self.cells)
+            self.cells.append(local)
+
+    def remove(self, x: int, y: int):
+        local = (x - self.min_x) * self.region_height + (y - self.min_y)
+        slot = self.slots[local]
+        if slot == -1:
+            return
+        last = self.cells.pop()
+        if last != local:
+            self.cells[slot] = last
+            self.slots[last] = slot
+        self.slots[local] = -1
+
+    def sample(self):
+        # A uniformly random free cell, or None if there is none
+        if not self.cells:
+            return None
+        local = self.cells[random.randrange(len(self.cells))]
+        return (self.min_x + local // self.region_height, self.min_y + local % self.region_height)
+
 
 class MapManager:
     def __init__(self, player1_strategy: Strategy, player2_strategy: Strategy, width=50, height=50):
@@ -18,10 +84,66 @@ class MapManager:
         self.height = height
         self.grid = [[None for _ in range(self.height)] for _ in range(self.width)]
         self.mines = []
-        self.danger_zones = [[False for _ in range(self.height)] for _ in range(self.width)]
+        self.danger_map = DangerMap(self.width, self.height)
+        self.danger_zones = self.danger_map.zones
         self.current_game_folder = None
         self.explosions = []
         self.current_turn = 0
+        # Item distance fields shared by every vehicle of the same capability
+        # class ('only_persons', 'exclude_persons' or 'any'). They are built on
+        # first use and repaired around the cells that change between turns
+        self.item_fields = {}
+        # Distance to each team's base column, keyed by the column, kept up
+        # to date the same way
+        self.base_fields = {}
+        # Point-to-point search engine: 'flat' searches the whole grid,
+        # 'hierarchical' uses the HPA* cluster graph, 'auto' picks the
+        # hierarchical one on large maps. The cluster graph is built on
+        # first use and only its clusters with changed cells are rebuilt
+        self.path_engine = 'auto'
+        self.hierarchy = None
+        # Connected components of the cells outside every mine for
+        # reachability checks. Vehicles move every turn and are left out, so
+        # the index is only rebuilt after the mine layer changes
+        self.components = None
+        self.components_key = None
+        # Walkable and target masks of the vectorized search backend, only
+        # the changed cells are read again (see get_walkable_mask)
+        self.walkable_mask = None
+        # Mine coverage indexes for timing-aware checks, with the mine radii
+        # they were built for (see get_mine_coverages)
+        self.mine_coverages = None
+        # Scratch values strategies share while planning the current turn
+        # (keyed by the strategy), emptied when the turn advances or the
+        # grid changes
+        self.turn_cache = {}
+        # Items lying on the grid by type (class name -> positions), mines by
+        # position, and running counts of the items on the grid, in cargo and
+        # under vehicles. Kept up to date by set_cell, set_under_item and
+        # record_cargo, so nothing needs to scan the whole grid for them
+        # (vehicles check mines_by_position before every step)
+        self.item_positions = {item_type: set() for item_type in ITEM_TYPES}
+        self.mines_by_position = {}
+        self.item_counts = {'grid': 0, 'cargo': 0, 'under': 0}
+        # Monotonic counter bumped on every state change, and the cells that
+        # changed since the current turn started. Consumers (game-over check,
+        # renderer, search caches) compare versions to skip work when nothing
+        # changed
+        self.state_version = 0
+        self.changed_cells = set()
+        self.game_over_cache = None
+        # Free cell indexes for random placement, one per (margin_x,
+        # margin_y) asked for, built on first use and updated by set_cell
+        self.free_cells = {}
+        # Save journal of the current game folder, opened on first use, and
+        # the background writer when saves are asynchronous
+        self.journal = None
+        self.save_writer = None
+        self.exit_hook = False
+        # Recent turns in memory for instant stepping, and the last turn
+        # saved in this game (turns up to it can be stepped to, not replayed)
+        self.history = TurnHistory()
+        self.latest_turn = -1
         
         # Game statistics tracking
         self.game_stats = {
@@ -58,20 +180,31 @@ class MapManager:
         self.initial_vehicles = {'player1': [], 'player2': []}
                 
     def get_empty_cell(self, margin_x=1, margin_y=0):
-        pos_x = random.randint(margin_x, self.width - 1 - margin_x)
-        pos_y = random.randint(margin_y, self.height - 1 - margin_y)
-        while self.grid[pos_x][pos_y] is not None:
-            pos_x = random.randint(margin_x, self.width - 1 - margin_x)
-            pos_y = random.randint(margin_y, self.height - 1 - margin_y)
-        return (pos_x, pos_y)
+        # Uniformly random empty cell at least margin_x / margin_y cells away
+        # from the map edges. Raises ValueError when there is none
+        free_cells = self.free_cells.get((margin_x, margin_y))
+        if free_cells is None:
+            free_cells = FreeCellIndex(self.grid, margin_x, margin_y, self.width - 1 - margin_x, self.height - 1 - margin_y)
+            self.free_cells[(margin_x, margin_y)] = free_cells
+        position = free_cells.sample()
+        if position is None:
+            raise ValueError(f"No empty cell left with margins ({margin_x}, {margin_y})")
+        return position
 
     def clear(self):
-        for x in range(self.width):
-            for y in range(self.height):
-                self.grid[x][y] = None
+        # A fresh grid, so a new width / height (scenario, loaded game) applies
+        self.grid = [[None for _ in range(self.height)] for _ in range(self.width)]
         
         self.mines = []
-        self.danger_zones = [[False for _ in range(self.height)] for _ in range(self.width)]
+        self.item_positions = {item_type: set() for item_type in ITEM_TYPES}
+        self.mines_by_position = {}
+        self.item_counts = {'grid': 0, 'cargo': 0, 'under': 0}
+        self.free_cells = {}
+        self.danger_map = DangerMap(self.width, self.height)
+        self.danger_zones = self.danger_map.zones
+        self.mine_coverages = None
+        self.invalidate_search_caches()
+        self.mark_changed()
         
         try:
             self.player1.vehicles = []
@@ -82,6 +215,227 @@ class MapManager:
         except Exception:
             pass
     
+    def mark_changed(self, cells=()):
+        # Records a state change, with the cells it touched if any
+        self.state_version += 1
+        self.changed_cells.update(cells)
+
+    def set_cell(self, position: tuple[int, int], grid_object):
+        # Single entry point for grid writes, keeps the item and mine indexes
+        # in step with the grid
+        x, y = position
+        previous = self.grid[x][y]
+        if previous is grid_object:
+            return
+        if isinstance(previous, Item):
+            self.item_positions.setdefault(previous.__class__.__name__, set()).discard(position)
+            self.item_counts['grid'] -= 1
+        elif isinstance(previous, Mine):
+            self.mines_by_position.pop(position, None)
+        if isinstance(grid_object, Item):
+            self.item_positions.setdefault(grid_object.__class__.__name__, set()).add(position)
+            self.item_counts['grid'] += 1
+        elif isinstance(grid_object, Mine):
+            self.mines_by_position[position] = grid_object
+        if previous is None or grid_object is None:
+            for free_cells in self.free_cells.values():
+                if free_cells.contains(x, y):
+                    if grid_object is None:
+                        free_cells.add(x, y)
+                    else:
+                        free_cells.remove(x, y)
+        self.grid[x][y] = grid_object
+        self.mark_changed((position,))
+
+    def set_under_item(self, vehicle: Vehicle, item):
+        # Item a vehicle stands on without picking it up (None to clear)
+        if vehicle.under_item is not None:
+            self.item_counts['under'] -= 1
+        vehicle.under_item = item
+        if item is not None:
+            self.item_counts['under'] += 1
+        self.mark_changed()
+
+    def record_cargo(self, delta: int):
+        # Items loaded (positive) or unloaded / lost (negative) by vehicles
+        self.item_counts['cargo'] += delta
+        self.mark_changed()
+
+    def recount_vehicle_items(self):
+        # Rebuilds the cargo and under-vehicle counts after vehicles are
+        # created in bulk (new or loaded game)
+        vehicles = list(self.player1.vehicles) + list(self.player2.vehicles)
+        self.item_counts['cargo'] = sum(len(vehicle.load) for vehicle in vehicles)
+        self.item_counts['under'] = sum(1 for vehicle in vehicles if vehicle.under_item is not None)
+
+    def get_item_positions(self):
+        # Positions of every item lying on the grid
+        positions = []
+        for item_positions in self.item_positions.values():
+            positions.extend(item_positions)
+        return positions
+
+    def invalidate_search_caches(self, changed_cells=None):
+        # changed_cells lists the cells whose danger or content changed, the
+        # cached fields repair just those on their next use. None means the
+        # whole map may have changed and every field is dropped
+        self.turn_cache = {}
+        if changed_cells is None:
+            self.item_fields = {}
+            self.base_fields = {}
+            self.hierarchy = None
+            self.components = None
+            self.walkable_mask = None
+            return
+        for field in list(self.item_fields.values()) + list(self.base_fields.values()):
+            field.mark_changed(changed_cells)
+        if self.hierarchy is not None:
+            self.hierarchy.mark_changed(changed_cells)
+        if self.walkable_mask is not None:
+            self.walkable_mask.mark_changed(changed_cells)
+
+    def get_components(self):
+        key = (self.danger_map, self.danger_map.mine_version)
+        if self.components is None or self.components_key != key:
+            self.components = ComponentIndex(self.grid, self.danger_map.mine_counts)
+            self.components_key = key
+        return self.components
+
+    def get_walkable_mask(self):
+        # None when the vectorized backend is not used on this map
+        if not use_vectorized(self.grid):
+            return None
+        if self.walkable_mask is None:
+            self.walkable_mask = WalkableMask(self.grid, self.danger_zones)
+        return self.walkable_mask.update(self.grid, self.danger_zones)
+
+    def uses_hierarchy(self):
+        if self.path_engine == 'auto':
+            return self.width * self.height >= HIERARCHICAL_MIN_CELLS
+        return self.path_engine == 'hierarchical'
+
+    def get_hierarchy(self):
+        # Built over the live grid and danger zones; a new grid or danger
+        # map (new game, loaded turn) needs a new cluster graph
+        hierarchy = self.hierarchy
+        if hierarchy is None or hierarchy.grid is not self.grid or hierarchy.danger_zones is not self.danger_zones:
+            self.hierarchy = hierarchy = HierarchicalMap(self.grid, self.danger_zones)
+        return hierarchy
+
+    def find_path(self, start: tuple[int, int], goal: tuple[int, int]):
+        # Path to a known goal cell around danger zones and mines (the goal
+        # itself may be entered): the configured pathfinding.search_method
+        # on the flat grid, the cluster graph on large maps
+        if self.uses_hierarchy():
+            return self.get_hierarchy().find_path(start, goal)
+        return bfs(self.grid, start, goal, danger_zones=self.danger_zones)
+
+    def find_path_to_nearest(self, start: tuple[int, int], goals):
+        # Path to the closest of the goal cells around danger zones and
+        # mines (the goal cells themselves may be entered), with a single
+        # search in both engines
+        if not self.uses_hierarchy():
+            return find_nearest_goal(self.grid, start, goals, self.danger_zones)
+        return self.get_hierarchy().find_nearest_path(start, goals)
+
+    def get_item_field(self, only_persons: bool = False, exclude_persons: bool = False):
+        if only_persons:
+            key = 'only_persons'
+        elif exclude_persons:
+            key = 'exclude_persons'
+        else:
+            key = 'any'
+        field = self.item_fields.get(key)
+        if field is None:
+            # Sources are the target items outside of the danger zones
+            def is_item_source(grid, danger_zones, x, y):
+                return not danger_zones[x][y] and matches_target(grid[x][y], only_persons, exclude_persons)
+            field = IncrementalField(self.grid, self.danger_zones, is_item_source)
+            self.item_fields[key] = field
+        return field.update(self.grid, self.danger_zones)
+
+    def get_base_field(self, team: Player):
+        base_x = 0 if self.player1 is team else self.width - 1
+        field = self.base_fields.get(base_x)
+        if field is None:
+            # Seeded from every walkable cell of the base column
+            def is_base_source(grid, danger_zones, x, y):
+                return x == base_x and not danger_zones[x][y] and not isinstance(grid[x][y], Mine)
+            field = IncrementalField(self.grid, self.danger_zones, is_base_source)
+            self.base_fields[base_x] = field
+        return field.update(self.grid, self.danger_zones)
+
+    def get_mine_coverages(self):
+        # Returns (other_mines, active_g1, inactive_g1): coverage of every
+        # non-G1 mine at its current radii, and of the full (radius 7) area of
+        # the G1 mines that are currently on / off. Rebuilt only when a mine
+        # changes radii, and read live so a toggle made this turn is seen
+        signature = tuple((mine.x_radius, mine.y_radius) for mine in self.mines)
+        if self.mine_coverages is None or self.mine_coverages[0] != signature:
+            max_radius = 7
+            other_mines = [mine for mine in self.mines if not isinstance(mine, Mine_G1)]
+            active_g1 = [mine for mine in self.mines if isinstance(mine, Mine_G1) and mine.x_radius > 0 and mine.y_radius > 0]
+            inactive_g1 = [mine for mine in self.mines if isinstance(mine, Mine_G1) and not (mine.x_radius > 0 and mine.y_radius > 0)]
+            coverages = (
+                MineCoverage.from_mines(self.width, self.height, other_mines),
+                MineCoverage.from_mines(self.width, self.height, active_g1, radius=max_radius),
+                MineCoverage.from_mines(self.width, self.height, inactive_g1, radius=max_radius),
+            )
+            self.mine_coverages = (signature, coverages)
+        return self.mine_coverages[1]
+
+    def turns_until_g1_toggle(self):
+        # Steps from now until the G1 mines toggle (1 to G1_TOGGLE_INTERVAL)
+        turns_until_toggle = (G1_TOGGLE_INTERVAL - ((self.current_turn + 1) % G1_TOGGLE_INTERVAL)) % G1_TOGGLE_INTERVAL
+        if turns_until_toggle == 0:
+            turns_until_toggle = G1_TOGGLE_INTERVAL
+        return turns_until_toggle
+
+    def get_phase_danger(self, mine_buffer: int = 0, g1_buffer: int = 0, with_obstacles: bool = False):
+        # Cells inside a mine at each phase of the G1 schedule: a list of
+        # G1_PERIOD flat bitmaps (index x * height + y) where the bitmap for
+        # turn t is phase_danger[t % G1_PERIOD]. Non-G1 mines count at their
+        # radii and G1 mines with their full area while they are on, both
+        # widened by the given safety buffers. with_obstacles also marks the
+        # cells a vehicle cannot enter right now (mines and other vehicles).
+        # A path step taken `step` turns from now is checked with one lookup
+        key = ('phase_danger', mine_buffer, g1_buffer, with_obstacles)
+        phase_danger = self.turn_cache.get(key)
+        if phase_danger is None:
+            if mine_buffer == 0 and g1_buffer == 0:
+                other_mines, active_g1, inactive_g1 = self.get_mine_coverages()
+            else:
+                max_radius = 7
+                g1_mines = [mine for mine in self.mines if isinstance(mine, Mine_G1)]
+                other_mines = MineCoverage(self.width, self.height, [
+                    mine_rectangle(mine.position, mine.x_radius + mine_buffer, mine.y_radius + mine_buffer, self.width, self.height)
+                    for mine in self.mines if not isinstance(mine, Mine_G1)
+                ])
+                active_g1 = MineCoverage.from_mines(self.width, self.height,
+                    [mine for mine in g1_mines if mine.x_radius > 0 and mine.y_radius > 0], radius=max_radius + g1_buffer)
+                inactive_g1 = MineCoverage.from_mines(self.width, self.height,
+                    [mine for mine in g1_mines if not (mine.x_radius > 0 and mine.y_radius > 0)], radius=max_radius + g1_buffer)
+            bitmaps = []
+            for g1_coverage in (active_g1, inactive_g1):
+                bitmap = bytearray()
+                for other_column, g1_column in zip(other_mines.counts, g1_coverage.counts):
+                    bitmap.extend(1 if other or g1 else 0 for other, g1 in zip(other_column, g1_column))
+                if with_obstacles:
+                    for mine in self.mines:
+                        bitmap[mine.position[0] * self.height + mine.position[1]] = 1
+                    for vehicle in list(self.player1.vehicles) + list(self.player2.vehicles):
+                        bitmap[vehicle.position[0] * self.height + vehicle.position[1]] = 1
+                bitmaps.append(bitmap)
+            as_now, toggled = bitmaps
+            turns_until_toggle = self.turns_until_g1_toggle()
+            phase_danger = [as_now] * G1_PERIOD
+            for offset in range(G1_PERIOD):
+                toggles = 0 if offset < turns_until_toggle else 1 + (offset - turns_until_toggle) // G1_TOGGLE_INTERVAL
+                if toggles % 2:
+                    phase_danger[(self.current_turn + offset) % G1_PERIOD] = toggled
+            self.turn_cache[key] = phase_danger
+        return phase_danger
+
     def _get_next_game_folder(self):
         base_directory = "saved_games"
         if not os.path.exists(base_directory):
@@ -105,21 +459,31 @@ class MapManager:
         return new_path
 
     def save_game(self, turn_number):
+        game_state = self.snapshot_state(turn_number)
+        self.history.put(turn_number, game_state)
+        self.latest_turn = turn_number
+        # Danger zones are not saved, they are rebuilt from mines and
+        # vehicles on load
+        if self.save_writer is not None:
+            return self.save_writer.submit(self._open_journal(), turn_number, game_state)
+        return self._open_journal().write(turn_number, game_state)
+
+    def snapshot_state(self, turn_number):
+        # The game as plain dicts, lists and tuples: what save_game stores.
+        # Derived state (danger zones, capacities, item values) is left out
         def serialize_item(item):
             return {
                 'type': item.__class__.__name__,
-                'position': item.position,
-                'value': getattr(item, 'value', None)
+                'position': item.position
             }
 
         def serialize_vehicle(vehicle):
             return {
                 'type': vehicle.__class__.__name__,
                 'position': vehicle.position,
-                'capacity': vehicle.capacity,
-                'only_persons': vehicle.only_persons,
                 'path': list(getattr(vehicle, 'path', [])),
                 'state': getattr(vehicle, 'state', 'idle'),
+                'strategy': type(vehicle.strategy).__name__ if getattr(vehicle, 'strategy', None) is not None else None,
                 'load': [serialize_item(it) for it in getattr(vehicle, 'load', [])],
                 'under_item': serialize_item(getattr(vehicle, 'under_item', None)) if getattr(vehicle, 'under_item', None) is not None else None
             }
@@ -136,7 +500,6 @@ class MapManager:
             'turn': turn_number,
             'width': self.width,
             'height': self.height,
-            'danger_zones': self.danger_zones,
             'explosions': [ {'pos': explosion.get('pos'), 'ttl': int(explosion.get('ttl',0))} for explosion in getattr(self, 'explosions', []) ],
             'player1': {
                 'points': getattr(self.player1, 'points', 0),
@@ -151,46 +514,116 @@ class MapManager:
         }
 
         # Collect standalone items from the grid (not part of vehicles or mines)
-        for x in range(self.width):
-            for y in range(self.height):
-                grid_object = self.grid[x][y]
-                if isinstance(grid_object, Vehicle) or isinstance(grid_object, Mine):
-                    continue
-                if grid_object is not None:
-                    try:
-                        from classes.Item import Item as _Item
-                    except Exception:
-                        _Item = None
-                    if _Item is not None and isinstance(grid_object, _Item):
-                        game_state['items'].append(serialize_item(grid_object))
+        for x, y in sorted(self.get_item_positions()):
+            game_state['items'].append(serialize_item(self.grid[x][y]))
 
-        if self.current_game_folder is None:
-            self.current_game_folder = self._get_next_game_folder()
-        if not os.path.exists(self.current_game_folder):
-            os.makedirs(self.current_game_folder, exist_ok=True)
+        return game_state
+
+    def has_turn(self, turn: int):
+        # Whether the turn was already played and saved in this game
+        return 0 <= turn <= self.latest_turn
+
+    def step_to_turn(self, turn: int):
+        # Goes to an already played turn: from memory when possible, else
+        # from the replay file. Nothing is simulated again
+        game_state = self.history.get(turn)
+        if game_state is not None:
+            return self.restore_state(game_state)
+        journal = self.get_journal()
+        if journal.has_turn(turn):
+            return self.load_game(journal.path, turn)
+        print(f"❌ - TURN NOT FOUND IN SAVED GAME: {turn}")
+        return False
+
+    def enable_background_saves(self):
+        # save_game hands its snapshot to a writer thread from now on. The
+        # pending saves are flushed at exit at the latest
+        if self.save_writer is None:
+            self.save_writer = JournalWriter()
+            self._register_exit_hook()
+        return self.save_writer
+
+    def _register_exit_hook(self):
+        if not self.exit_hook:
+            atexit.register(self.close_saves)
+            self.exit_hook = True
+
+    def flush_saves(self):
+        if self.save_writer is not None:
+            self.save_writer.flush()
 
-        filename = os.path.join(self.current_game_folder, f"turn_{turn_number}.pkl")
-        with open(filename, 'wb') as file:
-            pickle.dump(game_state, file)
+    def close_saves(self):
+        # Flushes and stops the background writer, then stores the replay
+        # turn index. Returns the writer metrics, if there was a writer
+        metrics = None
+        if self.save_writer is not None:
+            self.save_writer.close()
+            metrics = self.save_writer.get_metrics()
+            self.save_writer = None
+        if self.journal is not None:
+            self.journal.close()
+        return metrics
 
-        return filename
+    def get_journal(self):
+        # Pending background saves are written first, so the journal index
+        # is up to date for the caller
+        self.flush_saves()
+        return self._open_journal()
+
+    def _open_journal(self):
+        if self.current_game_folder is None:
+            self.current_game_folder = self._get_next_game_folder()
+        if self.journal is None or os.path.abspath(self.journal.folder) != os.path.abspath(self.current_game_folder):
+            if self.journal is not None:
+                self.flush_saves()
+                self.journal.close()
+            self.journal = TurnJournal(self.current_game_folder)
+            self._register_exit_hook()
+        return self.journal
 
     def load_game(self, filename: str, turn: int):
+        # filename is a game folder or its replay file. Games saved as one
+        # turn_N.pkl file per turn are converted first (see legacy_saves.py),
+        # pickles are never loaded here
+        previous_folder = self.current_game_folder
         try:
-            with open(filename, 'rb') as file:
-                game_state = pickle.load(file)
+            if filename.endswith('.pkl'):
+                raise ValueError(f"{filename} is in the old pickle format, convert its game with --convert-legacy")
+            game_folder = filename if os.path.isdir(filename) else os.path.dirname(filename)
+            self.current_game_folder = game_folder
+            journal = self.get_journal()
+            game_state = journal.read(turn)
+            if game_state is None:
+                raise ValueError(f"turn {turn} not found in {journal.path}")
+            saved_turns = journal.turns()
         except Exception as error:
+            self.current_game_folder = previous_folder
             print(f"❌ - ERROR LOADING SAVED GAME FILE: {error}")
             return False
 
+        # Another game: the history and the last saved turn of the previous
+        # one no longer apply
+        if previous_folder is None or os.path.abspath(previous_folder) != os.path.abspath(game_folder):
+            self.history.clear()
+        self.latest_turn = max(saved_turns) if saved_turns else turn
+        self.current_game_folder = game_folder
+        return self.restore_state(game_state)
+
+    def restore_state(self, game_state: dict):
+        # Rebuilds the game from a snapshot_state() dict
         try:
-            self.current_game_folder = os.path.dirname(os.path.abspath(filename))
-            
+            self.current_turn = game_state.get('turn', self.current_turn)
+            # Stepping through the same game keeps the same map and mines:
+            # the mine objects and the danger map are then reused, so only the
+            # danger cells that differ are updated instead of all of them
+            same_size = (game_state.get('width', self.width), game_state.get('height', self.height)) == (self.width, self.height)
+            reusable_mines = {(type(mine).__name__, mine.position): mine for mine in self.mines} if same_size else {}
+            previous_mines = set(self.mines)
+            previous_danger_map = self.danger_map
             self.width = game_state.get('width', self.width)
             self.height = game_state.get('height', self.height)
 
             self.clear()
-            self.danger_zones = game_state.get('danger_zones', self.danger_zones)
 
             def create_item(item_data):
                 item_type = item_data.get('type')
@@ -207,6 +640,14 @@ class MapManager:
                     return Heal(position)
                 return None
 
+            def create_strategy(strategy_name):
+                # Strategies hold no state, a new instance per vehicle is enough
+                import strategies
+                strategy_class = getattr(strategies, strategy_name, None) if strategy_name else None
+                if isinstance(strategy_class, type) and issubclass(strategy_class, Strategy):
+                    return strategy_class()
+                return None
+
             def create_vehicle(vehicle_data, team):
                 vehicle_type = vehicle_data.get('type')
                 position = tuple(vehicle_data.get('position', (0, 0)))
@@ -221,7 +662,7 @@ class MapManager:
                     vehicle_class = Motorcycle
                 if vehicle_class is None:
                     return None
-                vehicle = vehicle_class(team, position)
+                vehicle = vehicle_class(team, position, strategy=create_strategy(vehicle_data.get('strategy')))
                 vehicle.load = []
                 for item in vehicle_data.get('load', []):
                     item_object = create_item(item)
@@ -246,8 +687,10 @@ class MapManager:
             for mine_data in mines_data:
                 mine_type = mine_data.get('type')
                 mine_position = tuple(mine_data.get('position', (0, 0)))
-                mine_object = None
-                if mine_type == 'Mine_O1':
+                mine_object = reusable_mines.pop((mine_type, mine_position), None)
+                if mine_object is not None:
+                    pass
+                elif mine_type == 'Mine_O1':
                     mine_object = Mine_O1(mine_position)
                 elif mine_type == 'Mine_O2':
                     mine_object = Mine_O2(mine_position)
@@ -268,14 +711,15 @@ class MapManager:
                     except Exception:
                         pass
                     self.mines.append(mine_object)
-                    x, y = mine_object.position
-                    self.grid[x][y] = mine_object
+                    self.set_cell(mine_object.position, mine_object)
+            if previous_mines and set(self.mines) == previous_mines:
+                self.danger_map = previous_danger_map
+                self.danger_zones = previous_danger_map.zones
 
             for item_data in game_state.get('items', []):
                 item_object = create_item(item_data)
                 if item_object is not None:
-                    x, y = item_object.position
-                    self.grid[x][y] = item_object
+                    self.set_cell(tuple(item_object.position), item_object)
 
             try:
                 self.explosions = []
@@ -299,20 +743,19 @@ class MapManager:
                 vehicle = create_vehicle(vehicle_data, self.player1)
                 if vehicle is not None:
                     self.player1.add_vehicle(vehicle)
-                    x, y = vehicle.position
-                    self.grid[x][y] = vehicle
+                    self.set_cell(vehicle.position, vehicle)
             for vehicle_data in game_state.get('player2', {}).get('vehicles', []):
                 vehicle = create_vehicle(vehicle_data, self.player2)
                 if vehicle is not None:
                     self.player2.add_vehicle(vehicle)
-                    x, y = vehicle.position
-                    self.grid[x][y] = vehicle
+                    self.set_cell(vehicle.position, vehicle)
+            self.recount_vehicle_items()
 
             self.update_danger_zones()
 
             return True
         except Exception as error:
-            print(f"❌ - ERROR RESTORING GAME STATE FROM FILE: {error}")
+            print(f"❌ - ERROR RESTORING GAME STATE: {error}")
             return False
 
     def new_game(self):
@@ -320,10 +763,17 @@ class MapManager:
         
         self.game_stats['start_time'] = datetime.now()
         self.current_turn = 0
+        self.history.clear()
+        self.latest_turn = -1
         
         if self.current_game_folder is None:
             self.current_game_folder = self._get_next_game_folder()
         
+        scenario = load_scenario()
+        if (scenario['width'], scenario['height']) != (self.width, self.height):
+            self.width, self.height = scenario['width'], scenario['height']
+            self.clear()
+
         vehicles_player1 = []
         vehicles_player2 = []
         try:
@@ -349,8 +799,17 @@ class MapManager:
             }
             
             players_config = config.get('players', {})
-            
-            player1_config = players_config.get('player1', {}).get('vehicles', [])
+            if scenario['fleet'] is not None:
+                # Generated fleet: the same layout for both players
+                fleet_config = [
+                    {'type': vehicle_type, 'strategy': strategy_name, 'y_position': y_position}
+                    for vehicle_type, strategy_name, y_position in fleet_layout(scenario['fleet'], self.height)
+                ]
+                player1_config = player2_config = fleet_config
+            else:
+                player1_config = players_config.get('player1', {}).get('vehicles', [])
+                player2_config = players_config.get('player2', {}).get('vehicles', [])
+
             for vehicle_config in player1_config:
                 vehicle_type = vehicle_config.get('type', 'Car')
                 strategy_name = vehicle_config.get('strategy', 'PickNearest')
@@ -366,7 +825,6 @@ class MapManager:
                     'strategy': strategy
                 })
             
-            player2_config = players_config.get('player2', {}).get('vehicles', [])
             for vehicle_config in player2_config:
                 vehicle_type = vehicle_config.get('type', 'Car')
                 strategy_name = vehicle_config.get('strategy', 'PickNearest')
@@ -389,7 +847,10 @@ class MapManager:
                 (Truck, 2), (Car, 7), (Jeep, 12), (Motorcycle, 17), (Jeep, 22),
                 (Car, 27), (Truck, 32), (Car, 37), (Motorcycle, 42), (Jeep, 47)
             ]
+            vehicles_player1, vehicles_player2 = [], []
             for vehicle_class, y_position in default_vehicles:
+                if y_position >= self.height:
+                    continue
                 vehicles_player1.append({
                     'class': vehicle_class,
                     'position': (0, y_position),
@@ -423,8 +884,7 @@ class MapManager:
                 strategy=vehicle_data['strategy']
             )
             self.player1.add_vehicle(vehicle)
-            x, y = vehicle.position
-            self.grid[x][y] = vehicle
+            self.set_cell(vehicle.position, vehicle)
 
         for vehicle_data in vehicles_player2:
             vehicle = vehicle_data['class'](
@@ -433,30 +893,52 @@ class MapManager:
                 strategy=vehicle_data['strategy']
             )
             self.player2.add_vehicle(vehicle)
-            x, y = vehicle.position
-            self.grid[x][y] = vehicle
-
-        self.mines.append(Mine_O1(self.get_empty_cell(11, 10)))
-        self.mines.append(Mine_O2(self.get_empty_cell(6, 5)))
-        self.mines.append(Mine_T1(self.get_empty_cell(11)))
-        self.mines.append(Mine_T2(self.get_empty_cell(2, 5)))
-        self.mines.append(Mine_G1(self.get_empty_cell(8)))
-        for mine in self.mines:
-            x, y = mine.position
-            self.grid[x][y] = mine
+            self.set_cell(vehicle.position, vehicle)
+        self.recount_vehicle_items()
+
+        # Each object is placed as soon as its cell is drawn, so the free cell
+        # indexes never hand out the same cell twice. When the map runs out of
+        # free cells the rest of that kind is dropped and reported
+        for mine_type, count in scenario['mines'].items():
+            mine_class = MINE_CLASSES.get(mine_type)
+            if mine_class is None:
+                print(f"❌ - ERROR UNKNOWN MINE TYPE IN SCENARIO: {mine_type}, SKIPPING")
+                continue
+            margins = mine_margins(mine_type, self.width, self.height)
+            for placed in range(int(count)):
+                try:
+                    mine = mine_class(self.get_empty_cell(*margins))
+                except ValueError:
+                    print(f"❌ - ERROR IN SCENARIO MINES: NO EMPTY CELL LEFT FOR {mine_type.upper()}, PLACING {placed} OF {int(count)}")
+                    break
+                self.mines.append(mine)
+                self.set_cell(mine.position, mine)
 
         self.update_danger_zones()
 
-        items = []
-        for _ in range(10):
-            items.append(Person(self.get_empty_cell()))
-        item_choices = [Weapon, Clothing, Food, Heal]
-        for _ in range(50):
-            item_class = random.choice(item_choices)
-            items.append(item_class(self.get_empty_cell()))
-        for item in items:
-            x, y = item.position
-            self.grid[x][y] = item
+        for item_type, count in item_counts(scenario).items():
+            item_class = ITEM_CLASSES.get(item_type)
+            if item_class is None:
+                print(f"❌ - ERROR UNKNOWN ITEM TYPE IN SCENARIO: {item_type}, SKIPPING")
+                continue
+            for placed in range(count):
+                try:
+                    item = item_class(self.get_empty_cell())
+                except ValueError:
+                    print(f"❌ - ERROR IN SCENARIO ITEMS: NO EMPTY CELL LEFT FOR {item_type.upper()}, PLACING {placed} OF {count}")
+                    break
+                self.set_cell(item.position, item)
+        item_choices = [ITEM_CLASSES[item_type] for item_type in scenario['random_item_types'] if item_type in ITEM_CLASSES]
+        if item_choices:
+            for placed in range(int(scenario['random_items'])):
+                item_class = random.choice(item_choices)
+                try:
+                    item = item_class(self.get_empty_cell())
+                except ValueError:
+                    print(f"❌ - ERROR IN SCENARIO ITEMS: NO EMPTY CELL LEFT FOR RANDOM ITEMS, PLACING {placed} OF {int(scenario['random_items'])}")
+                    break
+                self.set_cell(item.position, item)
+        self.invalidate_search_caches()
         
         self.initial_vehicles = {'player1': [], 'player2': []}
         for vehicle in self.player1.vehicles:
@@ -479,28 +961,28 @@ class MapManager:
         
         return
 
-    def update_danger_zones(self):
-        self.danger_zones = [[False for _ in range(self.height)] for _ in range(self.width)]
-
-        for x in range(self.width):
-            for y in range(self.height):
-                grid_object = self.grid[x][y]
-                if isinstance(grid_object, Mine):
-                    mine_x, mine_y = grid_object.position
-                    for delta_x in range(-grid_object.x_radius, grid_object.x_radius + 1):
-                        for delta_y in range(-grid_object.y_radius, grid_object.y_radius + 1):
-                            new_x = mine_x + delta_x
-                            new_y = mine_y + delta_y
-                            if 0 <= new_x < self.width and 0 <= new_y < self.height:
-                                self.danger_zones[new_x][new_y] = True
-                if isinstance(grid_object, Vehicle):
-                    vehicle_x, vehicle_y = grid_object.position
-                    self.danger_zones[vehicle_x][vehicle_y] = True
+    def update_danger_zones(self, full_refresh: bool = True):
+        # Only mines whose radii changed (Mine_G1 toggles) and vehicles that
+        # moved or died since the last update are restamped. Without a full
+        # refresh the search caches only repair the cells changed this turn
+        # (danger flips and every cell written through set_cell)
+        vehicles = list(self.player1.vehicles) + list(self.player2.vehicles)
+        flipped_cells = self.danger_map.sync(self.mines, vehicles)
+        self.danger_zones = self.danger_map.zones
+        if flipped_cells:
+            self.mark_changed(flipped_cells)
+        if full_refresh:
+            self.invalidate_search_caches()
+        else:
+            self.invalidate_search_caches(set(self.changed_cells))
     
     def next_turn(self, current_turn: int):
         self.current_turn = current_turn
+        self.turn_cache = {}
+        self.changed_cells = set()
+        self.mark_changed()
 
-        if (current_turn + 1) % 5 == 0:
+        if (current_turn + 1) % G1_TOGGLE_INTERVAL == 0:
             for mine in self.mines:
                 if isinstance(mine, Mine_G1):
                     mine.toggle()
@@ -536,7 +1018,7 @@ class MapManager:
                 except Exception:
                     pass
 
-        self.update_danger_zones()
+        self.update_danger_zones(full_refresh=False)
         self.check_collisions()
 
         try:
@@ -553,6 +1035,19 @@ class MapManager:
             vehicle.unload_if_at_base(self)
         return
     
+    def run_headless(self, max_turns: int = 1000):
+        # Advances turns without any rendering until the game is over or
+        # max_turns turns have been played. Returns the end reason, or None
+        # if the turn limit was reached first
+        last_turn = self.current_turn + max_turns
+        while self.current_turn < last_turn:
+            is_over, reason = self.is_game_over()
+            if is_over:
+                return reason
+            self.next_turn(self.current_turn + 1)
+        is_over, reason = self.is_game_over()
+        return reason if is_over else None
+
     def check_collisions(self):
         # Build a mapping from positions to vehicles occupying them
         vehicles = list(self.player1.vehicles) + list(self.player2.vehicles)
@@ -560,10 +1055,14 @@ class MapManager:
         for vehicle in vehicles:
             position_map.setdefault(vehicle.position, []).append(vehicle)
 
+        # Cells of destroyed vehicles (freed, or holding a restored item)
+        destroyed_cells = []
+
         # Remove vehicles that collided (more than one vehicle in same cell)
         for position, vehicles_at_position in list(position_map.items()):
             if len(vehicles_at_position) > 1:
                 cell_x, cell_y = position
+                destroyed_cells.append(position)
                 # Register a visual explosion when there's a collision (3 turns)
                 try:
                     self.explosions.append({'pos': (cell_x, cell_y), 'ttl': 3})
@@ -583,13 +1082,15 @@ class MapManager:
                             under_item = vehicle.under_item
                             try:
                                 under_item.position = (cell_x, cell_y)
-                                self.grid[cell_x][cell_y] = under_item
+                                self.set_cell((cell_x, cell_y), under_item)
                                 restored_item = True
                             except Exception:
                                 pass
-                            vehicle.under_item = None
+                            self.set_under_item(vehicle, None)
                     except Exception:
                         pass
+                    # Its cargo is lost with it
+                    self.record_cargo(-len(vehicle.load))
                     # Remove vehicle from its team's list
                     try:
                         if vehicle in vehicle.team.vehicles:
@@ -599,105 +1100,85 @@ class MapManager:
                 # If no item was restored above, make sure the grid cell is cleared
                 if not restored_item:
                     try:
-                        self.grid[cell_x][cell_y] = None
+                        self.set_cell((cell_x, cell_y), None)
                     except Exception:
                         pass
                 print(f"💥 - COLLISION ({position})")
                 vehicle_details = [f"{vehicle.__class__.__name__.upper()} - TEAM: {vehicle.team.name.upper()}" for vehicle in vehicles_at_position]
                 print(f"💥 - COLLISION VEHICLES: {vehicle_details}")
 
-        # Collect all mines on the grid
-        mines = []
-        for x in range(self.width):
-            for y in range(self.height):
-                grid_object = self.grid[x][y]
-                try:
-                    from classes.Mine import Mine as _Mine
-                except Exception:
-                    _Mine = None
-                if _Mine is not None and isinstance(grid_object, _Mine):
-                    mines.append(grid_object)
-
-        # Remove vehicles that are inside a mine radius
+        # Remove vehicles that are inside a mine radius. The danger map's
+        # mine layer was synced with the current radii right before this
+        # check, so a single lookup per vehicle is enough
         for vehicle in list(self.player1.vehicles) + list(self.player2.vehicles):
             vehicle_x, vehicle_y = vehicle.position
-            for mine in mines:
-                mine_x, mine_y = mine.position
-                if abs(vehicle_x - mine_x) <= mine.x_radius and abs(vehicle_y - mine_y) <= mine.y_radius:
-                    # Register mine death statistics
-                    player_key = 'player1_stats' if vehicle.team == self.player1 else 'player2_stats'
-                    self.game_stats[player_key]['mine_deaths'] += 1
-                    self.game_stats[player_key]['vehicles_lost'] += 1
-                    
-                    # Restore any item that was under the vehicle
+            if self.danger_map.mine_coverage(vehicle_x, vehicle_y) > 0:
+                destroyed_cells.append(vehicle.position)
+                # Register mine death statistics
+                player_key = 'player1_stats' if vehicle.team == self.player1 else 'player2_stats'
+                self.game_stats[player_key]['mine_deaths'] += 1
+                self.game_stats[player_key]['vehicles_lost'] += 1
+                
+                # Restore any item that was under the vehicle
+                restored_item = False
+                try:
+                    if getattr(vehicle, 'under_item', None) is not None:
+                        under_item = vehicle.under_item
+                        try:
+                            under_item.position = (vehicle_x, vehicle_y)
+                            self.set_cell((vehicle_x, vehicle_y), under_item)
+                            restored_item = True
+                        except Exception:
+                            restored_item = False
+                        self.set_under_item(vehicle, None)
+                except Exception:
                     restored_item = False
-                    try:
-                        if getattr(vehicle, 'under_item', None) is not None:
-                            under_item = vehicle.under_item
-                            try:
-                                under_item.position = (vehicle_x, vehicle_y)
-                                self.grid[vehicle_x][vehicle_y] = under_item
-                                restored_item = True
-                            except Exception:
-                                restored_item = False
-                            vehicle.under_item = None
-                    except Exception:
-                        restored_item = False
+                self.record_cargo(-len(vehicle.load))
 
-                    # Register a visual explosion for mine destruction (3 turns)
-                    try:
-                        self.explosions.append({'pos': (vehicle_x, vehicle_y), 'ttl': 3})
-                    except Exception:
-                        pass
+                # Register a visual explosion for mine destruction (3 turns)
+                try:
+                    self.explosions.append({'pos': (vehicle_x, vehicle_y), 'ttl': 3})
+                except Exception:
+                    pass
 
-                    # Remove vehicle from its team
-                    try:
-                        if vehicle in vehicle.team.vehicles:
-                            vehicle.team.vehicles.remove(vehicle)
-                    except Exception:
-                        pass
+                # Remove vehicle from its team
+                try:
+                    if vehicle in vehicle.team.vehicles:
+                        vehicle.team.vehicles.remove(vehicle)
+                except Exception:
+                    pass
 
-                    # If no item was restored, clear the grid cell
-                    try:
-                        if not restored_item:
-                            self.grid[vehicle_x][vehicle_y] = None
-                    except Exception:
-                        pass
-                    break
+                # If no item was restored, clear the grid cell
+                try:
+                    if not restored_item:
+                        self.set_cell((vehicle_x, vehicle_y), None)
+                except Exception:
+                    pass
+
+        # Destroyed vehicles may have freed cells or restored items
+        self.invalidate_search_caches(destroyed_cells)
 
     def is_game_over(self):
+        # Evaluated once per state version: callers polling every frame pay
+        # nothing until the state actually changes
+        if self.game_over_cache is not None and self.game_over_cache[0] == self.state_version:
+            return self.game_over_cache[1]
+        result = self._check_game_over()
+        self.game_over_cache = (self.state_version, result)
+        return result
+
+    def _check_game_over(self):
         # 1) No vehicles
         total_vehicles = len(getattr(self.player1, 'vehicles', [])) + len(getattr(self.player2, 'vehicles', []))
         if total_vehicles == 0:
             return True, 'no_vehicles'
 
-        # 2) No items (on grid or inside vehicles or stored under vehicles)
-        items_on_grid = []
-        for x in range(self.width):
-            for y in range(self.height):
-                grid_object = self.grid[x][y]
-                try:
-                    if Item is not None and isinstance(grid_object, Item):
-                        items_on_grid.append((x, y))
-                except Exception:
-                    pass
-
-        items_in_vehicles = 0
-        vehicles_with_load = []
+        # 2) No items (on grid or inside vehicles or stored under vehicles),
+        # read from the running counters
+        items_on_grid = self.get_item_positions()
+        items_in_vehicles = self.item_counts['cargo'] + self.item_counts['under']
+        vehicles_with_load = self.item_counts['cargo'] > 0
         vehicles = list(getattr(self.player1, 'vehicles', [])) + list(getattr(self.player2, 'vehicles', []))
-        for vehicle in vehicles:
-            try:
-                vehicle_load = len(getattr(vehicle, 'load', []))
-                items_in_vehicles += vehicle_load
-                if vehicle_load > 0:
-                    vehicles_with_load.append(vehicle)
-            except Exception:
-                pass
-            try:
-                if getattr(vehicle, 'under_item', None) is not None:
-                    items_in_vehicles += 1
-            except Exception:
-                pass
 
         if (len(items_on_grid) + items_in_vehicles) == 0:
             return True, 'no_items'
@@ -711,20 +1192,24 @@ class MapManager:
             # If no items on grid and no vehicles with cargo, game ends
             return True, 'no_items'
 
-        # Check if any vehicle can reach items on the grid
+        # Check if any vehicle can reach items on the grid: a vehicle reaches
+        # an item when both lie in the same walkable component
+        components = self.get_components()
+        item_labels = {}
         for vehicle in vehicles:
             try:
                 # Skip vehicles that are full
                 if len(getattr(vehicle, 'load', [])) >= getattr(vehicle, 'capacity', 0):
                     continue
-                # Choose pathfinder according to vehicle's capabilities
-                if find_nearest is None:
-                    continue
                 only_persons = getattr(vehicle, 'only_persons', False)
                 exclude_persons = getattr(vehicle, 'exclude_persons', False)
-                path = find_nearest(self.grid, vehicle.position, self.danger_zones, 
-                                  only_persons=only_persons, exclude_persons=exclude_persons)
-                if path is not None:
+                capability = (only_persons, exclude_persons)
+                if capability not in item_labels:
+                    item_labels[capability] = {
+                        components.label(x, y) for x, y in items_on_grid
+                        if matches_target(self.grid[x][y], only_persons, exclude_persons)
+                    } - {-1}
+                if components.labels_around(self.grid, vehicle.position) & item_labels[capability]:
                     # At least one vehicle can reach an on-grid item => not over
                     return False, None
             except Exception:
@@ -1,8 +1,62 @@
+import os
+import json
 from typing import Any
-from collections import deque
+from array import array
+import heapq
 from classes.Item import Item, Person
 from classes.Mine import Mine
 
+# Optional vectorized backend: with numpy installed, large maps compute whole
+# distance grids at once instead of expanding one cell at a time
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+# Cell counts where the vectorized wavefront beats the plain Python BFS,
+# measured on generated maps with the default densities (3 searches each):
+#   cells        find_farthest     find_path_to_column   distance_field
+#                flat  vectorized  flat  vectorized      flat  vectorized
+#   50x50        0.006  0.006      0.003  0.004          0.002  0.001
+#   70x70        0.014  0.009      0.009  0.006          0.004  0.002
+#   500x500      0.98   0.77       0.42   0.35           0.26   0.13
+#   600x600      1.63   1.13       0.66   0.58           0.29   0.15
+#   700x700      2.08   2.03       0.97   1.16           0.59   0.30
+#   1000x1000    4.86   6.39       2.04   3.07           1.30   1.15
+# Below the lower bound array setup dominates. The wavefront costs one pass
+# over the whole map per step of distance, so single-source searches fall
+# behind again on large maps; a multi-source distance field has short
+# distances and stays ahead longer
+VECTORIZED_MIN_CELLS = 5000
+VECTORIZED_MAX_CELLS = 360000
+VECTORIZED_FIELD_MAX_CELLS = 1000000
+
+def use_vectorized(grid: list[list[Any]], max_cells: int = VECTORIZED_MAX_CELLS):
+    return np is not None and VECTORIZED_MIN_CELLS <= len(grid) * len(grid[0]) <= max_cells
+
+DIRECTIONS = [(-1, 0), (1, 0), (0, -1), (0, 1)]
+
+# Point-to-point search methods, and the ones that also search for a column
+# (astar and bidirectional need a single goal cell, column searches fall
+# back to bfs for them)
+SEARCH_METHODS = ('bfs', 'astar', 'bidirectional', 'jps')
+COLUMN_SEARCH_METHODS = ('bfs', 'jps')
+
+# Default method of the point-to-point and to-column searches, read from
+# config.json ("pathfinding": {"search_method": "jps"}) so the engines can
+# be compared without editing code (see --benchmark-search)
+CONFIG_PATH = os.path.join(os.path.dirname(__file__), 'config.json')
+try:
+    with open(CONFIG_PATH, 'r', encoding='utf-8') as config_file:
+        config = json.load(config_file)
+    pathfinding_config = config.get('pathfinding', {}) if isinstance(config, dict) else {}
+    DEFAULT_SEARCH_METHOD = str(pathfinding_config.get('search_method', 'bfs'))
+except Exception:
+    DEFAULT_SEARCH_METHOD = 'bfs'
+if DEFAULT_SEARCH_METHOD not in SEARCH_METHODS:
+    print(f"❌ - ERROR IN PATHFINDING CONFIGURATION: UNKNOWN SEARCH METHOD '{DEFAULT_SEARCH_METHOD}', USING BFS")
+    DEFAULT_SEARCH_METHOD = 'bfs'
+
 def in_bounds(grid: list[list[Any]], position: tuple[int, int]):
     x, y = position
     return 0 <= x < len(grid) and 0 <= y < len(grid[0])
@@ -10,181 +64,935 @@ def in_bounds(grid: list[list[Any]], position: tuple[int, int]):
 def neighbors(grid: list[list[Any]], position: tuple[int, int]):
     x, y = position
     results = []
-    for delta_x, delta_y in [(-1, 0), (1, 0), (0, -1), (0, 1)]:
+    for delta_x, delta_y in DIRECTIONS:
         neighbor = (x + delta_x, y + delta_y)
         if in_bounds(grid, neighbor):
             results.append(neighbor)
     return results
 
-def bfs(grid: list[list[Any]], start: tuple[int, int], goal: tuple[int, int]):
-    from collections import deque
+class SearchBuffers:
+    # Scratch storage for searches on grids of one size, reused between calls.
+    # Cells are flat indices (x * height + y). A cell counts as visited when
+    # its stamp equals the stamp of the current search, so buffers never need
+    # clearing between searches.
+    def __init__(self, width: int, height: int):
+        self.width = width
+        self.height = height
+        cells = width * height
+        self.parent = array('i', bytes(4 * cells))
+        self.visited = array('I', bytes(4 * cells))
+        self.queue = array('i', bytes(4 * cells))
+        self.stamp = 0
+        # Extra storage for the point-to-point searches: cost from the start
+        # (A*) and the backward half of the bidirectional search
+        self.cost = array('i', bytes(4 * cells))
+        self.closed = array('I', bytes(4 * cells))
+        self.parent_back = array('i', bytes(4 * cells))
+        self.cost_back = array('i', bytes(4 * cells))
+        self.visited_back = array('I', bytes(4 * cells))
+        self.queue_back = array('i', bytes(4 * cells))
+        # Neighbor offset tables: each cell stores which of its 4 neighbors
+        # are inside the grid (one bit per direction), and directions[bits]
+        # lists the (offset, delta_x, delta_y) to visit, in BFS order
+        self.directions = []
+        for bits in range(16):
+            self.directions.append(tuple(
+                (delta_x * height + delta_y, delta_x, delta_y)
+                for bit, (delta_x, delta_y) in enumerate(DIRECTIONS) if bits & (1 << bit)
+            ))
+        self.edge_bits = bytearray(cells)
+        for x in range(width):
+            for y in range(height):
+                bits = 0
+                for bit, (delta_x, delta_y) in enumerate(DIRECTIONS):
+                    if 0 <= x + delta_x < width and 0 <= y + delta_y < height:
+                        bits |= 1 << bit
+                self.edge_bits[x * height + y] = bits
 
-    if start == goal:
-        return [start]
+    def next_stamp(self):
+        self.stamp += 1
+        if self.stamp > 0xFFFFFFFF:
+            cells = self.width * self.height
+            self.visited = array('I', bytes(4 * cells))
+            self.closed = array('I', bytes(4 * cells))
+            self.visited_back = array('I', bytes(4 * cells))
+            self.stamp = 1
+        return self.stamp
 
-    queue = deque([start])
-    came_from = {start: None}
-
-    while queue:
-        current = queue.popleft()
-        for neighbor in neighbors(grid, current):
-            if neighbor in came_from:
-                continue
-            came_from[neighbor] = current
-            if neighbor == goal:
-                # Reconstruct path
-                path = [goal]
-                current_position = current
-                while current_position is not None:
-                    path.append(current_position)
-                    current_position = came_from[current_position]
-                path.reverse()
-                return path
-            queue.append(neighbor)
+    def path_to(self, index: int):
+        # Follows parents back to the start cell, returns [start, ..., index]
+        height = self.height
+        parent = self.parent
+        path = []
+        while index != -1:
+            path.append(divmod(index, height))
+            index = parent[index]
+        path.reverse()
+        return path
+
+_search_buffers: dict[tuple[int, int], SearchBuffers] = {}
+
+def get_search_buffers(width: int, height: int):
+    buffers = _search_buffers.get((width, height))
+    if buffers is None:
+        buffers = SearchBuffers(width, height)
+        _search_buffers[(width, height)] = buffers
+    return buffers
+
+# What a search is looking for
+GOAL_CELLS = 0
+GOAL_COLUMN = 1
+GOAL_ITEM = 2
+
+def flat_search(grid: list[list[Any]], start: tuple[int, int], danger_zones: list[list[bool]] | None, goal_kind: int,
+                goal: Any = None, only_persons: bool = False, exclude_persons: bool = False, farthest: bool = False):
+    # Breadth-first search over flat cell indices shared by bfs, find_nearest,
+    # find_farthest, find_path_to_column and find_nearest_goal. With
+    # danger_zones=None every cell is traversable (plain bfs), otherwise danger
+    # cells and mines are walls. For GOAL_CELLS, goal is a collection of cells
+    # and the search stops at the first one reached.
+    # Returns the index of the goal cell found (-1 if none), the path can be
+    # rebuilt with the buffers' path_to
+    width, height = len(grid), len(grid[0])
+    buffers = get_search_buffers(width, height)
+    stamp = buffers.next_stamp()
+    visited, parent, queue = buffers.visited, buffers.parent, buffers.queue
+    directions, edge_bits = buffers.directions, buffers.edge_bits
+    check_walls = danger_zones is not None
+    check_danger = bool(danger_zones)
+    goal_indices = set()
+    if goal_kind == GOAL_CELLS:
+        goal_indices = {goal_x * height + goal_y for goal_x, goal_y in goal}
+
+    start_index = start[0] * height + start[1]
+    visited[start_index] = stamp
+    parent[start_index] = -1
+    queue[0] = start_index
+    head, tail = 0, 1
+    found = -1
+
+    while head < tail:
+        current = queue[head]
+        head += 1
+        x, y = divmod(current, height)
+        for offset, delta_x, delta_y in directions[edge_bits[current]]:
+            neighbor = current + offset
+            if visited[neighbor] == stamp:
+                continue
+            neighbor_x, neighbor_y = x + delta_x, y + delta_y
+            grid_object = grid[neighbor_x][neighbor_y]
+            # A goal cell is always enterable (it may hold a vehicle)
+            if check_walls and neighbor not in goal_indices:
+                if check_danger and danger_zones[neighbor_x][neighbor_y]:
+                    continue
+                if grid_object is not None and isinstance(grid_object, Mine):
+                    continue
+            visited[neighbor] = stamp
+            parent[neighbor] = current
+            if goal_kind == GOAL_ITEM:
+                if grid_object is not None and matches_target(grid_object, only_persons, exclude_persons):
+                    found = neighbor
+                    if not farthest:
+                        return found
+            elif goal_kind == GOAL_COLUMN:
+                if neighbor_x == goal:
+                    return neighbor
+            elif neighbor in goal_indices:
+                return neighbor
+            queue[tail] = neighbor
+            tail += 1
+    return found
+
+def is_wall(grid: list[list[Any]], danger_zones: list[list[bool]] | None, x: int, y: int):
+    if danger_zones is None:
+        return False
+    if danger_zones and danger_zones[x][y]:
+        return True
+    grid_object = grid[x][y]
+    return grid_object is not None and isinstance(grid_object, Mine)
+
+def astar(grid: list[list[Any]], start: tuple[int, int], goal: tuple[int, int], danger_zones: list[list[bool]] | None = None):
+    # A* with the Manhattan distance, exact on a 4-connected uniform grid.
+    # Ties on f prefer the deepest node, which walks straight to the goal on
+    # open maps instead of expanding the whole diamond around the start
+    width, height = len(grid), len(grid[0])
+    buffers = get_search_buffers(width, height)
+    stamp = buffers.next_stamp()
+    visited, closed, parent, cost = buffers.visited, buffers.closed, buffers.parent, buffers.cost
+    directions, edge_bits = buffers.directions, buffers.edge_bits
+    goal_x, goal_y = goal
+    goal_index = goal_x * height + goal_y
+
+    start_index = start[0] * height + start[1]
+    visited[start_index] = stamp
+    parent[start_index] = -1
+    cost[start_index] = 0
+    open_heap = [(abs(start[0] - goal_x) + abs(start[1] - goal_y), 0, start_index)]
+
+    while open_heap:
+        _, negative_cost, current = heapq.heappop(open_heap)
+        if closed[current] == stamp:
+            continue
+        if current == goal_index:
+            return buffers.path_to(current)
+        closed[current] = stamp
+        current_cost = -negative_cost + 1
+        x, y = divmod(current, height)
+        for offset, delta_x, delta_y in directions[edge_bits[current]]:
+            neighbor = current + offset
+            if closed[neighbor] == stamp:
+                continue
+            if visited[neighbor] == stamp and cost[neighbor] <= current_cost:
+                continue
+            neighbor_x, neighbor_y = x + delta_x, y + delta_y
+            if neighbor != goal_index and is_wall(grid, danger_zones, neighbor_x, neighbor_y):
+                continue
+            visited[neighbor] = stamp
+            parent[neighbor] = current
+            cost[neighbor] = current_cost
+            estimate = current_cost + abs(neighbor_x - goal_x) + abs(neighbor_y - goal_y)
+            heapq.heappush(open_heap, (estimate, -current_cost, neighbor))
     return None
 
-def find_nearest(grid: list[list[Any]], start: tuple[int, int], danger_zones: list[list[bool]], only_persons: bool = False, exclude_persons: bool = False):
-    queue = deque([start])
-    came_from = {start: None}
+def bidirectional_bfs(grid: list[list[Any]], start: tuple[int, int], goal: tuple[int, int], danger_zones: list[list[bool]] | None = None):
+    # Grows one BFS layer at a time from whichever side has the smaller
+    # frontier, and stops at the layer where both searches meet
+    width, height = len(grid), len(grid[0])
+    buffers = get_search_buffers(width, height)
+    stamp = buffers.next_stamp()
+    directions, edge_bits = buffers.directions, buffers.edge_bits
+    start_index = start[0] * height + start[1]
+    goal_index = goal[0] * height + goal[1]
 
-    # Helper function: checks if a cell is walkable (safe and not a mine)
-    def walkable(position):
-        cell_x, cell_y = position
-        if danger_zones and danger_zones[cell_x][cell_y]:
-            return False
-        grid_object = grid[cell_x][cell_y]
-        # Don't allow entering mines; items are traversable objectives
-        if Mine is not None and isinstance(grid_object, Mine):
+    sides = [
+        [buffers.visited, buffers.parent, buffers.cost, [start_index]],
+        [buffers.visited_back, buffers.parent_back, buffers.cost_back, [goal_index]],
+    ]
+    for (visited, parent, depth, frontier) in sides:
+        visited[frontier[0]] = stamp
+        parent[frontier[0]] = -1
+        depth[frontier[0]] = 0
+
+    while sides[0][3] and sides[1][3]:
+        side = 0 if len(sides[0][3]) <= len(sides[1][3]) else 1
+        visited, parent, depth, frontier = sides[side]
+        other_visited, _, other_depth, _ = sides[1 - side]
+        next_frontier = []
+        meeting, meeting_length = -1, -1
+        for current in frontier:
+            x, y = divmod(current, height)
+            current_depth = depth[current] + 1
+            for offset, delta_x, delta_y in directions[edge_bits[current]]:
+                neighbor = current + offset
+                if visited[neighbor] == stamp:
+                    continue
+                neighbor_x, neighbor_y = x + delta_x, y + delta_y
+                if neighbor != goal_index and is_wall(grid, danger_zones, neighbor_x, neighbor_y):
+                    continue
+                visited[neighbor] = stamp
+                parent[neighbor] = current
+                depth[neighbor] = current_depth
+                if other_visited[neighbor] == stamp:
+                    length = current_depth + other_depth[neighbor]
+                    if meeting == -1 or length < meeting_length:
+                        meeting, meeting_length = neighbor, length
+                next_frontier.append(neighbor)
+        if meeting != -1:
+            # Forward half ends at the meeting cell, backward half leads to the goal
+            forward = buffers.path_to(meeting)
+            backward = []
+            index = buffers.parent_back[meeting]
+            while index != -1:
+                backward.append(divmod(index, height))
+                index = buffers.parent_back[index]
+            return forward + backward
+        sides[side][3] = next_frontier
+    return None
+
+def jump_point_search(grid: list[list[Any]], start: tuple[int, int], goal: tuple[int, int] | None, danger_zones: list[list[bool]] | None = None,
+                      target_x: int | None = None):
+    # Jump Point Search for 4-connected uniform-cost grids. Straight runs are
+    # scanned without queueing their cells and only jump points (the goal,
+    # cells with a forced neighbour, and cells of a vertical run from which a
+    # horizontal run finds one) enter the A* open list. Walls work as in
+    # bfs(). With goal=None the goal is any cell of column target_x, which
+    # then has to be walkable as in find_path_to_column.
+    # Returns a shortest path [start, ..., goal] or None
+    width, height = len(grid), len(grid[0])
+    check_walls = danger_zones is not None
+    check_danger = bool(danger_zones)
+    goal_x, goal_y = goal if goal is not None else (-1, -1)
+
+    def walkable(x: int, y: int):
+        if x < 0 or y < 0 or x >= width or y >= height:
             return False
-        # Allow empty cells or cells with items
-        return True
-    
-    # Helper function: checks if an object is the target
-    def is_target(grid_object):
-        if only_persons:
-            # Only persons
-            return Person is not None and isinstance(grid_object, Person)
-        elif exclude_persons:
-            # Items but NOT persons
-            return Item is not None and isinstance(grid_object, Item) and not isinstance(grid_object, Person)
+        if not check_walls:
+            return True
+        if check_danger and danger_zones[x][y]:
+            return x == goal_x and y == goal_y
+        grid_object = grid[x][y]
+        return grid_object is None or not isinstance(grid_object, Mine) or (x == goal_x and y == goal_y)
+
+    def is_goal(x: int, y: int):
+        return (x, y) == goal if goal is not None else x == target_x
+
+    def jump_horizontal(x: int, y: int, delta_x: int):
+        while True:
+            x += delta_x
+            if not walkable(x, y):
+                return None
+            if is_goal(x, y):
+                return (x, y)
+            if (walkable(x, y - 1) and not walkable(x - delta_x, y - 1)) or (walkable(x, y + 1) and not walkable(x - delta_x, y + 1)):
+                return (x, y)
+
+    def jump_vertical(x: int, y: int, delta_y: int):
+        while True:
+            y += delta_y
+            if not walkable(x, y):
+                return None
+            if is_goal(x, y):
+                return (x, y)
+            if (walkable(x - 1, y) and not walkable(x - 1, y - delta_y)) or (walkable(x + 1, y) and not walkable(x + 1, y - delta_y)):
+                return (x, y)
+            if jump_horizontal(x, y, 1) or jump_horizontal(x, y, -1):
+                return (x, y)
+
+    def heuristic(x: int, y: int):
+        if goal is not None:
+            return abs(x - goal[0]) + abs(y - goal[1])
+        return abs(x - target_x)
+
+    best = {start: 0}
+    parents = {start: None}
+    heap = [(heuristic(*start), 0, start)]
+    while heap:
+        _, cost, node = heapq.heappop(heap)
+        if cost > best[node]:
+            continue
+        x, y = node
+        if node != start and is_goal(x, y):
+            # Expand the straight segments between jump points
+            jump_points = []
+            while node is not None:
+                jump_points.append(node)
+                node = parents[node]
+            jump_points.reverse()
+            path = [jump_points[0]]
+            for (from_x, from_y), (to_x, to_y) in zip(jump_points, jump_points[1:]):
+                step_x, step_y = (to_x > from_x) - (to_x < from_x), (to_y > from_y) - (to_y < from_y)
+                while (from_x, from_y) != (to_x, to_y):
+                    from_x, from_y = from_x + step_x, from_y + step_y
+                    path.append((from_x, from_y))
+            return path
+        # Natural neighbours: keep going straight or turn, never go back
+        parent = parents[node]
+        if parent is None:
+            directions = DIRECTIONS
+        elif parent[0] != x:
+            delta_x = 1 if x > parent[0] else -1
+            directions = [(delta_x, 0), (0, -1), (0, 1)]
         else:
-            # Any Item
-            return Item is not None and isinstance(grid_object, Item)
+            delta_y = 1 if y > parent[1] else -1
+            directions = [(0, delta_y), (-1, 0), (1, 0)]
+        for delta_x, delta_y in directions:
+            if delta_x:
+                jump_point = jump_horizontal(x, y, delta_x)
+            else:
+                jump_point = jump_vertical(x, y, delta_y)
+            if jump_point is None:
+                continue
+            jump_cost = cost + abs(jump_point[0] - x) + abs(jump_point[1] - y)
+            if jump_cost < best.get(jump_point, jump_cost + 1):
+                best[jump_point] = jump_cost
+                parents[jump_point] = node
+                heapq.heappush(heap, (jump_cost + heuristic(*jump_point), jump_cost, jump_point))
+    return None
+
+def bfs(grid: list[list[Any]], start: tuple[int, int], goal: tuple[int, int], method: str | None = None, danger_zones: list[list[bool]] | None = None):
+    # Shortest path from start to goal. By default every cell is traversable;
+    # passing danger_zones makes danger cells and mines walls (the goal cell
+    # itself is always allowed). method picks the search: plain 'bfs', 'astar',
+    # 'bidirectional' or 'jps' (DEFAULT_SEARCH_METHOD when not given).
+    if start == goal:
+        return [start]
+    method = method or DEFAULT_SEARCH_METHOD
+    if method not in SEARCH_METHODS:
+        raise ValueError(f"Unknown search method: {method}")
+    if method == 'jps':
+        return jump_point_search(grid, start, goal, danger_zones)
+    if method == 'astar':
+        return astar(grid, start, goal, danger_zones)
+    if method == 'bidirectional':
+        return bidirectional_bfs(grid, start, goal, danger_zones)
+    if use_vectorized(grid) and danger_zones is None:
+        return bfs_vectorized(grid, start, goal)
+    found = flat_search(grid, start, danger_zones, GOAL_CELLS, (goal,))
+    if found == -1:
+        return None
+    return get_search_buffers(len(grid), len(grid[0])).path_to(found)
+
+def find_nearest_goal(grid: list[list[Any]], start: tuple[int, int], goals: list[tuple[int, int]], danger_zones: list[list[bool]] | None = None):
+    # Path to whichever of the goals is closest to start, found with a single
+    # expansion instead of one search per goal. Walls work as in bfs()
+    if start in goals:
+        return [start]
+    if not goals:
+        return None
+    found = flat_search(grid, start, danger_zones, GOAL_CELLS, goals)
+    if found == -1:
+        return None
+    return get_search_buffers(len(grid), len(grid[0])).path_to(found)
 
+def find_nearest(grid: list[list[Any]], start: tuple[int, int], danger_zones: list[list[bool]], only_persons: bool = False, exclude_persons: bool = False, mask: 'WalkableMask | None' = None):
+    # mask, when given, is a WalkableMask of this grid that the vectorized
+    # backend reuses instead of scanning the grid
+    if use_vectorized(grid):
+        return find_nearest_vectorized(grid, start, danger_zones, only_persons, exclude_persons, mask)
     # If start cell contains the target, return it immediately
     start_x, start_y = start
-    if is_target(grid[start_x][start_y]):
+    if matches_target(grid[start_x][start_y], only_persons, exclude_persons):
         return [start]
+    found = flat_search(grid, start, danger_zones or [], GOAL_ITEM,
+                        only_persons=only_persons, exclude_persons=exclude_persons)
+    if found == -1:
+        return None
+    return get_search_buffers(len(grid), len(grid[0])).path_to(found)
 
-    while queue:
-        current = queue.popleft()
-        for neighbor in neighbors(grid, current):
-            if neighbor in came_from:
-                continue
-            if not walkable(neighbor):
-                continue
-            came_from[neighbor] = current
-            neighbor_x, neighbor_y = neighbor
-            if is_target(grid[neighbor_x][neighbor_y]):
-                # Reconstruct path
-                path = [neighbor]
-                current_position = current
-                while current_position is not None:
-                    path.append(current_position)
-                    current_position = came_from[current_position]
-                path.reverse()
-                return path
-            queue.append(neighbor)
-    return None
+def find_farthest(grid: list[list[Any]], start: tuple[int, int], danger_zones: list[list[bool]], only_persons: bool = False, exclude_persons: bool = False, mask: 'WalkableMask | None' = None):
+    if use_vectorized(grid):
+        return find_farthest_vectorized(grid, start, danger_zones, only_persons, exclude_persons, mask)
+    found = flat_search(grid, start, danger_zones or [], GOAL_ITEM,
+                        only_persons=only_persons, exclude_persons=exclude_persons, farthest=True)
+    if found == -1:
+        # The start cell is the only target, if any
+        start_x, start_y = start
+        if matches_target(grid[start_x][start_y], only_persons, exclude_persons):
+            return [start]
+        return None
+    return get_search_buffers(len(grid), len(grid[0])).path_to(found)
 
-def find_farthest(grid: list[list[Any]], start: tuple[int, int], danger_zones: list[list[bool]], only_persons: bool = False, exclude_persons: bool = False):
-    queue = deque([start])
-    came_from = {start: None}
+def find_path_to_column(grid: list[list[Any]], start: tuple[int, int], target_x: int, danger_zones: list[list[bool]], method: str | None = None, mask: 'WalkableMask | None' = None):
+    method = method or DEFAULT_SEARCH_METHOD
+    if method not in SEARCH_METHODS:
+        raise ValueError(f"Unknown search method: {method}")
+    if method not in COLUMN_SEARCH_METHODS:
+        method = 'bfs'
+    if method == 'bfs' and use_vectorized(grid):
+        return find_path_to_column_vectorized(grid, start, target_x, danger_zones, mask)
+    # If already in target column and walkable, return start path
+    start_x, start_y = start
+    if start_x == target_x:
+        in_danger = bool(danger_zones) and danger_zones[start_x][start_y]
+        if not in_danger and not isinstance(grid[start_x][start_y], Mine):
+            return [start]
+    if method == 'jps':
+        return jump_point_search(grid, start, None, danger_zones or [], target_x=target_x)
+    found = flat_search(grid, start, danger_zones or [], GOAL_COLUMN, target_x)
+    if found == -1:
+        return None
+    return get_search_buffers(len(grid), len(grid[0])).path_to(found)
 
-    def walkable(position):
-        cell_x, cell_y = position
-        if danger_zones and danger_zones[cell_x][cell_y]:
-            return False
-        grid_object = grid[cell_x][cell_y]
-        if Mine is not None and isinstance(grid_object, Mine):
-            return False
-        return True
+def matches_target(grid_object: Any, only_persons: bool = False, exclude_persons: bool = False):
+    if only_persons:
+        return isinstance(grid_object, Person)
+    if exclude_persons:
+        return isinstance(grid_object, Item) and not isinstance(grid_object, Person)
+    return isinstance(grid_object, Item)
 
-    def is_target(grid_object):
-        if only_persons:
-            # Only persons
-            return Person is not None and isinstance(grid_object, Person)
-        elif exclude_persons:
-            # Items but NOT persons
-            return Item is not None and isinstance(grid_object, Item) and not isinstance(grid_object, Person)
-        else:
-            # Any Item
-            return Item is not None and isinstance(grid_object, Item)
+def distance_field(grid: list[list[Any]], danger_zones: list[list[bool]], sources: list[tuple[int, int]]):
+    # Multi-source BFS from every source cell over walkable cells (not in a
+    # danger zone and not a mine). Returns a grid with the distance from each
+    # cell to its nearest source, or -1 where no source can be reached.
+    if use_vectorized(grid, VECTORIZED_FIELD_MAX_CELLS):
+        walkable = walkable_mask(grid, danger_zones)
+        source_mask = np.zeros(walkable.shape, dtype=bool)
+        for source_x, source_y in sources:
+            source_mask[source_x, source_y] = True
+        return wavefront_field(walkable, source_mask)
+
+    width, height = len(grid), len(grid[0])
+    buffers = get_search_buffers(width, height)
+    queue, directions, edge_bits = buffers.queue, buffers.directions, buffers.edge_bits
+    check_danger = bool(danger_zones)
+    field = array('i', [-1]) * (width * height)
+    tail = 0
+    for source_x, source_y in sources:
+        source = source_x * height + source_y
+        if field[source] == -1:
+            field[source] = 0
+            queue[tail] = source
+            tail += 1
+
+    head = 0
+    while head < tail:
+        current = queue[head]
+        head += 1
+        x, y = divmod(current, height)
+        next_distance = field[current] + 1
+        for offset, delta_x, delta_y in directions[edge_bits[current]]:
+            neighbor = current + offset
+            if field[neighbor] != -1:
+                continue
+            neighbor_x, neighbor_y = x + delta_x, y + delta_y
+            if check_danger and danger_zones[neighbor_x][neighbor_y]:
+                continue
+            grid_object = grid[neighbor_x][neighbor_y]
+            if grid_object is not None and isinstance(grid_object, Mine):
+                continue
+            field[neighbor] = next_distance
+            queue[tail] = neighbor
+            tail += 1
+    return [field[x * height:(x + 1) * height].tolist() for x in range(width)]
+
+def item_distance_field(grid: list[list[Any]], danger_zones: list[list[bool]], only_persons: bool = False, exclude_persons: bool = False):
+    # One reverse search seeded from every reachable target item, shared by
+    # all the vehicles with the same capabilities
+    sources = []
+    for x in range(len(grid)):
+        for y in range(len(grid[0])):
+            if danger_zones and danger_zones[x][y]:
+                continue
+            if matches_target(grid[x][y], only_persons, exclude_persons):
+                sources.append((x, y))
+    return distance_field(grid, danger_zones, sources)
+
+# A queued change set larger than 1/REBUILD_FRACTION of the map is cheaper
+# to handle with a fresh field than with a repair
+REBUILD_FRACTION = 8
+
+class IncrementalField:
+    # A distance_field kept up to date between turns. Cells reported as
+    # changed (danger flipped, item picked up or dropped) are queued with
+    # mark_changed and the next update repairs only the part of the field
+    # that depended on them, D* Lite style: distances that lost their
+    # support are cleared in increasing order, then the cleared region is
+    # refilled from its still valid border. The work follows the size of the
+    # change, not the size of the map.
+    # is_source(grid, danger_zones, x, y) tells which cells are sources, a
+    # source must be walkable
+    def __init__(self, grid: list[list[Any]], danger_zones: list[list[bool]], is_source):
+        self.is_source = is_source
+        self.pending: set[tuple[int, int]] = set()
+        self.field: list[list[int]] = []
+        self.rebuild(grid, danger_zones)
+
+    def rebuild(self, grid: list[list[Any]], danger_zones: list[list[bool]]):
+        is_source = self.is_source
+        sources = [(x, y) for x in range(len(grid)) for y in range(len(grid[0])) if is_source(grid, danger_zones, x, y)]
+        field = distance_field(grid, danger_zones, sources)
+        self.field = field if isinstance(field, list) else field.tolist()
+        self.pending = set()
+
+    def mark_changed(self, cells):
+        self.pending.update(cells)
+
+    def update(self, grid: list[list[Any]], danger_zones: list[list[bool]]):
+        # Returns the field with every change queued so far applied
+        if self.pending:
+            if len(self.pending) * REBUILD_FRACTION > len(grid) * len(grid[0]):
+                self.rebuild(grid, danger_zones)
+            else:
+                self.repair(grid, danger_zones, self.pending)
+                self.pending = set()
+        return self.field
+
+    def repair(self, grid: list[list[Any]], danger_zones: list[list[bool]], cells: set[tuple[int, int]]):
+        field = self.field
+        width, height = len(field), len(field[0])
+        is_source = self.is_source
+        check_danger = bool(danger_zones)
+
+        def walkable(x: int, y: int):
+            if check_danger and danger_zones[x][y]:
+                return False
+            grid_object = grid[x][y]
+            return grid_object is None or not isinstance(grid_object, Mine)
+
+        def around(x: int, y: int):
+            return [(x + delta_x, y + delta_y) for delta_x, delta_y in DIRECTIONS
+                    if 0 <= x + delta_x < width and 0 <= y + delta_y < height]
+
+        # 1) Clear the changed cells that are no longer a source or no longer
+        # walkable, then every cell whose only shortest route went through a
+        # cleared one. Cells are handled by increasing distance, so when a
+        # cell is checked every cleared cell one step closer is already known
+        cleared = []
+        heap = []
+        for x, y in cells:
+            distance = field[x][y]
+            if distance == -1:
+                continue
+            if distance == 0 and is_source(grid, danger_zones, x, y):
+                continue
+            if distance > 0 and walkable(x, y):
+                continue
+            field[x][y] = -1
+            cleared.append((x, y))
+            heapq.heappush(heap, (distance, x, y))
+        while heap:
+            distance, x, y = heapq.heappop(heap)
+            for neighbor_x, neighbor_y in around(x, y):
+                if field[neighbor_x][neighbor_y] != distance + 1:
+                    continue
+                if any(field[support_x][support_y] == distance for support_x, support_y in around(neighbor_x, neighbor_y)):
+                    continue
+                field[neighbor_x][neighbor_y] = -1
+                cleared.append((neighbor_x, neighbor_y))
+                heapq.heappush(heap, (distance + 1, neighbor_x, neighbor_y))
 
-    last_target = None
+        # 2) Give the cleared and changed cells their best distance from a
+        # valid neighbor (or 0 for sources) and spread the improvements
+        for x, y in cleared + list(cells):
+            if not walkable(x, y):
+                continue
+            if is_source(grid, danger_zones, x, y):
+                best = 0
+            else:
+                best = -1
+                for neighbor_x, neighbor_y in around(x, y):
+                    distance = field[neighbor_x][neighbor_y]
+                    if distance >= 0 and (best == -1 or distance + 1 < best):
+                        best = distance + 1
+            if best != -1 and (field[x][y] == -1 or best < field[x][y]):
+                field[x][y] = best
+                heapq.heappush(heap, (best, x, y))
+        while heap:
+            distance, x, y = heapq.heappop(heap)
+            if field[x][y] != distance:
+                continue
+            for neighbor_x, neighbor_y in around(x, y):
+                current = field[neighbor_x][neighbor_y]
+                if current != -1 and current <= distance + 1:
+                    continue
+                if not walkable(neighbor_x, neighbor_y):
+                    continue
+                field[neighbor_x][neighbor_y] = distance + 1
+                heapq.heappush(heap, (distance + 1, neighbor_x, neighbor_y))
+
+class ComponentIndex:
+    # Connected components of the walkable cells (not in a danger zone and
+    # not a mine), labelled with a union-find over flat indices. Two cells
+    # reach each other iff they share a label, so reachability questions are
+    # answered by comparing labels without any search. Walls are labelled -1.
+    # Only walkability matters: the index stays valid while items come and go.
+    # danger_zones may be any per-cell layer where truthy means blocked, such
+    # as the danger map's mine counts
+    def __init__(self, grid: list[list[Any]], danger_zones: list[list[bool]]):
+        width, height = len(grid), len(grid[0])
+        self.height = height
+        cells = width * height
+        parent = array('i', range(cells))
+        walkable = bytearray(cells)
+
+        def find(index: int):
+            while parent[index] != index:
+                parent[index] = parent[parent[index]]
+                index = parent[index]
+            return index
+
+        def union(first: int, second: int):
+            first, second = find(first), find(second)
+            if first != second:
+                parent[max(first, second)] = min(first, second)
+
+        check_danger = bool(danger_zones)
+        for x in range(width):
+            grid_column = grid[x]
+            danger_column = danger_zones[x] if check_danger else None
+            for y in range(height):
+                if check_danger and danger_column[y]:
+                    continue
+                grid_object = grid_column[y]
+                if grid_object is not None and isinstance(grid_object, Mine):
+                    continue
+                index = x * height + y
+                walkable[index] = 1
+                if y > 0 and walkable[index - 1]:
+                    union(index, index - 1)
+                if x > 0 and walkable[index - height]:
+                    union(index, index - height)
+
+        self.labels = array('i', [-1]) * cells
+        for index in range(cells):
+            if walkable[index]:
+                self.labels[index] = find(index)
+
+    def label(self, x: int, y: int):
+        return self.labels[x * self.height + y]
+
+    def labels_around(self, grid: list[list[Any]], position: tuple[int, int]):
+        # Components a vehicle standing on position can move into: its own
+        # cell's, or its neighbours' when the cell itself is blocked (with the
+        # combined danger zones vehicles mark their own cell), as
+        # field_distance does
+        x, y = position
+        label = self.label(x, y)
+        if label != -1:
+            return {label}
+        return {self.label(neighbor_x, neighbor_y) for neighbor_x, neighbor_y in neighbors(grid, position)} - {-1}
+
+def field_distance(field: list[list[int]], start: tuple[int, int]):
+    # Distance from start to the nearest source of the field, -1 if unreachable.
+    # The start cell itself may be blocked (vehicles mark their own cell as
+    # dangerous), in that case we leave it through its best neighbor.
     start_x, start_y = start
-    if is_target(grid[start_x][start_y]):
-        last_target = start
+    if field[start_x][start_y] >= 0:
+        return field[start_x][start_y]
+    best_distance = -1
+    for neighbor_x, neighbor_y in neighbors(field, start):
+        distance = field[neighbor_x][neighbor_y]
+        if distance >= 0 and (best_distance == -1 or distance + 1 < best_distance):
+            best_distance = distance + 1
+    return best_distance
+
+def path_from_field(field: list[list[int]], start: tuple[int, int]):
+    # Follows the field downhill from start to its nearest source, same
+    # result shape as find_nearest: [start, ..., source] or None
+    distance = field_distance(field, start)
+    if distance == -1:
+        return None
+    path = [start]
+    current = start
+    while distance > 0:
+        distance -= 1
+        for neighbor_x, neighbor_y in neighbors(field, current):
+            if field[neighbor_x][neighbor_y] == distance:
+                current = (neighbor_x, neighbor_y)
+                break
+        path.append(current)
+    return path
+
 
-    while queue:
-        current = queue.popleft()
-        for neighbor in neighbors(grid, current):
-            if neighbor in came_from:
+# ---------------------------------------------------------------------------
+# Space-time search (timing-aware planning)
+# ---------------------------------------------------------------------------
+
+# Most (cell, phase) states a timed search may enqueue before giving up, so a
+# plan costs the same on any map size
+TIMED_SEARCH_MAX_STATES = 200000
+
+def find_timed_path(grid: list[list[Any]], start: tuple[int, int], start_turn: int, phase_walls: list[bytearray], goal_kind: int,
+                    goal: Any = None, only_persons: bool = False, exclude_persons: bool = False, max_states: int = TIMED_SEARCH_MAX_STATES):
+    # Breadth-first search over (cell, turn mod period) states, where
+    # phase_walls[t % period] is a flat bitmap (x * height + y) of the cells a
+    # vehicle must not stand on at turn t. Step k of the path is taken at
+    # start_turn + k, so the path found avoids every wall at the turn it is
+    # walked, including cells that are only dangerous part of the time. A
+    # cell may be revisited at another phase, which lets a path step aside
+    # and come back once a danger is gone.
+    # goal_kind is GOAL_ITEM (nearest matching item) or GOAL_COLUMN (any cell
+    # of column goal). Returns [start, ..., goal] or None if no goal is
+    # reachable within max_states states
+    # States are phase * cells + cell. Only the states reached are stored
+    # (parents doubles as the visited set), so memory follows max_states,
+    # not period * cells
+    width, height = len(grid), len(grid[0])
+    period = len(phase_walls)
+    cells = width * height
+    buffers = get_search_buffers(width, height)
+    directions, edge_bits = buffers.directions, buffers.edge_bits
+
+    start_state = (start_turn % period) * cells + start[0] * height + start[1]
+    parents = {start_state: -1}
+    queue = [start_state]
+    head = 0
+
+    def path_to(state: int):
+        path = []
+        while state != -1:
+            path.append(divmod(state % cells, height))
+            state = parents[state]
+        path.reverse()
+        return path
+
+    while head < len(queue):
+        state = queue[head]
+        head += 1
+        phase, current = divmod(state, cells)
+        next_phase = phase + 1 if phase + 1 < period else 0
+        next_base = next_phase * cells
+        walls = phase_walls[next_phase]
+        x, y = divmod(current, height)
+        for offset, delta_x, delta_y in directions[edge_bits[current]]:
+            neighbor = current + offset
+            next_state = next_base + neighbor
+            if walls[neighbor] or next_state in parents:
                 continue
-            if not walkable(neighbor):
+            neighbor_x, neighbor_y = x + delta_x, y + delta_y
+            parents[next_state] = state
+            if goal_kind == GOAL_ITEM:
+                grid_object = grid[neighbor_x][neighbor_y]
+                if grid_object is not None and matches_target(grid_object, only_persons, exclude_persons):
+                    return path_to(next_state)
+            elif neighbor_x == goal:
+                return path_to(next_state)
+            if len(queue) >= max_states:
+                return None
+            queue.append(next_state)
+    return None
+
+
+# ---------------------------------------------------------------------------
+# Vectorized wavefront backend (numpy)
+# ---------------------------------------------------------------------------
+
+def walkable_mask(grid: list[list[Any]], danger_zones: list[list[bool]], only_persons: bool = False, exclude_persons: bool = False, with_targets: bool = False):
+    # Boolean (width, height) array of the cells a vehicle may enter: not in a
+    # danger zone and not a mine. With with_targets=True it also returns the
+    # mask of target items, both built in the same pass over the grid
+    width, height = len(grid), len(grid[0])
+    if danger_zones:
+        walkable = ~np.asarray(danger_zones, dtype=bool)
+    else:
+        walkable = np.ones((width, height), dtype=bool)
+    targets = np.zeros((width, height), dtype=bool) if with_targets else None
+    for x in range(width):
+        column = grid[x]
+        for y in range(height):
+            grid_object = column[y]
+            if grid_object is None:
                 continue
-            came_from[neighbor] = current
-            neighbor_x, neighbor_y = neighbor
-            if is_target(grid[neighbor_x][neighbor_y]):
-                last_target = neighbor
-            queue.append(neighbor)
+            if isinstance(grid_object, Mine):
+                walkable[x, y] = False
+            elif with_targets and matches_target(grid_object, only_persons, exclude_persons):
+                targets[x, y] = True
+    if with_targets:
+        return walkable, targets
+    return walkable
+
+class WalkableMask:
+    # walkable_mask() kept up to date between turns, like IncrementalField:
+    # the cells reported with mark_changed are read again on the next update
+    # instead of scanning the whole grid. Target masks are built for each
+    # (only_persons, exclude_persons) the first time they are asked for.
+    # The arrays are shared, callers must not modify them
+    def __init__(self, grid: list[list[Any]], danger_zones: list[list[bool]]):
+        self.pending: set[tuple[int, int]] = set()
+        self.targets = {}
+        self.rebuild(grid, danger_zones)
+
+    def rebuild(self, grid: list[list[Any]], danger_zones: list[list[bool]]):
+        self.walkable = walkable_mask(grid, danger_zones)
+        self.targets = {}
+        self.pending = set()
+
+    def mark_changed(self, cells):
+        self.pending.update(cells)
 
-    if last_target is None:
+    def update(self, grid: list[list[Any]], danger_zones: list[list[bool]]):
+        if not self.pending:
+            return self
+        if len(self.pending) * REBUILD_FRACTION > len(grid) * len(grid[0]):
+            self.rebuild(grid, danger_zones)
+            return self
+        check_danger = bool(danger_zones)
+        walkable = self.walkable
+        for x, y in self.pending:
+            grid_object = grid[x][y]
+            walkable[x, y] = not (check_danger and danger_zones[x][y]) and not isinstance(grid_object, Mine)
+            for (only_persons, exclude_persons), targets in self.targets.items():
+                targets[x, y] = matches_target(grid_object, only_persons, exclude_persons)
+        self.pending = set()
+        return self
+
+    def get_targets(self, grid: list[list[Any]], danger_zones: list[list[bool]], only_persons: bool = False, exclude_persons: bool = False):
+        key = (only_persons, exclude_persons)
+        targets = self.targets.get(key)
+        if targets is None:
+            _, targets = walkable_mask(grid, danger_zones, only_persons, exclude_persons, with_targets=True)
+            self.targets[key] = targets
+        return targets
+
+def wavefront_field(walkable, sources, start: tuple[int, int] | None = None):
+    # Dilates the source frontier one ring per iteration over the walkable
+    # mask. Sources are seeded as given (they may be blocked cells, like a
+    # vehicle's own position). Returns an int32 array, -1 where unreachable.
+    # With a start cell the wavefront stops at the ring that reaches it (or
+    # its first neighbour when start itself is blocked): that is all
+    # path_from_field needs to walk back from start, and the rest of the map
+    # is left at -1
+    field = np.full(walkable.shape, -1, dtype=np.int32)
+    frontier = sources.copy()
+    # Walkable cells the wavefront has not reached yet
+    remaining = walkable & ~sources
+    expanded = np.empty_like(frontier)
+    stop = None
+    if start is not None:
+        stop = np.zeros(walkable.shape, dtype=bool)
+        start_x, start_y = start
+        if walkable[start_x, start_y] or sources[start_x, start_y]:
+            stop[start_x, start_y] = True
+        else:
+            for neighbor_x, neighbor_y in neighbors(walkable, start):
+                stop[neighbor_x, neighbor_y] = True
+    distance = 0
+    while frontier.any():
+        field[frontier] = distance
+        if stop is not None and (frontier & stop).any():
+            break
+        expanded.fill(False)
+        expanded[1:, :] |= frontier[:-1, :]
+        expanded[:-1, :] |= frontier[1:, :]
+        expanded[:, 1:] |= frontier[:, :-1]
+        expanded[:, :-1] |= frontier[:, 1:]
+        expanded &= remaining
+        remaining ^= expanded
+        frontier, expanded = expanded, frontier
+        distance += 1
+    return field
+
+def descend_field(field, start: tuple[int, int]):
+    # Same as path_from_field, returns the path as a list of tuples
+    path = path_from_field(field, start)
+    if path is None:
         return None
+    return [(int(x), int(y)) for x, y in path]
 
-    # Reconstruct path to the farthest found target
-    path = [last_target]
-    current_position = came_from[last_target]
-    while current_position is not None:
-        path.append(current_position)
-        current_position = came_from[current_position]
-    path.reverse()
-    return path
+def vectorized_masks(grid: list[list[Any]], danger_zones: list[list[bool]], only_persons: bool, exclude_persons: bool, mask: WalkableMask | None):
+    # (walkable, targets) from the given WalkableMask, or from one grid scan
+    if mask is None:
+        return walkable_mask(grid, danger_zones, only_persons, exclude_persons, with_targets=True)
+    return mask.walkable, mask.get_targets(grid, danger_zones, only_persons, exclude_persons)
 
-def find_path_to_column(grid: list[list[Any]], start: tuple[int, int], target_x: int, danger_zones: list[list[bool]]):
-    queue = deque([start])
-    came_from = {start: None}
+def find_nearest_vectorized(grid: list[list[Any]], start: tuple[int, int], danger_zones: list[list[bool]], only_persons: bool = False, exclude_persons: bool = False, mask: WalkableMask | None = None):
+    start_x, start_y = start
+    if matches_target(grid[start_x][start_y], only_persons, exclude_persons):
+        return [start]
+    walkable, targets = vectorized_masks(grid, danger_zones, only_persons, exclude_persons, mask)
+    field = wavefront_field(walkable, targets & walkable, start)
+    return descend_field(field, start)
 
-    def walkable(position):
-        cell_x, cell_y = position
-        if danger_zones and danger_zones[cell_x][cell_y]:
-            return False
-        grid_object = grid[cell_x][cell_y]
-        if Mine is not None and isinstance(grid_object, Mine):
-            return False
-        # Allow empty cells, cells with items, or even the vehicle's own cell
-        return True
+def find_farthest_vectorized(grid: list[list[Any]], start: tuple[int, int], danger_zones: list[list[bool]], only_persons: bool = False, exclude_persons: bool = False, mask: WalkableMask | None = None):
+    walkable, targets = vectorized_masks(grid, danger_zones, only_persons, exclude_persons, mask)
+    start_x, start_y = start
+    sources = np.zeros(walkable.shape, dtype=bool)
+    sources[start_x, start_y] = True
+    field = wavefront_field(walkable, sources)
+    reached = np.where(targets & (field >= 0), field, -1)
+    if matches_target(grid[start_x][start_y], only_persons, exclude_persons):
+        reached[start_x, start_y] = 0
+    if reached.max() < 0:
+        return None
+    target_x, target_y = np.unravel_index(int(reached.argmax()), reached.shape)
+    path = descend_field(field, (int(target_x), int(target_y)))
+    path.reverse()
+    return path
 
-    # If already in target column and walkable, return start path
-    if start[0] == target_x and walkable(start):
+def find_path_to_column_vectorized(grid: list[list[Any]], start: tuple[int, int], target_x: int, danger_zones: list[list[bool]], mask: WalkableMask | None = None):
+    walkable = walkable_mask(grid, danger_zones) if mask is None else mask.walkable
+    start_x, start_y = start
+    if start_x == target_x and walkable[start_x, start_y]:
         return [start]
+    sources = np.zeros(walkable.shape, dtype=bool)
+    sources[target_x, :] = walkable[target_x, :]
+    field = wavefront_field(walkable, sources, start)
+    return descend_field(field, start)
 
-    while queue:
-        current = queue.popleft()
-        for neighbor in neighbors(grid, current):
-            if neighbor in came_from:
-                continue
-            if not walkable(neighbor):
-                continue
-            came_from[neighbor] = current
-            if neighbor[0] == target_x:
-                # Reconstruct path
-                path = [neighbor]
-                current_position = current
-                while current_position is not None:
-                    path.append(current_position)
-                    current_position = came_from[current_position]
-                path.reverse()
-                return path
-            queue.append(neighbor)
-    return None
\ No newline at end of file
+def bfs_vectorized(grid: list[list[Any]], start: tuple[int, int], goal: tuple[int, int]):
+    # Like bfs, every cell is traversable
+    walkable = np.ones((len(grid), len(grid[0])), dtype=bool)
+    sources = np.zeros(walkable.shape, dtype=bool)
+    sources[goal] = True
+    field = wavefront_field(walkable, sources, start)
+    return descend_field(field, start)
@@ -1,22 +1,24 @@
 import os
+import sys
+import time
+import random
 from map_manager import MapManager
-from visualization import Visualization, CELL_SIZE
+from journal import TurnJournal
+from legacy_saves import legacy_turns, convert_legacy_game
 from strategies import PickNearest, Kamikaze, Escort, Invader
-import pygame
+from pathfinding import bfs, find_path_to_column, SEARCH_METHODS, COLUMN_SEARCH_METHODS, DEFAULT_SEARCH_METHOD
 
 class GameEngine:
     def __init__(self, saved_game: str | None = None, saved_turn: int | None = None):
+        # pygame is only needed for the windowed game, headless runs never import it
+        import pygame
+        from visualization import Visualization, CELL_SIZE
         pygame.init()
 
-        try:
-            window_width = 50 * CELL_SIZE
-            window_height = 50 * CELL_SIZE
-        except Exception:
-            window_width = 800
-            window_height = 800
-        pygame.display.set_mode((window_width, window_height))
-        
         self.map_manager = MapManager(player1_strategy=PickNearest(), player2_strategy=PickNearest())
+        # Turn saves are written by a background thread, autoplay never
+        # waits for the disk
+        self.map_manager.enable_background_saves()
         initial_turn = 0
 
         if saved_game:
@@ -34,13 +36,107 @@ class GameEngine:
             except Exception:
                 pass
 
+        # The window follows the map size, known once the game is built
+        try:
+            window_width = self.map_manager.width * CELL_SIZE
+            window_height = self.map_manager.height * CELL_SIZE
+        except Exception:
+            window_width = 800
+            window_height = 800
+        pygame.display.set_mode((window_width, window_height))
+
         self.visualization = Visualization(self.map_manager)
         self.visualization.current_turn = initial_turn
 
     def start(self):
-        self.visualization.run()
+        try:
+            self.visualization.run()
+        finally:
+            metrics = self.map_manager.close_saves()
+            if metrics:
+                print(f"💾 - SAVES WRITTEN: {metrics['written']}/{metrics['submitted']} — MAX QUEUE DEPTH: {metrics['max_queue_depth']} — WRITE LATENCY AVG: {metrics['average_write_latency'] * 1000:.1f} MS, MAX: {metrics['max_write_latency'] * 1000:.1f} MS")
+
+def run_headless(max_turns: int):
+    # Runs a full game without pygame or a display (CI, batch nodes)
+    map_manager = MapManager(player1_strategy=PickNearest(), player2_strategy=PickNearest())
+    map_manager.new_game()
+    reason = map_manager.run_headless(max_turns)
+    print(f"ℹ️ - HEADLESS GAME FINISHED AT TURN {map_manager.current_turn}: {reason or 'TURN LIMIT REACHED'}")
+    print(f"ℹ️ - FINAL RESULTS: Player 1: {map_manager.player1.points}, Player 2: {map_manager.player2.points}")
+    csv_file = map_manager.generate_game_stats_csv(reason or 'turn_limit')
+    if csv_file:
+        print(f"📊 - GAME STATISTICS SAVED: {csv_file}")
+    return map_manager
+
+def run_search_benchmark(queries: int, seed: int = 0):
+    # Times every search method on the same random queries over a new game's
+    # map (danger zones and mines are walls), the configured
+    # pathfinding.search_method first. Paths must be as short as plain BFS
+    map_manager = MapManager(player1_strategy=PickNearest(), player2_strategy=PickNearest())
+    map_manager.new_game()
+    grid, danger_zones = map_manager.grid, map_manager.danger_zones
+    rng = random.Random(seed)
+    cells = [(x, y) for x in range(map_manager.width) for y in range(map_manager.height) if not danger_zones[x][y]]
+    point_queries = [(rng.choice(cells), rng.choice(cells)) for _ in range(queries)]
+    column_queries = [(rng.choice(cells), rng.randrange(map_manager.width)) for _ in range(queries)]
+    expected_points = [bfs(grid, start, goal, method='bfs', danger_zones=danger_zones) for start, goal in point_queries]
+    expected_columns = [find_path_to_column(grid, start, target_x, danger_zones, method='bfs') for start, target_x in column_queries]
+    results = {}
+    for method in sorted(SEARCH_METHODS, key=lambda method: method != DEFAULT_SEARCH_METHOD):
+        started = time.perf_counter()
+        paths = [bfs(grid, start, goal, method=method, danger_zones=danger_zones) for start, goal in point_queries]
+        point_time = time.perf_counter() - started
+        column_time = None
+        column_paths = expected_columns
+        if method in COLUMN_SEARCH_METHODS:
+            started = time.perf_counter()
+            column_paths = [find_path_to_column(grid, start, target_x, danger_zones, method=method) for start, target_x in column_queries]
+            column_time = time.perf_counter() - started
+        mismatches = sum(1 for path, expected in zip(paths + column_paths, expected_points + expected_columns)
+                         if (path is None) != (expected is None) or (path is not None and len(path) != len(expected)))
+        results[method] = {'points': point_time, 'columns': column_time, 'mismatches': mismatches}
+        configured = ' (CONFIGURED)' if method == DEFAULT_SEARCH_METHOD else ''
+        column_text = f"{column_time:.3f} S" if column_time is not None else 'BFS FALLBACK'
+        print(f"⏱️ - {method.upper()}{configured}: {queries} POINT QUERIES IN {point_time:.3f} S, {queries} COLUMN QUERIES IN {column_text}, {mismatches} LENGTH MISMATCHES")
+    return results
+
+def convert_legacy(folder: str):
+    # Converts a game saved as turn_N.pkl files into a replay file
+    map_manager = MapManager(player1_strategy=PickNearest(), player2_strategy=PickNearest())
+    try:
+        converted = convert_legacy_game(folder, map_manager)
+    except Exception as error:
+        print(f"❌ - ERROR CONVERTING SAVED GAME {folder}: {error}")
+        return 0
+    print(f"✅ - CONVERTED {converted} TURNS OF {folder} TO {os.path.join(folder, 'game.replay')}")
+    return converted
 
 def main():
+    if '--convert-legacy' in sys.argv:
+        try:
+            convert_legacy(sys.argv[sys.argv.index('--convert-legacy') + 1])
+        except IndexError:
+            print("❌ - USAGE: python rescue_simulator.py --convert-legacy saved_games/Game_N")
+        return
+
+    if '--benchmark-search' in sys.argv:
+        queries = 200
+        try:
+            queries = int(sys.argv[sys.argv.index('--benchmark-search') + 1])
+        except (IndexError, ValueError):
+            pass
+        run_search_benchmark(queries)
+        return
+
+    if '--headless' in sys.argv:
+        max_turns = 1000
+        try:
+            max_turns = int(sys.argv[sys.argv.index('--headless') + 1])
+        except (IndexError, ValueError):
+            pass
+        run_headless(max_turns)
+        return
+
     print("=== RESCUE SIMULATOR ===")
     print("NEW GAME OR LOAD SAVED GAME?")
     print("  [N] - NEW GAME")
@@ -75,25 +171,25 @@ def main():
                         if game_index < 0 or game_index >= len(saved_games):
                             raise ValueError()
                         selected_folder = os.path.join(base_directory, saved_games[game_index])
-                        turn_files = [file for file in os.listdir(selected_folder) if file.startswith('turn_') and file.endswith('.pkl')]
-                        turn_files.sort(key=lambda x: int(x.split('_')[1].split('.')[0]))
-                        if not turn_files:
+                        journal = TurnJournal(selected_folder)
+                        saved_turns = [(turn, journal.path) for turn in journal.turns()]
+                        if not saved_turns and legacy_turns(selected_folder):
+                            print(f"❗- GAME SAVED IN THE OLD FORMAT, CONVERT IT FIRST: python rescue_simulator.py --convert-legacy {selected_folder}")
+                            print("STARTING NEW GAME INSTEAD.")
+                            choice = 'n'
+                        elif not saved_turns:
                             print("❗- NO TURNS FOUND IN SELECTED GAME. STARTING NEW GAME INSTEAD.")
                             choice = 'n'
                         else:
                             print("AVAILABLE TURNS:")
-                            for turn_index, turn_file in enumerate(turn_files):
-                                print(f"  {turn_index}: {turn_file}")
-                            turn_selection = input(f"SELECT TURN INDEX [0-{len(turn_files)-1}] (ENTER for last turn): ").strip()
+                            for turn_index, (turn, _) in enumerate(saved_turns):
+                                print(f"  {turn_index}: TURN {turn}")
+                            turn_selection = input(f"SELECT TURN INDEX [0-{len(saved_turns)-1}] (ENTER for last turn): ").strip()
                             if turn_selection == '':
-                                turn_file_index = len(turn_files) - 1
+                                turn_file_index = len(saved_turns) - 1
                             else:
                                 turn_file_index = int(turn_selection)
-                            selected_path = os.path.join(selected_folder, turn_files[turn_file_index])
-                            try:
-                                selected_turn = int(turn_files[turn_file_index].split('_')[1].split('.')[0])
-                            except Exception:
-                                selected_turn = None
+                            selected_turn, selected_path = saved_turns[turn_file_index]
                     except Exception:
                         print("❗- INVALID SELECTION. STARTING NEW GAME INSTEAD.")
                         choice = 'n'
@@ -0,0 +1,360 @@
+import sys
+import struct
+from array import array
+
+# Binary encoding of the save states and deltas written to the replay file
+# (see journal.py), read back without pickle. Only what cannot be derived
+# is stored: object types as one-byte codes, coordinates as packed unsigned
+# 16-bit pairs, paths as packed coordinate arrays. Danger zones, capacities
+# and item values follow from the types and the mines and are not saved.
+# Every encoded record starts with SCHEMA_VERSION.
+SCHEMA_VERSION = 1
+
+# Type codes. Names outside a table are written as NAME_FALLBACK followed
+# by the UTF-8 name, so new strategies or vehicle states still round-trip
+NAME_FALLBACK = 255
+ITEM_TYPES = ('Person', 'Weapon', 'Clothing', 'Food', 'Heal')
+MINE_TYPES = ('Mine_O1', 'Mine_O2', 'Mine_T1', 'Mine_T2', 'Mine_G1')
+VEHICLE_TYPES = ('Truck', 'Jeep', 'Car', 'Motorcycle')
+STRATEGIES = (None, 'PickNearest', 'Kamikaze', 'Escort', 'Invader', 'FullSafe')
+VEHICLE_STATES = ('idle', 'collecting', 'returning', 'waiting', 'attacking', 'escorting')
+
+# Fields of each saved object, in encoding order
+VEHICLE_FIELDS = ('type', 'position', 'path', 'state', 'load', 'under_item', 'strategy')
+MINE_FIELDS = ('type', 'position', 'x_radius', 'y_radius')
+
+# Sections present in a delta, one bit each
+DELTA_SIZE = 1
+DELTA_EXPLOSIONS = 2
+DELTA_PLAYER1 = 4
+DELTA_PLAYER2 = 8
+DELTA_MINES = 16
+DELTA_ITEMS = 32
+PLAYER_POINTS = 1
+PLAYER_VEHICLES = 2
+
+# A path either lists its cells or drops steps from the previous path
+PATH_CELLS = 0
+PATH_SKIP = 1
+
+UINT8 = struct.Struct('<B')
+UINT16 = struct.Struct('<H')
+UINT32 = struct.Struct('<I')
+INT32 = struct.Struct('<i')
+POSITION = struct.Struct('<HH')
+EXPLOSION = struct.Struct('<HHB')
+SIZE = struct.Struct('<HH')
+
+
+class Encoder:
+    def __init__(self):
+        self.buffer = bytearray()
+
+    def pack(self, layout: struct.Struct, *values):
+        self.buffer += layout.pack(*values)
+
+    def name(self, table: tuple, name):
+        if name in table:
+            self.pack(UINT8, table.index(name))
+            return
+        encoded = str(name).encode('utf-8')
+        self.pack(UINT8, NAME_FALLBACK)
+        self.pack(UINT16, len(encoded))
+        self.buffer += encoded
+
+    def position(self, position):
+        self.pack(POSITION, *position)
+
+    def path(self, path):
+        if isinstance(path, int):
+            self.pack(UINT8, PATH_SKIP)
+            self.pack(UINT32, path)
+            return
+        cells = array('H', [coordinate for cell in path for coordinate in cell])
+        if sys.byteorder != 'little':
+            cells.byteswap()
+        self.pack(UINT8, PATH_CELLS)
+        self.pack(UINT32, len(path))
+        self.buffer += cells.tobytes()
+
+    def item(self, item: dict):
+        self.name(ITEM_TYPES, item['type'])
+        self.position(item['position'])
+
+    def items(self, items: list):
+        self.pack(UINT32, len(items))
+        for item in items:
+            self.item(item)
+
+    def vehicle_field(self, field: str, value):
+        if field == 'type':
+            self.name(VEHICLE_TYPES, value)
+        elif field == 'position':
+            self.position(value)
+        elif field == 'path':
+            self.path(value)
+        elif field == 'state':
+            self.name(VEHICLE_STATES, value)
+        elif field == 'load':
+            self.items(value)
+        elif field == 'under_item':
+            self.pack(UINT8, value is not None)
+            if value is not None:
+                self.item(value)
+        elif field == 'strategy':
+            self.name(STRATEGIES, value)
+
+    def mine_field(self, field: str, value):
+        if field == 'type':
+            self.name(MINE_TYPES, value)
+        elif field == 'position':
+            self.position(value)
+        else:
+            self.pack(UINT16, value)
+
+    def entry(self, fields: tuple, encode_field, entry: dict, changed_only: bool = False):
+        # Bit mask of the fields present, then the fields
+        mask = 0
+        for bit, field in enumerate(fields):
+            if not changed_only or field in entry:
+                mask |= 1 << bit
+        self.pack(UINT8, mask)
+        for bit, field in enumerate(fields):
+            if mask & (1 << bit):
+                encode_field(field, entry[field])
+
+    def vehicle(self, vehicle: dict, changed_only: bool = False):
+        self.entry(VEHICLE_FIELDS, self.vehicle_field, vehicle, changed_only)
+
+    def mine(self, mine: dict, changed_only: bool = False):
+        self.entry(MINE_FIELDS, self.mine_field, mine, changed_only)
+
+    def explosions(self, explosions: list):
+        self.pack(UINT16, len(explosions))
+        for explosion in explosions:
+            self.pack(EXPLOSION, *explosion['pos'], explosion['ttl'])
+
+    def list_delta(self, delta: dict, encode_entry):
+        self.pack(UINT32, delta['count'])
+        self.pack(UINT32, len(delta['added']))
+        for index, entry in delta['added'].items():
+            self.pack(UINT32, index)
+            encode_entry(entry)
+        self.pack(UINT32, len(delta['patched']))
+        for index, changes in delta['patched'].items():
+            self.pack(UINT32, index)
+            encode_entry(changes, True)
+
+
+class Decoder:
+    def __init__(self, data: bytes):
+        self.data = memoryview(data)
+        self.offset = 0
+
+    def unpack(self, layout: struct.Struct):
+        values = layout.unpack_from(self.data, self.offset)
+        self.offset += layout.size
+        return values
+
+    def uint8(self):
+        return self.unpack(UINT8)[0]
+
+    def uint16(self):
+        return self.unpack(UINT16)[0]
+
+    def uint32(self):
+        return self.unpack(UINT32)[0]
+
+    def name(self, table: tuple):
+        code = self.uint8()
+        if code != NAME_FALLBACK:
+            if code >= len(table):
+                raise ValueError(f"unknown type code {code}")
+            return table[code]
+        length = self.uint16()
+        name = bytes(self.data[self.offset:self.offset + length]).decode('utf-8')
+        self.offset += length
+        return name
+
+    def position(self):
+        return self.unpack(POSITION)
+
+    def path(self):
+        kind = self.uint8()
+        if kind == PATH_SKIP:
+            return self.uint32()
+        length = self.uint32()
+        cells = array('H')
+        cells.frombytes(self.data[self.offset:self.offset + 4 * length])
+        self.offset += 4 * length
+        if sys.byteorder != 'little':
+            cells.byteswap()
+        return list(zip(cells[0::2], cells[1::2]))
+
+    def item(self):
+        item_type = self.name(ITEM_TYPES)
+        return {'type': item_type, 'position': self.position()}
+
+    def items(self):
+        return [self.item() for _ in range(self.uint32())]
+
+    def vehicle_field(self, field: str):
+        if field == 'type':
+            return self.name(VEHICLE_TYPES)
+        if field == 'position':
+            return self.position()
+        if field == 'path':
+            return self.path()
+        if field == 'state':
+            return self.name(VEHICLE_STATES)
+        if field == 'load':
+            return self.items()
+        if field == 'under_item':
+            return self.item() if self.uint8() else None
+        return self.name(STRATEGIES)
+
+    def mine_field(self, field: str):
+        if field == 'type':
+            return self.name(MINE_TYPES)
+        if field == 'position':
+            return self.position()
+        return self.uint16()
+
+    def entry(self, fields: tuple, decode_field):
+        mask = self.uint8()
+        return {field: decode_field(field) for bit, field in enumerate(fields) if mask & (1 << bit)}
+
+    def vehicle(self):
+        return self.entry(VEHICLE_FIELDS, self.vehicle_field)
+
+    def mine(self):
+        return self.entry(MINE_FIELDS, self.mine_field)
+
+    def explosions(self):
+        explosions = []
+        for _ in range(self.uint16()):
+            x, y, time_to_live = self.unpack(EXPLOSION)
+            explosions.append({'pos': (x, y), 'ttl': time_to_live})
+        return explosions
+
+    def list_delta(self, decode_entry):
+        count = self.uint32()
+        added = {}
+        for _ in range(self.uint32()):
+            index = self.uint32()
+            added[index] = decode_entry()
+        patched = {}
+        for _ in range(self.uint32()):
+            index = self.uint32()
+            patched[index] = decode_entry()
+        return {'count': count, 'added': added, 'patched': patched}
+
+
+def _check_version(decoder: Decoder):
+    version = decoder.uint16()
+    if version != SCHEMA_VERSION:
+        raise ValueError(f"unsupported save schema version {version}")
+
+
+def encode_state(state: dict):
+    encoder = Encoder()
+    encoder.pack(UINT16, SCHEMA_VERSION)
+    encoder.pack(UINT32, state['turn'])
+    encoder.pack(SIZE, state['width'], state['height'])
+    encoder.explosions(state.get('explosions', []))
+    for player in ('player1', 'player2'):
+        player_state = state.get(player, {})
+        encoder.pack(INT32, player_state.get('points', 0))
+        vehicles = player_state.get('vehicles', [])
+        encoder.pack(UINT32, len(vehicles))
+        for vehicle in vehicles:
+            encoder.vehicle(vehicle)
+    mines = state.get('mines', [])
+    encoder.pack(UINT32, len(mines))
+    for mine in mines:
+        encoder.mine(mine)
+    encoder.items(state.get('items', []))
+    return bytes(encoder.buffer)
+
+
+def decode_state(data: bytes):
+    decoder = Decoder(data)
+    _check_version(decoder)
+    state = {'turn': decoder.uint32()}
+    state['width'], state['height'] = decoder.unpack(SIZE)
+    state['explosions'] = decoder.explosions()
+    for player in ('player1', 'player2'):
+        points = decoder.unpack(INT32)[0]
+        state[player] = {'points': points, 'vehicles': [decoder.vehicle() for _ in range(decoder.uint32())]}
+    state['mines'] = [decoder.mine() for _ in range(decoder.uint32())]
+    state['items'] = decoder.items()
+    return state
+
+
+def encode_delta(delta: dict):
+    # Encodes a journal.diff_state() delta
+    encoder = Encoder()
+    encoder.pack(UINT16, SCHEMA_VERSION)
+    sections = 0
+    if 'width' in delta or 'height' in delta:
+        sections |= DELTA_SIZE
+    if 'explosions' in delta:
+        sections |= DELTA_EXPLOSIONS
+    if 'player1' in delta:
+        sections |= DELTA_PLAYER1
+    if 'player2' in delta:
+        sections |= DELTA_PLAYER2
+    if 'mines' in delta:
+        sections |= DELTA_MINES
+    if 'items' in delta:
+        sections |= DELTA_ITEMS
+    encoder.pack(UINT8, sections)
+    if sections & DELTA_SIZE:
+        encoder.pack(SIZE, delta['width'], delta['height'])
+    if sections & DELTA_EXPLOSIONS:
+        encoder.explosions(delta['explosions'])
+    for player, bit in (('player1', DELTA_PLAYER1), ('player2', DELTA_PLAYER2)):
+        if not sections & bit:
+            continue
+        player_delta = delta[player]
+        player_sections = (PLAYER_POINTS if 'points' in player_delta else 0) | (PLAYER_VEHICLES if 'vehicles' in player_delta else 0)
+        encoder.pack(UINT8, player_sections)
+        if player_sections & PLAYER_POINTS:
+            encoder.pack(INT32, player_delta['points'])
+        if player_sections & PLAYER_VEHICLES:
+            encoder.list_delta(player_delta['vehicles'], encoder.vehicle)
+    if sections & DELTA_MINES:
+        encoder.list_delta(delta['mines'], encoder.mine)
+    if sections & DELTA_ITEMS:
+        encoder.pack(UINT32, len(delta['items']['removed']))
+        for position in delta['items']['removed']:
+            encoder.position(position)
+        encoder.items(delta['items']['added'])
+    return bytes(encoder.buffer)
+
+
+def decode_delta(data: bytes):
+    decoder = Decoder(data)
+    _check_version(decoder)
+    sections = decoder.uint8()
+    delta = {}
+    if sections & DELTA_SIZE:
+        delta['width'], delta['height'] = decoder.unpack(SIZE)
+    if sections & DELTA_EXPLOSIONS:
+        delta['explosions'] = decoder.explosions()
+    for player, bit in (('player1', DELTA_PLAYER1), ('player2', DELTA_PLAYER2)):
+        if not sections & bit:
+            continue
+        player_sections = decoder.uint8()
+        player_delta = {}
+        if player_sections & PLAYER_POINTS:
+            player_delta['points'] = decoder.unpack(INT32)[0]
+        if player_sections & PLAYER_VEHICLES:
+            player_delta['vehicles'] = decoder.list_delta(decoder.vehicle)
+        delta[player] = player_delta
+    if sections & DELTA_MINES:
+        delta['mines'] = decoder.list_delta(decoder.mine)
+    if sections & DELTA_ITEMS:
+        removed = [decoder.position() for _ in range(decoder.uint32())]
+        delta['items'] = {'removed': removed, 'added': decoder.items()}
+    return delta
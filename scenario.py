@@ -0,0 +1,125 @@
+import os
+import json
+from math import gcd
+
+# Procedural scenario settings, read from the "scenario" section of
+# config.json. Every missing key falls back to the classic 50x50 game
+CONFIG_PATH = os.path.join(os.path.dirname(__file__), 'config.json')
+
+DEFAULT_SCENARIO = {
+    'width': 50,
+    'height': 50,
+    # Items of a given type, as fixed counts and/or as a fraction of the
+    # map cells (item_density); both are added up
+    'items': {'Person': 10},
+    'item_density': {},
+    # Items whose type is drawn at random among random_item_types
+    'random_items': 50,
+    'random_item_types': ['Weapon', 'Clothing', 'Food', 'Heal'],
+    'mines': {'Mine_O1': 1, 'Mine_O2': 1, 'Mine_T1': 1, 'Mine_T2': 1, 'Mine_G1': 1},
+    # Generated fleet for both players; None keeps the "players" lists
+    'fleet': None,
+}
+
+DEFAULT_FLEET = {
+    'vehicles_per_player': 10,
+    # Relative weights of each vehicle type and strategy in the fleet
+    'composition': {'Truck': 2, 'Jeep': 3, 'Car': 3, 'Motorcycle': 2},
+    'strategies': {'PickNearest': 1},
+}
+
+# Cells kept free between a mine and the map border (margin_x, margin_y),
+# as in the classic game; clamped on small maps
+MINE_MARGINS = {
+    'Mine_O1': (11, 10),
+    'Mine_O2': (6, 5),
+    'Mine_T1': (11, 0),
+    'Mine_T2': (2, 5),
+    'Mine_G1': (8, 0),
+}
+
+
+def load_scenario(config: dict | None = None):
+    # Scenario settings merged over DEFAULT_SCENARIO
+    scenario = dict(DEFAULT_SCENARIO)
+    try:
+        if config is None:
+            with open(CONFIG_PATH, 'r', encoding='utf-8') as config_file:
+                config = json.load(config_file)
+        scenario_config = config.get('scenario', {}) if isinstance(config, dict) else {}
+        scenario.update(scenario_config or {})
+    except Exception as error:
+        print(f"❌ - ERROR LOADING SCENARIO CONFIGURATION: {error}, USING DEFAULT SCENARIO")
+    scenario['width'] = max(3, int(scenario['width']))
+    scenario['height'] = max(1, int(scenario['height']))
+    if scenario.get('fleet') is not None:
+        fleet = dict(DEFAULT_FLEET)
+        fleet.update(scenario['fleet'])
+        # Each player's vehicles start on their own cell of the base column
+        if int(fleet['vehicles_per_player']) > scenario['height']:
+            print(f"❌ - ERROR IN SCENARIO FLEET: {fleet['vehicles_per_player']} VEHICLES PER PLAYER DO NOT FIT IN A BASE COLUMN OF {scenario['height']} CELLS, USING {scenario['height']}")
+            fleet['vehicles_per_player'] = scenario['height']
+        scenario['fleet'] = fleet
+    return scenario
+
+
+def item_counts(scenario: dict):
+    # Number of items to place per type (random items excluded)
+    cells = scenario['width'] * scenario['height']
+    counts = {}
+    for item_type, count in scenario.get('items', {}).items():
+        counts[item_type] = counts.get(item_type, 0) + int(count)
+    for item_type, density in scenario.get('item_density', {}).items():
+        counts[item_type] = counts.get(item_type, 0) + int(float(density) * cells)
+    return counts
+
+
+def mine_margins(mine_type: str, width: int, height: int):
+    # Margins of a mine type, clamped so the allowed area is never empty
+    margin_x, margin_y = MINE_MARGINS.get(mine_type, (1, 0))
+    return min(margin_x, (width - 1) // 2), min(margin_y, (height - 1) // 2)
+
+
+def weighted_sequence(weights: dict[str, float], size: int):
+    # size names spread by weight and interleaved along the sequence: the
+    # i-th slot takes the name whose cumulative share covers (i + 0.5) / size
+    names = [name for name, weight in weights.items() if weight > 0]
+    if not names or size <= 0:
+        return []
+    total = float(sum(weights[name] for name in names))
+    bounds = []
+    running = 0.0
+    for name in names:
+        running += weights[name] / total
+        bounds.append(running)
+    sequence = []
+    index = 0
+    for slot in range(size):
+        share = (slot + 0.5) / size
+        while index < len(names) - 1 and share > bounds[index]:
+            index += 1
+        sequence.append(names[index])
+    # Interleave so neighbouring vehicles are not all of the same kind
+    stride = _coprime_stride(size)
+    return [sequence[(slot * stride) % size] for slot in range(size)]
+
+
+def _coprime_stride(size: int):
+    # A stride close to size / golden ratio that visits every slot once
+    stride = max(1, int(size * 0.618))
+    while gcd(stride, size) != 1:
+        stride += 1
+    return stride
+
+
+def fleet_layout(fleet: dict, height: int):
+    # One player's generated fleet as [(vehicle type, strategy, y), ...],
+    # spread evenly along the base column
+    size = int(fleet.get('vehicles_per_player', 0))
+    if size > height:
+        raise ValueError(f"{size} vehicles do not fit in a base column of {height} cells")
+    types = weighted_sequence(fleet.get('composition', {}), size)
+    strategies = weighted_sequence(fleet.get('strategies', {}), size)
+    if len(types) != size or len(strategies) != size:
+        return []
+    return [(types[index], strategies[index], (2 * index + 1) * height // (2 * size)) for index in range(size)]
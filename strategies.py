@@ -1,4 +1,5 @@
-from pathfinding import find_nearest, find_farthest, find_path_to_column, bfs
+from danger_map import G1_PERIOD
+from pathfinding import find_farthest, field_distance, path_from_field, find_timed_path, GOAL_ITEM, GOAL_COLUMN
 
 class Strategy:
     def plan(self, vehicle, map_manager):
@@ -10,46 +11,56 @@ class PickNearest(Strategy):
             return
         
         if len(vehicle.load) < vehicle.capacity:
-            path = find_nearest(map_manager.grid, vehicle.position, map_manager.danger_zones, 
-                              only_persons=vehicle.only_persons, exclude_persons=vehicle.exclude_persons)
+            field = map_manager.get_item_field(only_persons=vehicle.only_persons, exclude_persons=vehicle.exclude_persons)
+            path = path_from_field(field, vehicle.position)
             if path:
                 vehicle.path = path[1:]
                 vehicle.state = 'collecting'
                 return
             else:
-                base_x = 0 if map_manager.player1 is vehicle.team else map_manager.width - 1
-                path = find_path_to_column(map_manager.grid, vehicle.position, base_x, map_manager.danger_zones)
+                path = path_from_field(map_manager.get_base_field(vehicle.team), vehicle.position)
                 if path:
                     vehicle.path = path[1:]
                     vehicle.state = 'returning'
                 return
         
-        base_x = 0 if map_manager.player1 is vehicle.team else map_manager.width - 1
-        path = find_path_to_column(map_manager.grid, vehicle.position, base_x, map_manager.danger_zones)
+        path = path_from_field(map_manager.get_base_field(vehicle.team), vehicle.position)
         if path:
             vehicle.path = path[1:]
             vehicle.state = 'returning'
     
 class Kamikaze(Strategy):
+    def _follow_target(self, vehicle, enemy_vehicles, map_manager):
+        # The locked target is the enemy closest to the end of the current
+        # path. Once it has moved, a single search to its cell re-aims
+        if not enemy_vehicles:
+            return
+        end_x, end_y = vehicle.path[-1]
+        target = min(enemy_vehicles, key=lambda enemy: abs(enemy.position[0] - end_x) + abs(enemy.position[1] - end_y))
+        if target.position == vehicle.path[-1]:
+            return
+        try:
+            path = map_manager.find_path(vehicle.position, target.position)
+        except Exception:
+            path = None
+        if path and len(path) > 1:
+            vehicle.path = path[1:]
+
     def plan(self, vehicle, map_manager):
+        enemy_vehicles = map_manager.player2.vehicles if vehicle.team == map_manager.player1 else map_manager.player1.vehicles
+        
         if vehicle.path:
+            if vehicle.state == 'attacking':
+                self._follow_target(vehicle, enemy_vehicles, map_manager)
             return
         
-        enemy_vehicles = map_manager.player2.vehicles if vehicle.team == map_manager.player1 else map_manager.player1.vehicles
-        
-        closest_enemy = None
+        # One search finds the closest of all the enemies
         closest_path = None
-        minimum_distance = float('inf')
-        
-        for enemy in enemy_vehicles:
-            try:
-                path = bfs(map_manager.grid, vehicle.position, enemy.position)
-                if path and len(path) < minimum_distance:
-                    minimum_distance = len(path)
-                    closest_path = path
-                    closest_enemy = enemy
-            except Exception:
-                continue
+        try:
+            enemy_positions = {enemy.position for enemy in enemy_vehicles}
+            closest_path = map_manager.find_path_to_nearest(vehicle.position, enemy_positions)
+        except Exception:
+            closest_path = None
         
         if closest_path and len(closest_path) > 1:
             vehicle.path = closest_path[1:]
@@ -69,22 +80,15 @@ class Escort(Strategy):
             PickNearest().plan(vehicle, map_manager)
             return
         
-        closest_ally = None
+        # One search finds the closest of the allies worth escorting
         closest_path = None
-        minimum_distance = float('inf')
+        try:
+            ally_positions = {ally.position for ally in allied_vehicles if ally.state == 'collecting' or len(ally.load) > 0}
+            closest_path = map_manager.find_path_to_nearest(vehicle.position, ally_positions)
+        except Exception:
+            closest_path = None
         
-        for ally in allied_vehicles:
-            if ally.state == 'collecting' or len(ally.load) > 0:
-                try:
-                    path = bfs(map_manager.grid, vehicle.position, ally.position)
-                    if path and len(path) < minimum_distance:
-                        minimum_distance = len(path)
-                        closest_path = path
-                        closest_ally = ally
-                except Exception:
-                    continue
-        
-        if closest_ally and minimum_distance <= 3:
+        if closest_path and len(closest_path) <= 3:
             PickNearest().plan(vehicle, map_manager)
             return
         
@@ -103,110 +107,56 @@ class Invader(Strategy):
             return
         
         if len(vehicle.load) < vehicle.capacity:
-            path = find_farthest(map_manager.grid, vehicle.position, map_manager.danger_zones, 
-                               only_persons=vehicle.only_persons, exclude_persons=vehicle.exclude_persons)
+            # The shared field tells us cheaply whether any target is reachable,
+            # only then we pay for the single-source search to the farthest one
+            path = None
+            field = map_manager.get_item_field(only_persons=vehicle.only_persons, exclude_persons=vehicle.exclude_persons)
+            if field_distance(field, vehicle.position) != -1:
+                path = find_farthest(map_manager.grid, vehicle.position, map_manager.danger_zones, 
+                                   only_persons=vehicle.only_persons, exclude_persons=vehicle.exclude_persons,
+                                   mask=map_manager.get_walkable_mask())
             if path:
                 vehicle.path = path[1:]
                 vehicle.state = 'collecting'
                 return
             else:
-                base_x = 0 if map_manager.player1 is vehicle.team else map_manager.width - 1
-                path = find_path_to_column(map_manager.grid, vehicle.position, base_x, map_manager.danger_zones)
+                path = path_from_field(map_manager.get_base_field(vehicle.team), vehicle.position)
                 if path:
                     vehicle.path = path[1:]
                     vehicle.state = 'returning'
                 return
         
-        base_x = 0 if map_manager.player1 is vehicle.team else map_manager.width - 1
-        path = find_path_to_column(map_manager.grid, vehicle.position, base_x, map_manager.danger_zones)
+        path = path_from_field(map_manager.get_base_field(vehicle.team), vehicle.position)
         if path:
             vehicle.path = path[1:]
             vehicle.state = 'returning'
 
 class FullSafe(Strategy):
-    def _get_turns_until_g1_toggle(self, map_manager):
-        current_turn = getattr(map_manager, 'current_turn', 0)
-        turns_until_toggle = (5 - ((current_turn + 1) % 5)) % 5
-        if turns_until_toggle == 0:
-            turns_until_toggle = 5
-        return turns_until_toggle
-    
-    def _create_danger_zones_with_timing(self, map_manager, path_length):
-        from classes.Mine import Mine_G1
-        
-        danger_zones = [[False for _ in range(map_manager.height)] for _ in range(map_manager.width)]
-        
-        for x in range(map_manager.width):
-            for y in range(map_manager.height):
-                danger_zones[x][y] = map_manager.danger_zones[x][y]
-        
-        turns_until_toggle = self._get_turns_until_g1_toggle(map_manager)
-        
-        for mine in map_manager.mines:
-            mine_x, mine_y = mine.position
-            
-            if isinstance(mine, Mine_G1):
-                is_currently_active = (mine.x_radius > 0 and mine.y_radius > 0)
-                
-                if is_currently_active:
-                    safety_buffer = 2
-                    for delta_x in range(-mine.x_radius - safety_buffer, mine.x_radius + safety_buffer + 1):
-                        for delta_y in range(-mine.y_radius - safety_buffer, mine.y_radius + safety_buffer + 1):
-                            new_x, new_y = mine_x + delta_x, mine_y + delta_y
-                            if 0 <= new_x < map_manager.width and 0 <= new_y < map_manager.height:
-                                danger_zones[new_x][new_y] = True
-                else:
-                    if path_length + 2 >= turns_until_toggle:
-                        max_radius = 7
-                        safety_buffer = 2
-                        for delta_x in range(-max_radius - safety_buffer, max_radius + safety_buffer + 1):
-                            for delta_y in range(-max_radius - safety_buffer, max_radius + safety_buffer + 1):
-                                new_x, new_y = mine_x + delta_x, mine_y + delta_y
-                                if 0 <= new_x < map_manager.width and 0 <= new_y < map_manager.height:
-                                    danger_zones[new_x][new_y] = True
-            else:
-                safety_buffer = 1
-                for delta_x in range(-mine.x_radius - safety_buffer, mine.x_radius + safety_buffer + 1):
-                    for delta_y in range(-mine.y_radius - safety_buffer, mine.y_radius + safety_buffer + 1):
-                        new_x, new_y = mine_x + delta_x, mine_y + delta_y
-                        if 0 <= new_x < map_manager.width and 0 <= new_y < map_manager.height:
-                            danger_zones[new_x][new_y] = True
-        
-        return danger_zones
+    def _get_planning_walls(self, map_manager):
+        # Per-phase cells to keep away from while planning: mines with a
+        # safety buffer of 1, G1 mines with a buffer of 2 around their full
+        # area while they are on, plus mines and vehicles as obstacles.
+        # Shared by every FullSafe vehicle through the map's turn cache
+        return map_manager.get_phase_danger(mine_buffer=1, g1_buffer=2, with_obstacles=True)
     
     def _is_path_safe_with_timing(self, path, map_manager):
         if not path or len(path) < 2:
             return True
         
-        from classes.Mine import Mine_G1
-        
-        turns_until_toggle = self._get_turns_until_g1_toggle(map_manager)
-        path_length = len(path) - 1
+        # One lookup per step in the danger bitmap of the turn the vehicle
+        # will be standing there, following the G1 schedule
+        phase_danger = map_manager.get_phase_danger()
+        current_turn = map_manager.current_turn
+        width, height = map_manager.width, map_manager.height
         
         for step, position in enumerate(path[1:], 1):
             pos_x, pos_y = position
             
-            if not (0 <= pos_x < map_manager.width and 0 <= pos_y < map_manager.height):
+            if not (0 <= pos_x < width and 0 <= pos_y < height):
                 return False
             
-            for mine in map_manager.mines:
-                mine_x, mine_y = mine.position
-                
-                if isinstance(mine, Mine_G1):
-                    is_active = (mine.x_radius > 0 and mine.y_radius > 0)
-                    
-                    turn_when_at_position = step
-                    will_toggle_before = (turn_when_at_position >= turns_until_toggle)
-                    
-                    mine_state_then = not is_active if will_toggle_before else is_active
-                    
-                    if mine_state_then:
-                        max_radius = 7
-                        if abs(pos_x - mine_x) <= max_radius and abs(pos_y - mine_y) <= max_radius:
-                            return False
-                else:
-                    if abs(pos_x - mine_x) <= mine.x_radius and abs(pos_y - mine_y) <= mine.y_radius:
-                        return False
+            if phase_danger[(current_turn + step) % G1_PERIOD][pos_x * height + pos_y]:
+                return False
         
         return True
     
@@ -220,42 +170,26 @@ class FullSafe(Strategy):
         if vehicle.path:
             return
         
-        max_path_estimate = int((map_manager.width**2 + map_manager.height**2)**0.5)
+        # One space-time search per goal: the path it returns already avoids
+        # every mine at the turn each step is taken, G1 toggles included
+        phase_walls = self._get_planning_walls(map_manager)
+        base_x = 0 if map_manager.player1 is vehicle.team else map_manager.width - 1
         
         if len(vehicle.load) < vehicle.capacity:
-            danger_zones_optimized = self._create_danger_zones_with_timing(map_manager, max_path_estimate // 2)
-            path = find_nearest(map_manager.grid, vehicle.position, danger_zones_optimized,
-                              only_persons=vehicle.only_persons, exclude_persons=vehicle.exclude_persons)
-            
-            if path and len(path) > 1:
-                if self._is_path_safe_with_timing(path, map_manager):
-                    vehicle.path = path[1:]
-                    vehicle.state = 'collecting'
-                    return
-            
-            base_x = 0 if map_manager.player1 is vehicle.team else map_manager.width - 1
-            danger_zones_base = self._create_danger_zones_with_timing(map_manager, max_path_estimate)
-            path = find_path_to_column(map_manager.grid, vehicle.position, base_x, danger_zones_base)
+            path = find_timed_path(map_manager.grid, vehicle.position, map_manager.current_turn, phase_walls, GOAL_ITEM,
+                                   only_persons=vehicle.only_persons, exclude_persons=vehicle.exclude_persons)
             
             if path and len(path) > 1:
-                if self._is_path_safe_with_timing(path, map_manager):
-                    vehicle.path = path[1:]
-                    vehicle.state = 'returning'
-                    return
-            
-            vehicle.path = []
-            vehicle.state = 'waiting'
-            return
+                vehicle.path = path[1:]
+                vehicle.state = 'collecting'
+                return
         
-        base_x = 0 if map_manager.player1 is vehicle.team else map_manager.width - 1
-        danger_zones_base = self._create_danger_zones_with_timing(map_manager, max_path_estimate)
-        path = find_path_to_column(map_manager.grid, vehicle.position, base_x, danger_zones_base)
+        path = find_timed_path(map_manager.grid, vehicle.position, map_manager.current_turn, phase_walls, GOAL_COLUMN, goal=base_x)
         
         if path and len(path) > 1:
-            if self._is_path_safe_with_timing(path, map_manager):
-                vehicle.path = path[1:]
-                vehicle.state = 'returning'
-                return
+            vehicle.path = path[1:]
+            vehicle.state = 'returning'
+            return
         
         vehicle.path = []
         vehicle.state = 'waiting'
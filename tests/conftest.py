@@ -0,0 +1,47 @@
+import os
+import sys
+import random
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from map_manager import MapManager
+from strategies import PickNearest
+
+
+@pytest.fixture
+def saves_dir(tmp_path, monkeypatch):
+    # Games are saved under ./saved_games, kept inside the test's directory
+    monkeypatch.chdir(tmp_path)
+    return tmp_path
+
+
+@pytest.fixture
+def play_game(saves_dir):
+    # New seeded game played and saved for the given number of turns
+    def play(turns: int, seed: int = 0, map_manager: MapManager | None = None):
+        random.seed(seed)
+        map_manager = map_manager or MapManager(player1_strategy=PickNearest(), player2_strategy=PickNearest())
+        map_manager.current_game_folder = None
+        map_manager.new_game()
+        map_manager.save_game(0)
+        for turn in range(1, turns + 1):
+            map_manager.next_turn(turn)
+            map_manager.save_game(turn)
+        return map_manager
+    return play
+
+
+@pytest.fixture
+def played_states(play_game):
+    # Seeded game played for the given number of turns, with the snapshot
+    # of every turn
+    def play(turns: int, seed: int = 3):
+        map_manager = play_game(0, seed=seed)
+        states = [map_manager.snapshot_state(0)]
+        for turn in range(1, turns + 1):
+            map_manager.next_turn(turn)
+            map_manager.save_game(turn)
+            states.append(map_manager.snapshot_state(turn))
+        return map_manager, states
+    return play
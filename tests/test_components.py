@@ -0,0 +1,75 @@
+import random
+from collections import deque
+from classes.Item import Food, Person
+from classes.Mine import Mine, Mine_O1
+from pathfinding import ComponentIndex
+
+
+def random_grid(rng: random.Random, width: int, height: int):
+    grid = [[None] * height for _ in range(width)]
+    danger_zones = [[rng.random() < 0.25 for _ in range(height)] for _ in range(width)]
+    for x in range(width):
+        for y in range(height):
+            roll = rng.random()
+            if roll < 0.02:
+                grid[x][y] = Mine_O1((x, y))
+            elif roll < 0.06:
+                grid[x][y] = Person((x, y))
+            elif roll < 0.1:
+                grid[x][y] = Food((x, y))
+    return grid, danger_zones
+
+
+def recount_components(grid, danger_zones):
+    # Flood fill from every walkable cell, one label per component
+    width, height = len(grid), len(grid[0])
+    labels = [[-1] * height for _ in range(width)]
+    walkable = lambda x, y: not danger_zones[x][y] and not isinstance(grid[x][y], Mine)
+    count = 0
+    for x in range(width):
+        for y in range(height):
+            if labels[x][y] != -1 or not walkable(x, y):
+                continue
+            labels[x][y] = count
+            queue = deque([(x, y)])
+            while queue:
+                cell_x, cell_y = queue.popleft()
+                for next_x, next_y in ((cell_x - 1, cell_y), (cell_x + 1, cell_y), (cell_x, cell_y - 1), (cell_x, cell_y + 1)):
+                    if 0 <= next_x < width and 0 <= next_y < height and labels[next_x][next_y] == -1 and walkable(next_x, next_y):
+                        labels[next_x][next_y] = count
+                        queue.append((next_x, next_y))
+            count += 1
+    return labels
+
+
+def test_component_index_matches_a_full_recount():
+    rng = random.Random(11)
+    for _ in range(20):
+        width, height = rng.randint(1, 40), rng.randint(1, 40)
+        grid, danger_zones = random_grid(rng, width, height)
+        components = ComponentIndex(grid, danger_zones)
+        recount = recount_components(grid, danger_zones)
+        pairs = {}
+        for x in range(width):
+            for y in range(height):
+                assert (components.label(x, y) == -1) == (recount[x][y] == -1)
+                if recount[x][y] != -1:
+                    # Same partition: each recounted component maps to one label
+                    assert pairs.setdefault(recount[x][y], components.label(x, y)) == components.label(x, y)
+        assert len(set(pairs.values())) == len(pairs)
+
+
+def test_game_components_ignore_vehicles(play_game):
+    map_manager = play_game(0, seed=4)
+    components = map_manager.get_components()
+    mine_version = map_manager.danger_map.mine_version
+    for turn in range(1, 41):
+        map_manager.next_turn(turn)
+        assert map_manager.get_components().labels == ComponentIndex(map_manager.grid, map_manager.danger_map.mine_counts).labels
+        if map_manager.danger_map.mine_version == mine_version:
+            # Only vehicles moved: the index is reused
+            assert map_manager.get_components() is components
+        components = map_manager.get_components()
+        mine_version = map_manager.danger_map.mine_version
+        for vehicle in list(map_manager.player1.vehicles) + list(map_manager.player2.vehicles):
+            assert components.label(*vehicle.position) != -1
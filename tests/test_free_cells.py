@@ -0,0 +1,66 @@
+import random
+import pytest
+from classes.Item import Food
+import map_manager as map_manager_module
+from map_manager import MapManager, FreeCellIndex
+from scenario import load_scenario
+from strategies import PickNearest
+
+
+def free_cells(grid, min_x, min_y, max_x, max_y):
+    return {(x, y) for x in range(min_x, max_x + 1) for y in range(min_y, max_y + 1) if grid[x][y] is None}
+
+
+def test_free_cell_index_follows_adds_and_removes():
+    rng = random.Random(6)
+    random.seed(6)
+    width, height = 12, 9
+    grid = [[Food((x, y)) if rng.random() < 0.3 else None for y in range(height)] for x in range(width)]
+    index = FreeCellIndex(grid, 1, 2, width - 2, height - 1)
+    for _ in range(300):
+        x, y = rng.randrange(width), rng.randrange(height)
+        if grid[x][y] is None:
+            grid[x][y] = Food((x, y))
+            if index.contains(x, y):
+                index.remove(x, y)
+        else:
+            grid[x][y] = None
+            if index.contains(x, y):
+                index.add(x, y)
+        expected = free_cells(grid, 1, 2, width - 2, height - 1)
+        assert len(index) == len(expected)
+        assert {index.sample() for _ in range(20)} <= expected | {None}
+    for x, y in free_cells(grid, 1, 2, width - 2, height - 1):
+        index.remove(x, y)
+    assert len(index) == 0 and index.sample() is None
+
+
+def test_get_empty_cell_follows_the_grid(saves_dir):
+    random.seed(1)
+    map_manager = MapManager(player1_strategy=PickNearest(), player2_strategy=PickNearest(), width=6, height=4)
+    free = free_cells(map_manager.grid, 1, 0, 4, 3)
+    while free:
+        position = map_manager.get_empty_cell()
+        assert position in free
+        free.discard(position)
+        map_manager.set_cell(position, Food(position))
+    with pytest.raises(ValueError):
+        map_manager.get_empty_cell()
+    map_manager.set_cell((2, 2), None)
+    assert map_manager.get_empty_cell() == (2, 2)
+
+
+def test_new_game_reports_objects_that_do_not_fit(saves_dir, monkeypatch, capsys):
+    scenario = load_scenario({'scenario': {'width': 6, 'height': 4, 'items': {'Person': 30}, 'random_items': 5,
+                                             'fleet': {'vehicles_per_player': 2}}})
+    monkeypatch.setattr(map_manager_module, 'load_scenario', lambda: scenario)
+    random.seed(0)
+    map_manager = MapManager(player1_strategy=PickNearest(), player2_strategy=PickNearest())
+    map_manager.current_game_folder = None
+    map_manager.new_game()
+    output = capsys.readouterr().out
+    assert 'ERROR IN SCENARIO ITEMS: NO EMPTY CELL LEFT FOR PERSON' in output
+    assert 'NO EMPTY CELL LEFT FOR RANDOM ITEMS, PLACING 0 OF 5' in output
+    # Every cell between the base columns is taken
+    assert not free_cells(map_manager.grid, 1, 0, 4, 3)
+    assert map_manager.item_counts['grid'] == len(map_manager.get_item_positions())
@@ -0,0 +1,21 @@
+import os
+import subprocess
+import sys
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Blocks pygame (even when installed) and plays a short headless game
+HEADLESS_GAME = f"""
+import sys
+sys.modules['pygame'] = None
+sys.path.insert(0, {REPO_ROOT!r})
+sys.argv = ['rescue_simulator.py', '--headless', '30']
+import runpy
+runpy.run_path({os.path.join(REPO_ROOT, 'rescue_simulator.py')!r}, run_name='__main__')
+"""
+
+
+def test_game_runs_without_pygame(saves_dir):
+    result = subprocess.run([sys.executable, '-c', HEADLESS_GAME], cwd=saves_dir, capture_output=True, text=True, timeout=300)
+    assert result.returncode == 0, result.stderr
+    assert 'HEADLESS GAME FINISHED' in result.stdout
@@ -0,0 +1,62 @@
+import random
+import pytest
+from classes.Mine import Mine_O1
+from hierarchical import HierarchicalMap
+from pathfinding import find_nearest_goal
+
+
+def random_map(rng: random.Random):
+    width, height = rng.randint(15, 50), rng.randint(15, 50)
+    grid = [[None] * height for _ in range(width)]
+    danger_zones = [[rng.random() < 0.25 for _ in range(height)] for _ in range(width)]
+    for _ in range(5):
+        x, y = rng.randrange(width), rng.randrange(height)
+        grid[x][y] = Mine_O1((x, y))
+    return grid, danger_zones
+
+
+def is_wall(grid, danger_zones, x, y):
+    return bool(danger_zones and danger_zones[x][y]) or isinstance(grid[x][y], Mine_O1)
+
+
+@pytest.mark.parametrize('mode', ['mines', 'danger'])
+def test_find_nearest_path_agrees_with_flat_search(mode):
+    rng = random.Random(5)
+    for _ in range(20):
+        grid, danger_zones = random_map(rng)
+        width, height = len(grid), len(grid[0])
+        walls = {'mines': [], 'danger': danger_zones}[mode]
+        hierarchy = HierarchicalMap(grid, walls, cluster_size=rng.choice([4, 7, 10]))
+        for step in range(20):
+            if step == 10 and walls is danger_zones:
+                cells = [(rng.randrange(width), rng.randrange(height)) for _ in range(15)]
+                for x, y in cells:
+                    danger_zones[x][y] = not danger_zones[x][y]
+                hierarchy.mark_changed(cells)
+            start = (rng.randrange(width), rng.randrange(height))
+            goals = {(rng.randrange(width), rng.randrange(height)) for _ in range(rng.randint(1, 12))}
+            expected = find_nearest_goal(grid, start, goals, walls)
+            path = hierarchy.find_nearest_path(start, goals)
+            assert (path is None) == (expected is None)
+            if path is None:
+                continue
+            assert path[0] == start and path[-1] in goals
+            assert all(abs(a[0] - b[0]) + abs(a[1] - b[1]) == 1 for a, b in zip(path, path[1:]))
+            assert not any(is_wall(grid, walls, x, y) for x, y in path[1:-1])
+
+
+def test_game_hierarchy_follows_the_danger_zones(play_game):
+    map_manager = play_game(0, seed=2)
+    map_manager.path_engine = 'hierarchical'
+    for turn in range(1, 21):
+        map_manager.next_turn(turn)
+        hierarchy = map_manager.get_hierarchy()
+        assert hierarchy.danger_zones is map_manager.danger_zones
+        start = map_manager.player1.vehicles[0].position if map_manager.player1.vehicles else (0, 0)
+        goals = {vehicle.position for vehicle in map_manager.player2.vehicles}
+        expected = find_nearest_goal(map_manager.grid, start, goals, map_manager.danger_zones)
+        path = map_manager.find_path_to_nearest(start, goals)
+        assert (path is None) == (expected is None)
+        if path is not None:
+            assert path[-1] in goals
+            assert not any(is_wall(map_manager.grid, map_manager.danger_zones, x, y) for x, y in path[1:-1])
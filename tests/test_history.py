@@ -0,0 +1,36 @@
+from map_manager import MapManager
+from strategies import PickNearest
+
+
+def test_step_to_turn_matches_saved_states(play_game):
+    map_manager = play_game(0)
+    states = {0: map_manager.snapshot_state(0)}
+    for turn in range(1, 31):
+        map_manager.next_turn(turn)
+        map_manager.save_game(turn)
+        states[turn] = map_manager.snapshot_state(turn)
+    for turn in list(range(29, 9, -1)) + list(range(11, 31)):
+        assert map_manager.step_to_turn(turn)
+        assert map_manager.current_turn == turn
+        assert map_manager.snapshot_state(turn) == states[turn]
+    assert map_manager.has_turn(30) and not map_manager.has_turn(31)
+
+
+def test_loading_another_game_drops_the_previous_history(play_game):
+    game_b = play_game(10, seed=2)
+    folder_b = game_b.current_game_folder
+    state_b = game_b.snapshot_state(10)
+    game_b.close_saves()
+    game_b_turn_6 = MapManager(PickNearest(), PickNearest())
+    assert game_b_turn_6.load_game(folder_b, 6)
+    expected_turn_6 = game_b_turn_6.snapshot_state(6)
+
+    map_manager = play_game(30, seed=1)
+    assert map_manager.load_game(folder_b, 5)
+    assert map_manager.latest_turn == 10
+    assert len(map_manager.history) == 0
+    assert not map_manager.has_turn(11)
+    assert map_manager.step_to_turn(6)
+    assert map_manager.snapshot_state(6) == expected_turn_6
+    assert map_manager.step_to_turn(10)
+    assert map_manager.snapshot_state(10) == state_b
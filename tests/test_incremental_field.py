@@ -0,0 +1,55 @@
+import random
+from classes.Item import Food, Person
+from classes.Mine import Mine, Mine_O1
+from pathfinding import IncrementalField, distance_field, item_distance_field
+
+
+def random_grid(rng: random.Random, width: int, height: int):
+    grid = [[None] * height for _ in range(width)]
+    danger_zones = [[rng.random() < 0.25 for _ in range(height)] for _ in range(width)]
+    for x in range(width):
+        for y in range(height):
+            roll = rng.random()
+            if roll < 0.02:
+                grid[x][y] = Mine_O1((x, y))
+            elif roll < 0.06:
+                grid[x][y] = Person((x, y))
+            elif roll < 0.1:
+                grid[x][y] = Food((x, y))
+    return grid, danger_zones
+
+
+def is_person_source(grid, danger_zones, x, y):
+    return not danger_zones[x][y] and isinstance(grid[x][y], Person)
+
+
+def test_incremental_field_matches_a_fresh_distance_field():
+    rng = random.Random(7)
+    for _ in range(10):
+        width, height = rng.randint(5, 40), rng.randint(5, 40)
+        grid, danger_zones = random_grid(rng, width, height)
+        field = IncrementalField(grid, danger_zones, is_person_source)
+        for _ in range(15):
+            cells = {(rng.randrange(width), rng.randrange(height)) for _ in range(rng.randint(1, 30))}
+            for x, y in cells:
+                danger_zones[x][y] = rng.random() < 0.25
+                grid[x][y] = rng.choice([None, None, Person((x, y)), Food((x, y)), Mine_O1((x, y))])
+            field.mark_changed(cells)
+            sources = [(x, y) for x in range(width) for y in range(height) if is_person_source(grid, danger_zones, x, y)]
+            expected = distance_field(grid, danger_zones, sources)
+            assert field.update(grid, danger_zones) == (expected if isinstance(expected, list) else expected.tolist())
+
+
+def test_game_caches_match_fresh_computations(play_game):
+    map_manager = play_game(0, seed=4)
+    for turn in range(1, 41):
+        map_manager.next_turn(turn)
+        for only_persons, exclude_persons in ((False, False), (True, False), (False, True)):
+            expected = item_distance_field(map_manager.grid, map_manager.danger_zones, only_persons, exclude_persons)
+            expected = expected if isinstance(expected, list) else expected.tolist()
+            assert map_manager.get_item_field(only_persons=only_persons, exclude_persons=exclude_persons) == expected
+        for team, base_x in ((map_manager.player1, 0), (map_manager.player2, map_manager.width - 1)):
+            sources = [(base_x, y) for y in range(map_manager.height)
+                       if not map_manager.danger_zones[base_x][y] and not isinstance(map_manager.grid[base_x][y], Mine)]
+            expected = distance_field(map_manager.grid, map_manager.danger_zones, sources)
+            assert map_manager.get_base_field(team) == (expected if isinstance(expected, list) else expected.tolist())
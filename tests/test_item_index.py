@@ -0,0 +1,49 @@
+import random
+from classes.Item import Item
+from classes.Mine import Mine
+from map_manager import MapManager
+from strategies import PickNearest
+
+
+def scan_grid(map_manager: MapManager):
+    # Items by type and mines by position, read cell by cell from the grid
+    items, mines = {}, {}
+    for x in range(map_manager.width):
+        for y in range(map_manager.height):
+            grid_object = map_manager.grid[x][y]
+            if isinstance(grid_object, Item):
+                items.setdefault(grid_object.__class__.__name__, set()).add((x, y))
+            elif isinstance(grid_object, Mine):
+                mines[(x, y)] = grid_object
+    return items, mines
+
+
+def assert_index_matches_grid(map_manager: MapManager):
+    items, mines = scan_grid(map_manager)
+    assert {item_type: positions for item_type, positions in map_manager.item_positions.items() if positions} == items
+    assert map_manager.mines_by_position == mines
+    vehicles = list(map_manager.player1.vehicles) + list(map_manager.player2.vehicles)
+    assert map_manager.item_counts == {
+        'grid': sum(len(positions) for positions in items.values()),
+        'cargo': sum(len(vehicle.load) for vehicle in vehicles),
+        'under': sum(1 for vehicle in vehicles if vehicle.under_item is not None),
+    }
+
+
+def test_item_index_and_counters_follow_the_grid(saves_dir):
+    random.seed(2)
+    map_manager = MapManager(player1_strategy=PickNearest(), player2_strategy=PickNearest())
+    map_manager.current_game_folder = None
+    map_manager.new_game()
+    assert_index_matches_grid(map_manager)
+    for turn in range(1, 61):
+        map_manager.next_turn(turn)
+        assert_index_matches_grid(map_manager)
+
+
+def test_item_index_is_rebuilt_on_load(play_game):
+    map_manager = play_game(20, seed=1)
+    loaded = MapManager(player1_strategy=PickNearest(), player2_strategy=PickNearest())
+    loaded.load_game(map_manager.current_game_folder, 20)
+    assert_index_matches_grid(loaded)
+    assert loaded.item_counts == map_manager.item_counts
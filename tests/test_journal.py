@@ -0,0 +1,24 @@
+import os
+from journal import diff_state, apply_delta
+from map_manager import MapManager
+from strategies import PickNearest
+
+
+def test_deltas_rebuild_every_state(played_states):
+    _, states = played_states(20)
+    for previous, state in zip(states, states[1:]):
+        assert apply_delta(previous, diff_state(previous, state), state['turn']) == state
+
+
+def test_loaded_game_plays_the_same_turns_again(played_states):
+    map_manager, states = played_states(40, seed=6)
+    map_manager.close_saves()
+    folder = map_manager.current_game_folder
+    assert os.path.exists(os.path.join(folder, 'game.replay'))
+
+    loaded = MapManager(PickNearest(), PickNearest())
+    assert loaded.load_game(folder, 15)
+    assert loaded.snapshot_state(15) == states[15]
+    for turn in range(16, 41):
+        loaded.next_turn(turn)
+        assert loaded.snapshot_state(turn) == states[turn], turn
@@ -0,0 +1,15 @@
+from journal import TurnJournal, JournalWriter
+
+
+def test_background_writer_saves_every_turn(played_states, saves_dir):
+    _, states = played_states(30)
+    journal = TurnJournal(str(saves_dir / 'background'))
+    writer = JournalWriter(max_pending=4)
+    for state in states:
+        writer.submit(journal, state['turn'], state)
+    writer.close()
+    journal.close()
+    metrics = writer.get_metrics()
+    assert metrics['written'] == metrics['submitted'] == len(states)
+    journal = TurnJournal(journal.folder)
+    assert all(journal.read(turn) == states[turn] for turn in range(len(states)))
@@ -0,0 +1,33 @@
+import os
+import pickle
+from map_manager import MapManager
+from strategies import PickNearest
+from legacy_saves import convert_legacy_game, legacy_turns
+
+
+def write_legacy_game(map_manager: MapManager, folder: str, turns: int):
+    # turn_N.pkl files as older versions saved them, derived danger zones included
+    os.makedirs(folder, exist_ok=True)
+    states = {}
+    for turn in range(turns + 1):
+        if turn:
+            map_manager.next_turn(turn)
+        states[turn] = map_manager.snapshot_state(turn)
+        legacy_state = dict(states[turn], danger_zones=map_manager.danger_zones)
+        with open(os.path.join(folder, f"turn_{turn}.pkl"), 'wb') as file:
+            pickle.dump(legacy_state, file)
+    return states
+
+
+def test_legacy_game_converts_to_a_replay_file(play_game, saves_dir):
+    folder = str(saves_dir / 'saved_games' / 'Legacy')
+    states = write_legacy_game(play_game(0), folder, 8)
+    assert legacy_turns(folder) == list(range(9))
+
+    map_manager = MapManager(PickNearest(), PickNearest())
+    assert not map_manager.load_game(os.path.join(folder, 'turn_3.pkl'), 3)
+    assert convert_legacy_game(folder, MapManager(PickNearest(), PickNearest())) == 9
+    assert map_manager.load_game(folder, 3)
+    assert map_manager.snapshot_state(3) == states[3]
+    assert map_manager.step_to_turn(8)
+    assert map_manager.snapshot_state(8) == states[8]
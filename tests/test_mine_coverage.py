@@ -0,0 +1,32 @@
+import random
+from classes.Mine import Mine_O1, Mine_O2, Mine_T1, Mine_T2, Mine_G1
+from danger_map import MineCoverage
+
+
+def brute_force_counts(width: int, height: int, mines, radius: int | None = None):
+    # Mines covering each cell, checked mine by mine
+    counts = [[0] * height for _ in range(width)]
+    for mine in mines:
+        x_radius = mine.x_radius if radius is None else radius
+        y_radius = mine.y_radius if radius is None else radius
+        for x in range(width):
+            for y in range(height):
+                if abs(x - mine.position[0]) <= x_radius and abs(y - mine.position[1]) <= y_radius:
+                    counts[x][y] += 1
+    return counts
+
+
+def test_mine_coverage_matches_a_brute_force_count():
+    rng = random.Random(8)
+    mine_classes = (Mine_O1, Mine_O2, Mine_T1, Mine_T2, Mine_G1)
+    for _ in range(30):
+        width, height = rng.randint(1, 40), rng.randint(1, 40)
+        mines = [rng.choice(mine_classes)((rng.randrange(width), rng.randrange(height))) for _ in range(rng.randint(0, 8))]
+        for mine in mines:
+            if isinstance(mine, Mine_G1) and rng.random() < 0.5:
+                mine.toggle()
+        coverage = MineCoverage.from_mines(width, height, mines)
+        assert coverage.counts == brute_force_counts(width, height, mines)
+        assert all(coverage.covered(x, y) == (coverage.count(x, y) > 0) for x in range(width) for y in range(height))
+        radius = rng.randint(0, 8)
+        assert MineCoverage.from_mines(width, height, mines, radius=radius).counts == brute_force_counts(width, height, mines, radius)
@@ -0,0 +1,114 @@
+import random
+import pytest
+from classes.Item import Food, Person
+from classes.Mine import Mine_O1
+import pathfinding
+
+
+def random_grid(rng: random.Random, width: int, height: int):
+    grid = [[None] * height for _ in range(width)]
+    danger_zones = [[rng.random() < 0.2 for _ in range(height)] for _ in range(width)]
+    for x in range(width):
+        for y in range(height):
+            roll = rng.random()
+            if roll < 0.01:
+                grid[x][y] = Mine_O1((x, y))
+            elif roll < 0.05:
+                grid[x][y] = Person((x, y))
+            elif roll < 0.1:
+                grid[x][y] = Food((x, y))
+    return grid, danger_zones
+
+
+def test_walkable_mask_updates_match_a_fresh_scan():
+    np = pytest.importorskip('numpy')
+    rng = random.Random(3)
+    grid, danger_zones = random_grid(rng, 80, 70)
+    mask = pathfinding.WalkableMask(grid, danger_zones)
+    mask.get_targets(grid, danger_zones, only_persons=True)
+    for _ in range(10):
+        cells = {(rng.randrange(80), rng.randrange(70)) for _ in range(40)}
+        for x, y in cells:
+            danger_zones[x][y] = rng.random() < 0.2
+            grid[x][y] = rng.choice([None, None, Person((x, y)), Food((x, y)), Mine_O1((x, y))])
+        mask.mark_changed(cells)
+        mask.update(grid, danger_zones)
+        walkable, persons = pathfinding.walkable_mask(grid, danger_zones, only_persons=True, with_targets=True)
+        assert np.array_equal(mask.walkable, walkable)
+        assert np.array_equal(mask.get_targets(grid, danger_zones, only_persons=True), persons)
+
+
+def test_backend_bounds():
+    small = [[None] * 50 for _ in range(50)]
+    huge = [[None] * 1000 for _ in range(1000)]
+    assert not pathfinding.use_vectorized(small)
+    assert not pathfinding.use_vectorized(huge)
+    assert pathfinding.use_vectorized(huge, pathfinding.VECTORIZED_FIELD_MAX_CELLS) == (pathfinding.np is not None)
+
+
+def test_search_methods_find_paths_as_short_as_bfs():
+    rng = random.Random(5)
+    for _ in range(60):
+        width, height = rng.randint(2, 40), rng.randint(2, 40)
+        grid = [[None] * height for _ in range(width)]
+        density = rng.choice([0, 0.1, 0.3, 0.45])
+        danger_zones = [[rng.random() < density for _ in range(height)] for _ in range(width)]
+        for _ in range(3):
+            x, y = rng.randrange(width), rng.randrange(height)
+            grid[x][y] = Mine_O1((x, y))
+        for _ in range(10):
+            start = (rng.randrange(width), rng.randrange(height))
+            goal = (rng.randrange(width), rng.randrange(height))
+            for walls in (danger_zones, None):
+                expected = pathfinding.bfs(grid, start, goal, method='bfs', danger_zones=walls)
+                for method in pathfinding.SEARCH_METHODS:
+                    path = pathfinding.bfs(grid, start, goal, method=method, danger_zones=walls)
+                    assert (path is None) == (expected is None), method
+                    if path is not None:
+                        assert len(path) == len(expected), method
+                        assert path[0] == start and path[-1] == goal
+                        assert all(abs(a[0] - b[0]) + abs(a[1] - b[1]) == 1 for a, b in zip(path, path[1:]))
+            target_x = rng.randrange(width)
+            expected = pathfinding.find_path_to_column(grid, start, target_x, danger_zones, method='bfs')
+            for method in pathfinding.COLUMN_SEARCH_METHODS:
+                path = pathfinding.find_path_to_column(grid, start, target_x, danger_zones, method=method)
+                assert (path is None) == (expected is None), method
+                if path is not None:
+                    assert len(path) == len(expected) and path[-1][0] == target_x
+
+
+def test_unknown_search_method_is_rejected():
+    grid = [[None] * 5 for _ in range(5)]
+    with pytest.raises(ValueError):
+        pathfinding.bfs(grid, (0, 0), (4, 4), method='dijkstra')
+    with pytest.raises(ValueError):
+        pathfinding.find_path_to_column(grid, (0, 0), 4, [], method='dijkstra')
+    assert pathfinding.DEFAULT_SEARCH_METHOD in pathfinding.SEARCH_METHODS
+
+
+def test_vectorized_searches_stop_at_the_start():
+    np = pytest.importorskip('numpy')
+    rng = random.Random(9)
+    for _ in range(30):
+        width, height = rng.randint(2, 40), rng.randint(2, 40)
+        grid, danger_zones = random_grid(rng, width, height)
+        walkable, targets = pathfinding.walkable_mask(grid, danger_zones, with_targets=True)
+        for _ in range(5):
+            start = (rng.randrange(width), rng.randrange(height))
+            # Stopping early leaves the path walked back from start unchanged
+            full = pathfinding.descend_field(pathfinding.wavefront_field(walkable, targets & walkable), start)
+            if not pathfinding.matches_target(grid[start[0]][start[1]], False, False):
+                assert pathfinding.find_nearest_vectorized(grid, start, danger_zones) == full
+            target_x = rng.randrange(width)
+            sources = np.zeros(walkable.shape, dtype=bool)
+            sources[target_x, :] = walkable[target_x, :]
+            full = pathfinding.descend_field(pathfinding.wavefront_field(walkable, sources), start)
+            if not (start[0] == target_x and walkable[start]):
+                assert pathfinding.find_path_to_column_vectorized(grid, start, target_x, danger_zones) == full
+    # A goal next to the start does not flood the rest of the map
+    walkable = np.ones((200, 200), dtype=bool)
+    sources = np.zeros(walkable.shape, dtype=bool)
+    sources[0, 1] = True
+    field = pathfinding.wavefront_field(walkable, sources, (0, 0))
+    assert field[0, 0] == 1 and field[199, 199] == -1
+    assert pathfinding.bfs_vectorized([[None] * 200 for _ in range(200)], (0, 0), (0, 1)) == [(0, 0), (0, 1)]
@@ -0,0 +1,31 @@
+from journal import TurnJournal, KEYFRAME_INTERVAL
+
+
+def test_journal_round_trip_through_the_replay_file(played_states, saves_dir):
+    _, states = played_states(KEYFRAME_INTERVAL + 20)
+    folder = str(saves_dir / 'replay')
+    journal = TurnJournal(folder)
+    for state in states:
+        journal.write(state['turn'], state)
+    journal.close()
+
+    # Reopened from the stored index, read through the mmap
+    journal = TurnJournal(folder)
+    assert journal.unindexed == 0 and journal.turns() == list(range(len(states)))
+    assert all(journal.read(turn) == states[turn] for turn in reversed(range(len(states))))
+
+    # Writing an earlier turn replaces the later ones, found again by a scan
+    # of the records when the index was not stored
+    journal.write(30, states[5])
+    journal = TurnJournal(folder)
+    assert journal.turns() == list(range(31)) and journal.unindexed == 1
+    assert journal.read(30) == states[5] and journal.read(29) == states[29]
+
+    # A truncated last record is dropped
+    with open(journal.path, 'ab') as file:
+        file.write(b'\x99\x00\x00\x00\x05\x00')
+    journal = TurnJournal(folder)
+    assert journal.turns() == list(range(31))
+    journal.write(31, states[31])
+    journal.close()
+    assert TurnJournal(folder).read(31) == states[31]
@@ -0,0 +1,19 @@
+import pytest
+from journal import diff_state, apply_delta
+from save_schema import encode_state, decode_state, encode_delta, decode_delta
+
+
+def test_schema_round_trips_states_and_deltas(played_states):
+    _, states = played_states(20)
+    for previous, state in zip(states, states[1:]):
+        assert decode_state(encode_state(state)) == state
+        delta = diff_state(previous, state)
+        assert apply_delta(previous, decode_delta(encode_delta(delta)), state['turn']) == state
+
+
+def test_schema_rejects_other_versions(played_states):
+    _, states = played_states(0)
+    data = bytearray(encode_state(states[0]))
+    data[0] += 1
+    with pytest.raises(ValueError, match='schema version'):
+        decode_state(bytes(data))
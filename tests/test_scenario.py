@@ -0,0 +1,14 @@
+from scenario import load_scenario, fleet_layout
+
+
+def test_fleet_larger_than_the_base_column_is_reduced():
+    scenario = load_scenario({'scenario': {'width': 20, 'height': 10, 'fleet': {'vehicles_per_player': 30}}})
+    assert scenario['fleet']['vehicles_per_player'] == 10
+    layout = fleet_layout(scenario['fleet'], scenario['height'])
+    assert sorted(y for _, _, y in layout) == list(range(10))
+
+
+def test_default_scenario_is_the_classic_game():
+    scenario = load_scenario({})
+    assert (scenario['width'], scenario['height']) == (50, 50)
+    assert scenario['fleet'] is None
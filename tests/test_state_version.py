@@ -0,0 +1,42 @@
+import random
+from map_manager import MapManager
+from strategies import PickNearest
+
+
+def test_changed_cells_cover_every_cell_that_changed(saves_dir):
+    random.seed(4)
+    map_manager = MapManager(player1_strategy=PickNearest(), player2_strategy=PickNearest())
+    map_manager.current_game_folder = None
+    map_manager.new_game()
+    cells = [(x, y) for x in range(map_manager.width) for y in range(map_manager.height)]
+    for turn in range(1, 41):
+        grid_before = {cell: map_manager.grid[cell[0]][cell[1]] for cell in cells}
+        danger_before = {cell: bool(map_manager.danger_zones[cell[0]][cell[1]]) for cell in cells}
+        version_before = map_manager.state_version
+        map_manager.next_turn(turn)
+        assert map_manager.state_version > version_before
+        for x, y in cells:
+            if map_manager.grid[x][y] is not grid_before[(x, y)] or bool(map_manager.danger_zones[x][y]) != danger_before[(x, y)]:
+                assert (x, y) in map_manager.changed_cells
+
+
+def test_state_version_only_moves_on_changes(play_game):
+    map_manager = play_game(5)
+    version = map_manager.state_version
+    x, y = next((x, y) for x in range(map_manager.width) for y in range(map_manager.height) if map_manager.grid[x][y] is None)
+    # Writing what is already there is not a change
+    map_manager.set_cell((x, y), None)
+    assert map_manager.state_version == version
+    assert (x, y) not in map_manager.changed_cells
+    # The game-over check is reused until the next change
+    result = map_manager.is_game_over()
+    assert map_manager.game_over_cache == (version, result)
+    map_manager.record_cargo(0)
+    assert map_manager.state_version == version + 1
+    assert map_manager.is_game_over() == result
+    assert map_manager.game_over_cache == (version + 1, result)
+    # A new turn starts a new set of changed cells
+    map_manager.changed_cells.add((-1, -1))
+    map_manager.next_turn(6)
+    assert map_manager.state_version > version + 1
+    assert (-1, -1) not in map_manager.changed_cells
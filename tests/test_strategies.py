@@ -0,0 +1,48 @@
+from pathfinding import bfs
+from strategies import Kamikaze
+
+
+def test_find_path_is_as_short_as_bfs_around_walls(play_game):
+    map_manager = play_game(0, seed=1)
+    for vehicle in map_manager.player1.vehicles:
+        for enemy in map_manager.player2.vehicles[:3]:
+            expected = bfs(map_manager.grid, vehicle.position, enemy.position, method='bfs', danger_zones=map_manager.danger_zones)
+            path = map_manager.find_path(vehicle.position, enemy.position)
+            assert (path is None) == (expected is None)
+            if path is not None:
+                assert len(path) == len(expected) and path[-1] == enemy.position
+
+
+def test_kamikaze_re_aims_at_its_moving_target(play_game):
+    map_manager = play_game(0, seed=1)
+    vehicle = map_manager.player1.vehicles[0]
+    target = map_manager.player2.vehicles[0]
+    vehicle.strategy = Kamikaze()
+    vehicle.path = map_manager.find_path(vehicle.position, target.position)[1:]
+    vehicle.state = 'attacking'
+
+    target_x, target_y = target.position
+    map_manager.set_cell((target_x, target_y), None)
+    target.position = (target_x - 1, target_y)
+    map_manager.set_cell(target.position, target)
+    vehicle.strategy.plan(vehicle, map_manager)
+    assert vehicle.path[-1] == target.position
+    assert vehicle.state == 'attacking'
+
+
+def test_find_path_uses_the_configured_method(play_game, monkeypatch):
+    import pathfinding
+    map_manager = play_game(0, seed=1)
+    start, goal = map_manager.player1.vehicles[0].position, map_manager.player2.vehicles[0].position
+    calls = []
+    real_jump_point_search = pathfinding.jump_point_search
+
+    def jump_point_search(*args, **kwargs):
+        calls.append(args[1:3])
+        return real_jump_point_search(*args, **kwargs)
+
+    monkeypatch.setattr(pathfinding, 'DEFAULT_SEARCH_METHOD', 'jps')
+    monkeypatch.setattr(pathfinding, 'jump_point_search', jump_point_search)
+    path = map_manager.find_path(start, goal)
+    assert calls == [(start, goal)]
+    assert len(path) == len(bfs(map_manager.grid, start, goal, method='bfs', danger_zones=map_manager.danger_zones))
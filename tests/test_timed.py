@@ -0,0 +1,41 @@
+from classes.Item import Food
+import pathfinding
+
+
+def column_walls(width: int, height: int, period: int, column: int, phases: set[int]):
+    # Flat bitmaps per phase with the whole column blocked at the given phases
+    phase_walls = [bytearray(width * height) for _ in range(period)]
+    for phase in phases:
+        for y in range(height):
+            phase_walls[phase][column * height + y] = 1
+    return phase_walls
+
+
+def test_timed_path_waits_out_a_timed_mine():
+    width, height, period = 5, 2, 10
+    grid = [[None] * height for _ in range(width)]
+    # The straight path stands on column 2 at turn 2, when it is dangerous
+    phase_walls = column_walls(width, height, period, 2, {2})
+    path = pathfinding.find_timed_path(grid, (0, 0), 0, phase_walls, pathfinding.GOAL_COLUMN, goal=4)
+    assert path is not None and path[0] == (0, 0) and path[-1][0] == 4
+    assert len(path) > 5
+    for step, (x, y) in enumerate(path):
+        assert not phase_walls[step % period][x * height + y]
+
+
+def test_timed_path_follows_the_start_turn():
+    width, height, period = 5, 2, 10
+    grid = [[None] * height for _ in range(width)]
+    grid[4][1] = Food((4, 1))
+    phase_walls = column_walls(width, height, period, 2, {2})
+    # Starting at turn 5 the danger has already passed
+    path = pathfinding.find_timed_path(grid, (0, 1), 5, phase_walls, pathfinding.GOAL_ITEM)
+    assert path == [(0, 1), (1, 1), (2, 1), (3, 1), (4, 1)]
+
+
+def test_timed_path_gives_up_at_the_state_cap():
+    width, height, period = 30, 30, 10
+    grid = [[None] * height for _ in range(width)]
+    phase_walls = column_walls(width, height, period, 2, set())
+    assert pathfinding.find_timed_path(grid, (0, 0), 0, phase_walls, pathfinding.GOAL_COLUMN, goal=29) is not None
+    assert pathfinding.find_timed_path(grid, (0, 0), 0, phase_walls, pathfinding.GOAL_COLUMN, goal=29, max_states=50) is None
@@ -14,13 +14,8 @@ try:
         config = json.load(config_file)
     visualization_config = config.get('visualization', {}) if isinstance(config, dict) else {}
     CELL_SIZE = int(visualization_config.get('cell_size', 16))
-    WINDOW_SIZE = CELL_SIZE * 50
 except Exception:
     CELL_SIZE = 16
-    WINDOW_SIZE = 800
-
-ROWS = 50
-COLUMNS = 50
 
 # Colors
 WHITE = (255, 255, 255)
@@ -34,7 +29,8 @@ class Visualization:
     def __init__(self, map_manager: MapManager):
         self.map_manager = map_manager
         # Calculate window size dynamically with map resolution
-        self.window_size = self.map_manager.width * CELL_SIZE
+        self.window_width = self.map_manager.width * CELL_SIZE
+        self.window_height = self.map_manager.height * CELL_SIZE
         # Ensure surface exists (GameEngine should have called set_mode)
         self.screen = pygame.display.get_surface()
         self.clock = pygame.time.Clock()
@@ -61,12 +57,38 @@ class Visualization:
             self.victory_sound = load_sound('victory.mp3')
         except Exception:
             self.victory_sound = None
+        # Load unload sound once and share it between all vehicles
+        try:
+            self.unload_sound = load_sound('unload.mp3')
+        except Exception:
+            self.unload_sound = None
+        # Sprites loaded so far, by file name. The simulation objects only
+        # know their sprite file name, images are attached here when drawn
+        self.sprite_cache = {}
+        # (state version, turn) of the frame on screen: the board is only
+        # redrawn when the simulation state or the shown turn changes
+        self.rendered_state = None
+
+    def attach_assets(self, grid_object):
+        if getattr(grid_object, 'sprite', None) is None:
+            sprite_name = getattr(grid_object, 'sprite_name', None)
+            if sprite_name is None:
+                return
+            if sprite_name not in self.sprite_cache:
+                try:
+                    self.sprite_cache[sprite_name] = load_sprite(sprite_name)
+                except Exception as error:
+                    print(f"❌ - ERROR LOADING SPRITE ({sprite_name}): {error}")
+                    self.sprite_cache[sprite_name] = None
+            grid_object.sprite = self.sprite_cache[sprite_name]
+        if isinstance(grid_object, Vehicle) and grid_object.unload_sound is None:
+            grid_object.unload_sound = self.unload_sound
         
     def draw_grid(self):
-        for x in range(0, self.window_size, CELL_SIZE):
-            pygame.draw.line(self.screen, GRAY, (x, 0), (x, self.window_size))
-        for y in range(0, self.window_size, CELL_SIZE):
-            pygame.draw.line(self.screen, GRAY, (0, y), (self.window_size, y))
+        for x in range(0, self.window_width, CELL_SIZE):
+            pygame.draw.line(self.screen, GRAY, (x, 0), (x, self.window_height))
+        for y in range(0, self.window_height, CELL_SIZE):
+            pygame.draw.line(self.screen, GRAY, (0, y), (self.window_width, y))
     
     def draw_objects(self):
         # First draw all object sprites
@@ -96,8 +118,10 @@ class Visualization:
                         background_surface.fill(color)
                         self.screen.blit(background_surface, (pixel_x, pixel_y))
                     
-                    scaled_sprite = pygame.transform.scale(grid_object.sprite, (CELL_SIZE, CELL_SIZE))
-                    self.screen.blit(scaled_sprite, (pixel_x, pixel_y))
+                    self.attach_assets(grid_object)
+                    if grid_object.sprite is not None:
+                        scaled_sprite = pygame.transform.scale(grid_object.sprite, (CELL_SIZE, CELL_SIZE))
+                        self.screen.blit(scaled_sprite, (pixel_x, pixel_y))
         
         # Then draw the red rectangles of mines on top
         for x in range(self.map_manager.width):
@@ -142,13 +166,13 @@ class Visualization:
         # Draw Player 1 Base
         pygame.draw.rect(self.screen, BLUE, (0, 0, CELL_SIZE, CELL_SIZE * self.map_manager.height))
         # Draw Player 2 Base
-        pygame.draw.rect(self.screen, RED, (self.window_size - CELL_SIZE, 0, CELL_SIZE, CELL_SIZE * self.map_manager.height))
+        pygame.draw.rect(self.screen, RED, (self.window_width - CELL_SIZE, 0, CELL_SIZE, CELL_SIZE * self.map_manager.height))
 
     def draw_player_info(self):
         font = load_font('minecraft.ttf', 32)
         box_width, box_height = 180, 50
-        box_x = (self.window_size - box_width) // 2
-        box_y = (self.window_size - box_height)
+        box_x = (self.window_width - box_width) // 2
+        box_y = (self.window_height - box_height)
         
         # Create transparent surfaces for background
         # Black border with 50% opacity
@@ -171,7 +195,7 @@ class Visualization:
         # Show current turn number in the upper part
         turn_font = load_font('minecraft.ttf', 32)
         turn_text = turn_font.render(f"{self.current_turn}", True, BLACK)
-        turn_rect = turn_text.get_rect(center=(self.window_size // 2, 20))
+        turn_rect = turn_text.get_rect(center=(self.window_width // 2, 20))
         self.screen.blit(turn_text, turn_rect)
 
     def render(self):
@@ -213,14 +237,14 @@ class Visualization:
             self.draw_grid()
             
             # Dark semi-transparent overlay over the board
-            overlay = pygame.Surface((self.window_size, self.window_size), pygame.SRCALPHA)
+            overlay = pygame.Surface((self.window_width, self.window_height), pygame.SRCALPHA)
             overlay.fill((0, 0, 0, 200))  # Black with 78% opacity
             self.screen.blit(overlay, (0, 0))
             
             # Main title
             title_font = load_font('minecraft.ttf', 72)
             title_text = title_font.render("RESCUE SIMULATOR", True, WHITE)
-            title_rect = title_text.get_rect(center=(self.window_size // 2, 100))
+            title_rect = title_text.get_rect(center=(self.window_width // 2, 100))
             self.screen.blit(title_text, title_rect)
             
             # Layout configuration
@@ -239,13 +263,13 @@ class Visualization:
             if arrow_left:
                 # Centered image
                 arrow_left_scaled = pygame.transform.scale(arrow_left, (key_size, key_size))
-                image_rect = arrow_left_scaled.get_rect(center=(self.window_size // 2, current_y))
+                image_rect = arrow_left_scaled.get_rect(center=(self.window_width // 2, current_y))
                 self.screen.blit(arrow_left_scaled, image_rect)
                 
                 # Text centered below image
                 text_y = current_y + key_size + text_offset
                 description_text = description_font.render("PREVIOUS TURN", True, WHITE)
-                description_rect = description_text.get_rect(center=(self.window_size // 2, text_y))
+                description_rect = description_text.get_rect(center=(self.window_width // 2, text_y))
                 self.screen.blit(description_text, description_rect)
             
             # Control 2: Arrow Right
@@ -253,13 +277,13 @@ class Visualization:
             if arrow_right:
                 # Centered image
                 arrow_right_scaled = pygame.transform.scale(arrow_right, (key_size, key_size))
-                image_rect = arrow_right_scaled.get_rect(center=(self.window_size // 2, current_y))
+                image_rect = arrow_right_scaled.get_rect(center=(self.window_width // 2, current_y))
                 self.screen.blit(arrow_right_scaled, image_rect)
                 
                 # Text centered below image
                 text_y = current_y + key_size + text_offset
                 description_text = description_font.render("NEXT TURN", True, WHITE)
-                description_rect = description_text.get_rect(center=(self.window_size // 2, text_y))
+                description_rect = description_text.get_rect(center=(self.window_width // 2, text_y))
                 self.screen.blit(description_text, description_rect)
             
             # Control 3: Space
@@ -267,19 +291,19 @@ class Visualization:
             if space_key:
                 # Centered image (wider)
                 space_scaled = pygame.transform.scale(space_key, (key_size * 2.5, key_size))
-                image_rect = space_scaled.get_rect(center=(self.window_size // 2, current_y))
+                image_rect = space_scaled.get_rect(center=(self.window_width // 2, current_y))
                 self.screen.blit(space_scaled, image_rect)
                 
                 # Text centered below image
                 text_y = current_y + key_size + text_offset
                 description_text = description_font.render("TOGGLE AUTOPLAY", True, WHITE)
-                description_rect = description_text.get_rect(center=(self.window_size // 2, text_y))
+                description_rect = description_text.get_rect(center=(self.window_width // 2, text_y))
                 self.screen.blit(description_text, description_rect)
             
             # Instruction to start
             continue_font = load_font('minecraft.ttf', 24)
             continue_text = continue_font.render("PRESS ANY KEY TO START", True, (255, 255, 255))
-            continue_rect = continue_text.get_rect(center=(self.window_size // 2, self.window_size - 50))
+            continue_rect = continue_text.get_rect(center=(self.window_width // 2, self.window_height - 50))
             self.screen.blit(continue_text, continue_rect)
             
             pygame.display.flip()
@@ -336,42 +360,42 @@ class Visualization:
             self.draw_grid()
             
             # Semi-transparent overlay
-            overlay = pygame.Surface((self.window_size, self.window_size), pygame.SRCALPHA)
+            overlay = pygame.Surface((self.window_width, self.window_height), pygame.SRCALPHA)
             overlay.fill((0, 0, 0, 180))  # Black with 70% opacity
             self.screen.blit(overlay, (0, 0))
             
             # "GAME OVER" title
             title_font = load_font('minecraft.ttf', 72)
             title_text = title_font.render("GAME OVER", True, WHITE)
-            title_rect = title_text.get_rect(center=(self.window_size // 2, self.window_size // 3))
+            title_rect = title_text.get_rect(center=(self.window_width // 2, self.window_height // 3))
             self.screen.blit(title_text, title_rect)
             
             # End reason
             reason_font = load_font('minecraft.ttf', 32)
             reason_render = reason_font.render(reason_text, True, GRAY)
-            reason_rect = reason_render.get_rect(center=(self.window_size // 2, self.window_size // 3 + 60))
+            reason_rect = reason_render.get_rect(center=(self.window_width // 2, self.window_height // 3 + 60))
             self.screen.blit(reason_render, reason_rect)
             
             # Winner
             winner_font = load_font('minecraft.ttf', 48)
             winner_render = winner_font.render(winner_text, True, winner_color)
-            winner_rect = winner_render.get_rect(center=(self.window_size // 2, self.window_size // 2))
+            winner_rect = winner_render.get_rect(center=(self.window_width // 2, self.window_height // 2))
             self.screen.blit(winner_render, winner_rect)
             
             # Scores
             score_font = load_font('minecraft.ttf', 48)
             score_text = score_font.render(f"PLAYER 1: {player1_score}", True, BLUE)
-            score_rect = score_text.get_rect(center=(self.window_size // 2, self.window_size // 2 + 80))
+            score_rect = score_text.get_rect(center=(self.window_width // 2, self.window_height // 2 + 80))
             self.screen.blit(score_text, score_rect)
             
             score_text2 = score_font.render(f"PLAYER 2: {player2_score}", True, RED)
-            score_rect2 = score_text2.get_rect(center=(self.window_size // 2, self.window_size // 2 + 130))
+            score_rect2 = score_text2.get_rect(center=(self.window_width // 2, self.window_height // 2 + 130))
             self.screen.blit(score_text2, score_rect2)
             
             # Instruction to continue
             continue_font = load_font('minecraft.ttf', 28)
             continue_text = continue_font.render("PRESS ANY KEY TO CONTINUE", True, WHITE)
-            continue_rect = continue_text.get_rect(center=(self.window_size // 2, self.window_size - 50))
+            continue_rect = continue_text.get_rect(center=(self.window_width // 2, self.window_height - 50))
             self.screen.blit(continue_text, continue_rect)
             
             pygame.display.flip()
@@ -381,6 +405,9 @@ class Visualization:
         for event in pygame.event.get():
             if event.type == pygame.QUIT:
                 self.running = False
+            if event.type == pygame.VIDEOEXPOSE:
+                # Window content was lost, force a redraw
+                self.rendered_state = None
             if event.type == pygame.KEYDOWN:
                 if event.key == pygame.K_SPACE:
                     # Toggle autoplay on/off
@@ -392,28 +419,31 @@ class Visualization:
                         print("⏸️ - AUTOPLAY: OFF")
                 if event.key == pygame.K_RIGHT:
                     if self.map_manager.player1.vehicles or self.map_manager.player2.vehicles:
-                        self.current_turn += 1
+                        if self.map_manager.has_turn(self.current_turn + 1):
+                            # Already played (after going back): replay it
+                            if self.map_manager.step_to_turn(self.current_turn + 1):
+                                self.current_turn += 1
+                                print(f"⏩ - REPLAYING TURN: {self.current_turn}")
+                        else:
+                            self.current_turn += 1
 
-                        # Execute simulation for new turn and then save
-                        self.map_manager.next_turn(self.current_turn)
+                            # Execute simulation for new turn and then save
+                            self.map_manager.next_turn(self.current_turn)
 
-                        saved_file = self.map_manager.save_game(self.current_turn)
-                        print(f"⏩ - ADVANCING TO TURN: {self.current_turn} — SAVED: {saved_file}")
+                            saved_file = self.map_manager.save_game(self.current_turn)
+                            print(f"⏩ - ADVANCING TO TURN: {self.current_turn} — SAVED: {saved_file}")
                     pass
                 if event.key == pygame.K_LEFT:
                     if self.current_turn > 0:
                         previous_turn = self.current_turn - 1
-                        # Try to load previous turn
-                        previous_turn_file = os.path.join(self.map_manager.current_game_folder, f"turn_{previous_turn}.pkl")
-                        if os.path.exists(previous_turn_file):
-                            # Only update current_turn if load was successful
-                            if self.map_manager.load_game(previous_turn_file, previous_turn):
-                                self.current_turn = previous_turn
-                                print(f"⏪ - RETURNED TO TURN: {self.current_turn}")
-                            else:
-                                print(f"❌ - ERROR LOADING TURN: {previous_turn}")
+                        # Previous turn from the in-memory history, or the
+                        # replay file if it was evicted
+                        # Only update current_turn if load was successful
+                        if self.map_manager.step_to_turn(previous_turn):
+                            self.current_turn = previous_turn
+                            print(f"⏪ - RETURNED TO TURN: {self.current_turn}")
                         else:
-                            print(f"❌ - TURN FILE NOT FOUND: {previous_turn_file}")
+                            print(f"❌ - ERROR LOADING TURN: {previous_turn}")
                     pass
     
     def run(self):
@@ -462,17 +492,27 @@ class Visualization:
                 if current_time - self.last_autoplay_time >= self.autoplay_delay:
                     # Check if there are vehicles before advancing
                     if self.map_manager.player1.vehicles or self.map_manager.player2.vehicles:
-                        self.current_turn += 1
-                        self.map_manager.next_turn(self.current_turn)
-                        saved_file = self.map_manager.save_game(self.current_turn)
-                        print(f"⏩ - AUTOPLAY ADVANCING TO TURN: {self.current_turn} — SAVED: {saved_file}")
+                        if self.map_manager.has_turn(self.current_turn + 1):
+                            if self.map_manager.step_to_turn(self.current_turn + 1):
+                                self.current_turn += 1
+                                print(f"⏩ - AUTOPLAY REPLAYING TURN: {self.current_turn}")
+                            else:
+                                self.autoplay = False
+                        else:
+                            self.current_turn += 1
+                            self.map_manager.next_turn(self.current_turn)
+                            saved_file = self.map_manager.save_game(self.current_turn)
+                            print(f"⏩ - AUTOPLAY ADVANCING TO TURN: {self.current_turn} — SAVED: {saved_file}")
                         self.last_autoplay_time = current_time
                     else:
                         # No vehicles left, stop autoplay
                         self.autoplay = False
                         print("⏸️ - AUTOPLAY: OFF (NO VEHICLES LEFT)")
             
-            self.render()
+            render_state = (self.map_manager.state_version, self.current_turn)
+            if render_state != self.rendered_state:
+                self.render()
+                self.rendered_state = render_state
             self.clock.tick(60)
 
         pygame.quit()
\ No newline at end of file